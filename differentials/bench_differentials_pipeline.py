@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the differentials pipeline: fix -> write -> fill.
+
+Each scale gets a synthetic dataset from synthetic_differentials_data.py (cached
+under .bench/data/ by scale, seed, generator version and source profile); the
+three scripts run against it with their paths pointed at a scratch directory:
+
+1) fix_parenthetical_etiologies.py   repairs the damaged clinical index (cache off, --apply)
+2) write_presentation.py             writes every presentation; clinical ones go to clinical/todo
+3) fill_clinical_todo_from_pdf.py    fills them from the synthetic book pages (serial, so phases are in-process)
+
+Stages are timed on main() plus the phases listed in STAGES (repair pre-pass,
+normalize, key resolution, etiology walk, chapter mapping, token extraction,
+writes, ...). Child processes, results files and --save-baseline / --compare are
+shared with the pharm suite (py/bench_harness.py).
+
+Usage:
+  python3 differentials/bench_differentials_pipeline.py [--scales 1,10] [--seed N] [--repeat N]
+                                                        [--save-baseline] [--compare] [--baseline PATH]
+                                                        [--out PATH] [--regen]
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import synthetic_differentials_data as synth
+
+# Measurement, the suite CLI and baseline comparison live in <repo>/py/bench_harness.py
+import py_path  # noqa: F401
+import bench_harness as bh
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+SCALES = (1, 10)  # 1 = today's 121 presentations / ~100 book chapters; 100 works but takes minutes per stage
+SEED = synth.DEFAULT_SEED
+REPEATS = 3  # Fastest of N full pipeline runs per scale; the spread sets --compare's noise floor
+DATA_DIR = bh.BENCH_DIR / "data"
+WORK_DIR = bh.BENCH_DIR / "work"
+RESULTS_PATH = bh.BENCH_DIR / "differentials_results.json"
+BASELINE_PATH = bh.BENCH_DIR / "differentials_baseline.json"
+SUITE = "differentials"
+
+
+# -----------------------------
+# Stages
+# -----------------------------
+def _meta(data: Path) -> Dict[str, object]:
+    return json.loads((data / "dataset.json").read_text(encoding="utf-8"))
+
+
+def _run_fix(mod, data: Path, work: Path) -> int:
+    mod.INPUT_PATH = data / "clinical_presentation_index.json"
+    mod.OUTPUT_PATH = work / "clinical_presentation_index.json"
+    mod.BLOCK_CACHE_PATH = work / ".fix_parenthetical_cache.json"
+    sys.argv = [mod.__file__, "--apply", "--no-cache"]
+    if mod.main() != 0:
+        raise RuntimeError("fix_parenthetical_etiologies left unhandled malformed candidates")
+    return int(_meta(data)["clinicalIndexKeys"])
+
+
+def _run_write(mod, data: Path, work: Path) -> int:
+    base = work / "presentations"
+    mod.BASE_DIR = str(base)
+    mod.PRESENTATION_LIST_PATH = str(data / "Presentation_list.json")
+    mod.CLINICAL_INDEX_PATH = str(work / "clinical_presentation_index.json")
+    mod.NONCLINICAL_INDEX_PATH = str(data / "non-clinical_presentation_index.json")
+    mod.SCHEMA_PATH = str(data / "presentations_schema.json")
+    mod.SUMMARY_PATH = str(work / "presentation_build_summary.md")
+    mod.COMPACT_BUNDLE_PATH = str(work / "presentations.compact.json")
+    mod.ETIOLOGY_INDEX_PATH = str(work / "etiology_index.json")
+    mod.HPI_BITMAP_INDEX_PATH = str(work / "hpi_bitmap_index.json")
+    mod.MANIFEST_PATH = str(work / "manifest.json")
+    mod.DRY_RUN = False
+    # Everything clinical lands in todo/ so the fill stage has the whole list to work on
+    mod.SECTION_FOLDERS = {**mod.SECTION_FOLDERS, "Clinical Presentations": "clinical/todo"}
+    mod.main()
+    return int(_meta(data)["presentations"])
+
+
+def _run_fill(mod, data: Path, work: Path) -> int:
+    pages_path = data / "book_pages.json"
+    mod.TODO_DIR = work / "presentations" / "clinical" / "todo"
+    mod.discover_pdf_path = lambda: pages_path
+    mod.load_pdf_pages = lambda path: json.loads(Path(path).read_text(encoding="utf-8"))
+    mod.FILL_WORKERS = 1
+    mod.ATTACH_PROVENANCE = False
+    mod.WRITE_CHANGES = True
+    sys.argv = [mod.__file__]
+    filled: List[int] = []
+    fill = mod.fill_docs
+    mod.fill_docs = lambda *args, **kwargs: filled.append((counts := fill(*args, **kwargs))[1]) or counts
+    mod.main()
+    return filled[0]
+
+
+STAGES: List[bh.Stage] = [
+    bh.Stage(
+        "fix_parenthetical_etiologies",
+        "fix_parenthetical_etiologies",
+        (("repair pre-pass", "repair_stream"), ("normalize", "normalize_blocks")),
+        _run_fix,
+    ),
+    bh.Stage(
+        "write_presentation",
+        "write_presentation",
+        (("load", "load_json"), ("key resolution", "resolve_index_keys"), ("etiology walk", "iter_etiologies"),
+         ("writes", "write_json_atomically"), ("derived artifacts", "write_derived_artifacts")),
+        _run_write,
+    ),
+    bh.Stage(
+        "fill_clinical_todo_from_pdf",
+        "fill_clinical_todo_from_pdf",
+        (("load", "load_todo_docs"), ("chapter mapping", "build_chapter_blocks"),
+         ("token extraction", "extract_tokens"), ("item modifiers", "item_modifiers"), ("writes", "write_doc"),
+         ("validation", "validate_no_blanks")),
+        _run_fill,
+    ),
+]
+
+
+# -----------------------------
+# Datasets
+# -----------------------------
+def ensure_dataset(scale: int, seed: int, regen: bool = False) -> Path:
+    out = DATA_DIR / f"differentials-x{scale}-seed{seed}"
+    meta_path = out / "dataset.json"
+    if not regen and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if (
+            meta.get("generatorVersion") == synth.GENERATOR_VERSION
+            and meta.get("profile") == json.loads(json.dumps(synth.profile_source()))
+        ):
+            return out
+    if out.exists():
+        shutil.rmtree(out)
+    t0 = time.perf_counter()
+    meta = synth.generate(out, scale, seed)
+    print(
+        f"  generated {meta['presentations']:,} presentations / {meta['etiologies']:,} etiologies / "
+        f"{meta['bookPages']:,} pages in {time.perf_counter() - t0:.1f}s -> {out}"
+    )
+    return out
+
+
+def main() -> int:
+    return bh.suite_main(
+        __doc__, SUITE, __file__, STAGES, ensure_dataset,
+        scales=SCALES, seed=SEED, repeats=REPEATS, work_dir=WORK_DIR,
+        results_path=RESULTS_PATH, baseline_path=BASELINE_PATH, generator_version=synth.GENERATOR_VERSION,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,6 +13,11 @@ const CONFIG = {
 const PATHS = {
   PRESENTATION_LIST: "./Presentation_list.json",
   BASE_DIR: "./data/presentations",
+  COMPACT_BUNDLE: "./data/presentations.compact.json",
+  SCHEMA: "../assets/presentations_schema.json",
+  MANIFEST: "./data/manifest.json",
+  HPI_INDEX: "./data/hpi_bitmap_index.json",
+  ETIOLOGY_INDEX: "./data/etiology_index.json",
   INDEX_SOURCES: {
     clinical: "./clinical_presentation_index.json",
     nonClinical: "./non-clinical_presentation_index.json",
@@ -73,6 +78,15 @@ const SESSION = {
   filteredEntries: [],
 };
 
+const MANIFEST_VERSION = 2; // data/manifest.json format this file reads
+
+// Offline-derived tables from write_presentation.py (data/manifest.json); null when absent.
+const PRECOMPUTED = {
+  systemLabels: null,
+  systemChips: null,
+  chips: null,
+};
+
 /* ---------------------------------- Utils --------------------------------- */
 const $ = (s) => document.querySelector(s);
 const hostEl = () => $("#results") || $("#grid");
@@ -154,6 +168,29 @@ function deriveSystemChip(system) {
   return match ? match.label : null;
 }
 
+function systemLabelFor(system) {
+  const table = PRECOMPUTED.systemLabels;
+  if (table && typeof system === "string" && Object.prototype.hasOwnProperty.call(table, system)) return table[system];
+  return normalizeSystemLabel(system);
+}
+
+function systemChipFor(system) {
+  const table = PRECOMPUTED.systemChips;
+  if (table && Object.prototype.hasOwnProperty.call(table, system)) return table[system];
+  return deriveSystemChip(system);
+}
+
+function applyManifest(manifest) {
+  if (!manifest || typeof manifest !== "object" || manifest.version !== MANIFEST_VERSION) return;
+  if (manifest.systemLabels && typeof manifest.systemLabels === "object") {
+    PRECOMPUTED.systemLabels = manifest.systemLabels;
+  }
+  if (manifest.systemChips && typeof manifest.systemChips === "object") {
+    PRECOMPUTED.systemChips = manifest.systemChips;
+  }
+  if (Array.isArray(manifest.chips)) PRECOMPUTED.chips = manifest.chips;
+}
+
 function isCompactViewport() {
   return window.matchMedia("(max-width: 1199px)").matches;
 }
@@ -213,10 +250,12 @@ function dedupeItems(items) {
 
 function mapItem(it) {
   const name = String(it?.name ?? it?.etiology ?? it?.title ?? it?.label ?? "").trim();
-  const system = normalizeSystemLabel(it?.system ?? it?.category ?? it?.group ?? "");
+  const system = systemLabelFor(it?.system ?? it?.category ?? it?.group ?? "");
   const freqRaw = it?.freq ?? it?.frequency ?? it?.rank;
   const freq = freqRaw == null || freqRaw === "" ? undefined : String(freqRaw);
-  return { name: name || "—", system, freq };
+  const out = { name: name || "—", system, freq };
+  if (it?.systemChip !== undefined) out.systemChip = it.systemChip;
+  return out;
 }
 
 function normalizeEntry(title, section, data) {
@@ -239,13 +278,14 @@ function normalizeEntry(title, section, data) {
 function prepareEntry(entry) {
   const items = (entry.items || []).map((it) => ({
     ...it,
-    _systemChip: deriveSystemChip(it.system),
+    _systemChip: it.systemChip !== undefined ? it.systemChip : systemChipFor(it.system),
     _q: normalizeSearch(`${it.name} ${it.system} ${it.freq ?? ""}`),
   }));
 
   const out = {
     ...entry,
     items,
+    _chips: new Set(items.map((it) => it._systemChip).filter(Boolean)),
     _q: normalizeSearch(`${entry.title} ${entry.section}`),
     _isIncomplete: items.length === 0,
   };
@@ -321,6 +361,304 @@ function resolveIndexKey(title, indexObj, lookupMap) {
   return null;
 }
 
+/* ------------------------------ Compact Bundle ---------------------------- */
+// Mirrors differentials/presentation_codec.py (format "presentation-compact" v2).
+const COMPACT_FORMAT = { name: "presentation-compact", version: 2 };
+const DEFAULT_HPI_KEYS = [
+  "onset", "progression", "palliate", "provoke", "quality", "timing",
+  "region", "radiation", "severity", "clinical tests", "other symptoms",
+];
+
+function isPlainObject(v) {
+  return !!v && typeof v === "object" && !Array.isArray(v);
+}
+
+function enumOf(prop) {
+  return isPlainObject(prop) && isPlainObject(prop.items) && Array.isArray(prop.items.enum)
+    ? prop.items.enum.map(String)
+    : null;
+}
+
+// presentation_codec.load_enum_tables(): the HPI key order and enum tables this explorer expects.
+function schemaEnumTables(schema) {
+  let hpi = schema?.hpi;
+  if (!isPlainObject(hpi)) hpi = schema?.properties?.hpi;
+  if (!isPlainObject(hpi)) hpi = {};
+  const keys = Array.isArray(hpi.required) && hpi.required.length ? hpi.required.map(String) : [...DEFAULT_HPI_KEYS];
+  const props = isPlainObject(hpi.properties) ? hpi.properties : {};
+  const enums = {};
+  keys.forEach((key) => {
+    enums[key] = enumOf(props[key]) || enumOf(hpi[key]) || [];
+  });
+  return { keys, enums };
+}
+
+// EnumTables.schema_hash: sha256 of the sorted-key JSON of {keys, enums}, first 16 hex digits.
+async function enumTablesHash(tables) {
+  const enums = {};
+  Object.keys(tables.enums).sort().forEach((key) => {
+    enums[key] = tables.enums[key];
+  });
+  const bytes = new TextEncoder().encode(JSON.stringify({ enums, keys: tables.keys }));
+  const digest = await crypto.subtle.digest("SHA-256", bytes);
+  return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, "0")).join("").slice(0, 16);
+}
+
+// A bundle is only used when its enum tables and schemaHash match the current schema;
+// otherwise codes could decode into the wrong labels, so loading falls back to the per-file JSON.
+async function compactBundleMatchesSchema(bundle, schema) {
+  if (!bundle || !schema) return false;
+  const expected = schemaEnumTables(schema);
+  const same = JSON.stringify(bundle.hpiKeys) === JSON.stringify(expected.keys)
+    && expected.keys.every((key) => JSON.stringify(bundle.enums?.[key]) === JSON.stringify(expected.enums[key]));
+  if (!same) return false;
+  if (!globalThis.crypto?.subtle) return true; // non-secure context: the table comparison above is the check
+  return bundle.schemaHash === (await enumTablesHash(expected));
+}
+
+function decodeCompactPresentation(rec, bundle) {
+  const header = rec.header || {};
+  let items = rec.rawItems;
+
+  if (!("rawItems" in rec)) {
+    const cols = rec.cols;
+    const extras = rec.extras || {};
+    items = [];
+    for (let row = 0; row < rec.count; row += 1) {
+      const values = { name: cols.name[row] };
+      Object.entries(rec.labels).forEach(([field, table]) => {
+        values[field] = table[cols[field][row]];
+      });
+      const red = cols.redFlag[row];
+      values.redFlag = typeof red === "number" ? !!red : red.v;
+
+      const hpiShape = cols.hpiShape[row];
+      if (hpiShape >= 0) {
+        const hpi = {};
+        rec.hpiShapes[hpiShape].forEach((key) => {
+          const enc = cols.hpi[key][row];
+          const table = bundle.enums[key] || [];
+          hpi[key] = Array.isArray(enc)
+            ? enc.map((c) => (typeof c === "number" ? table[c] : c.v))
+            : enc.raw;
+        });
+        values.hpi = hpi;
+      }
+
+      Object.assign(values, extras[String(row)] || {});
+      const item = {};
+      rec.shapes[cols.shape[row]].forEach((key) => {
+        item[key] = values[key];
+      });
+      items.push(item);
+    }
+  }
+
+  const doc = {};
+  (rec.keys || []).forEach((key) => {
+    doc[key] = key === "items" ? items : header[key];
+  });
+  return doc;
+}
+
+function buildCompactLookup(bundle) {
+  const map = new Map();
+  if (!bundle || bundle.format !== COMPACT_FORMAT.name || bundle.version !== COMPACT_FORMAT.version) {
+    return map;
+  }
+  (bundle.presentations || []).forEach((rec) => {
+    if (rec?.path) map.set(`${PATHS.BASE_DIR}/${rec.path}`, rec);
+  });
+  return map;
+}
+
+/* ---------------------------- HPI Bitmap Index ---------------------------- */
+// Mirrors differentials/hpi_bitmap_index.py (format "hpi-bitmap-index" v1). Search text with
+// key=value terms ("onset=sudden AND region=ruq", NOT / OR / parentheses) is an HPI query:
+// the index is fetched on first use, bitmaps decode lazily into Uint32Array bitsets.
+const HPI_FORMAT = { name: "hpi-bitmap-index", version: 1 };
+const HPI_QUERY_RE = /[^\s=()]\s*=\s*[^\s=()]/;
+const HPI_TOKEN_RE = /\s*(\(|\)|\bAND\b|\bOR\b|\bNOT\b|[^()]+?(?=\s+(?:AND|OR)\b|\s*[()]|\s*$))/iy;
+const HPI = { index: null, pending: null, error: "", onReady: null, query: null, keys: null };
+
+function hpiItemKey(title, name) {
+  return `${String(title).toLowerCase()}\u0000${String(name).trim().toLowerCase()}`;
+}
+
+function decodeRuns(runs, words) {
+  const bits = new Uint32Array(words);
+  let pos = 0;
+  for (let i = 0; i + 1 < runs.length; i += 2) {
+    pos += runs[i];
+    for (const end = pos + runs[i + 1]; pos < end; pos += 1) bits[pos >>> 5] |= 1 << (pos & 31);
+  }
+  return bits;
+}
+
+function makeHpiIndex(payload) {
+  if (!payload || payload.format !== HPI_FORMAT.name || payload.version !== HPI_FORMAT.version) return null;
+  const words = Math.ceil(payload.count / 32);
+  const universe = decodeRuns([0, payload.count], words);
+  const decoded = new Map();
+  return {
+    payload,
+    words,
+    universe,
+    bitmap(key, value) {
+      const k = key.trim().toLowerCase();
+      const v = value.trim();
+      const perKey = payload.bitmaps[k];
+      if (!perKey) throw new Error(`Unknown HPI key: '${key.trim()}'`);
+      if (!Object.prototype.hasOwnProperty.call(perKey, v)) throw new Error(`'${v}' is not an enum value of '${k}'`);
+      const id = `${k}=${v}`;
+      if (!decoded.has(id)) decoded.set(id, decodeRuns(perKey[v], words));
+      return decoded.get(id);
+    },
+  };
+}
+
+function tokenizeHpiQuery(expr) {
+  const text = expr.trim();
+  const tokens = [];
+  let pos = 0;
+  while (pos < text.length) {
+    HPI_TOKEN_RE.lastIndex = pos;
+    const m = HPI_TOKEN_RE.exec(text);
+    if (!m || HPI_TOKEN_RE.lastIndex === pos) throw new Error(`Cannot parse query near: '${text.slice(pos)}'`);
+    const tok = m[1].trim();
+    const upper = tok.toUpperCase();
+    if (tok) tokens.push(upper === "AND" || upper === "OR" || upper === "NOT" ? upper : tok);
+    pos = HPI_TOKEN_RE.lastIndex;
+  }
+  return tokens;
+}
+
+// Same grammar as the CLI: NOT binds tightest, then AND, then OR.
+function evalHpiQuery(index, expr) {
+  const tokens = tokenizeHpiQuery(expr);
+  let pos = 0;
+  const combine = (a, b, op) => a.map((w, i) => op(w, b[i]));
+
+  function parseExpr() {
+    let out = parseTerm();
+    while (tokens[pos] === "OR") {
+      pos += 1;
+      out = combine(out, parseTerm(), (x, y) => x | y);
+    }
+    return out;
+  }
+  function parseTerm() {
+    let out = parseFactor();
+    while (tokens[pos] === "AND") {
+      pos += 1;
+      out = combine(out, parseFactor(), (x, y) => x & y);
+    }
+    return out;
+  }
+  function parseFactor() {
+    const tok = tokens[pos];
+    if (tok === undefined) throw new Error("Unexpected end of query");
+    pos += 1;
+    if (tok === "NOT") return combine(index.universe, parseFactor(), (u, x) => u & ~x);
+    if (tok === "(") {
+      const inner = parseExpr();
+      if (tokens[pos] !== ")") throw new Error("Missing closing parenthesis");
+      pos += 1;
+      return inner;
+    }
+    const eq = tok.indexOf("=");
+    if (eq < 0) throw new Error(`Expected key=value, got '${tok}'`);
+    return index.bitmap(tok.slice(0, eq), tok.slice(eq + 1));
+  }
+
+  const bits = parseExpr();
+  if (pos !== tokens.length) throw new Error(`Unexpected token '${tokens[pos]}'`);
+  return bits;
+}
+
+function hpiMatchKeys(index, bits) {
+  const { strings, presentations, items } = index.payload;
+  const keys = new Set();
+  bits.forEach((word, w) => {
+    for (let b = 0; word; b += 1, word >>>= 1) {
+      if (!(word & 1)) continue;
+      const [pres, nameId] = items[w * 32 + b];
+      keys.add(hpiItemKey(strings[presentations[pres][0]], strings[nameId]));
+    }
+  });
+  return keys;
+}
+
+function ensureHpiIndex() {
+  if (!HPI.pending) {
+    HPI.pending = fetchJSONOptional(PATHS.HPI_INDEX).then((payload) => {
+      HPI.index = makeHpiIndex(payload);
+      if (!HPI.index) HPI.error = "HPI queries need data/hpi_bitmap_index.json (built by write_presentation.py)";
+      if (HPI.onReady) HPI.onReady();
+    });
+  }
+  return HPI.pending;
+}
+
+// null: plain text search; otherwise the set of hpiItemKey()s the query matches.
+function hpiFilterFor(raw) {
+  const q = String(raw || "").trim();
+  if (!HPI_QUERY_RE.test(q)) return null;
+  if (!HPI.index) {
+    if (HPI.error) return null;
+    ensureHpiIndex();
+    return new Set();
+  }
+  if (HPI.query !== q) {
+    HPI.query = q;
+    try {
+      HPI.keys = hpiMatchKeys(HPI.index, evalHpiQuery(HPI.index, q));
+      HPI.error = "";
+    } catch (err) {
+      HPI.keys = new Set();
+      HPI.error = `HPI query: ${err.message}`;
+    }
+  }
+  return HPI.keys;
+}
+
+/* ----------------------------- Etiology Index ----------------------------- */
+// Mirrors differentials/etiology_index.py (format "etiology-reverse-index" v1): normalized
+// etiology name -> presentations listing it. Fetched when the detail panel first opens.
+const ETIOLOGY_FORMAT = { name: "etiology-reverse-index", version: 1 };
+const ETIOLOGY_ALSO_IN_LIMIT = 3;
+const ETIOLOGY = { index: null, pending: null, onReady: null };
+
+// Same key as text_normalize.etiology_key (py/text_normalize.py): "Pancreatitis (acute)" -> "pancreatitis acute".
+function normalizeEtiology(name) {
+  return String(name || "")
+    .normalize("NFKD")
+    .replace(/[^\x00-\x7f]/g, "")
+    .toLowerCase()
+    .replace(/[^a-z0-9]+/g, " ")
+    .trim();
+}
+
+function ensureEtiologyIndex() {
+  if (!ETIOLOGY.pending) {
+    ETIOLOGY.pending = fetchJSONOptional(PATHS.ETIOLOGY_INDEX).then((payload) => {
+      if (!payload || payload.format !== ETIOLOGY_FORMAT.name || payload.version !== ETIOLOGY_FORMAT.version) return;
+      ETIOLOGY.index = payload;
+      if (ETIOLOGY.onReady) ETIOLOGY.onReady();
+    });
+  }
+  return ETIOLOGY.pending;
+}
+
+// Other presentations listing this etiology (by title), in index order; null until the index loads.
+function otherPresentationsFor(name, title) {
+  const idx = ETIOLOGY.index;
+  if (!idx) return null;
+  const rows = idx.index[normalizeEtiology(name)] || [];
+  const own = String(title).toLowerCase();
+  return uniq(rows.map((row) => idx.strings[idx.presentations[row[0]][0]])).filter((t) => t.toLowerCase() !== own);
+}
+
 /* ------------------------------ File Fallback ----------------------------- */
 function candidateSlugsForTitle(title) {
   return uniq([
@@ -346,8 +684,14 @@ function candidateURLsForTitle(section, title) {
   return uniq(urls);
 }
 
-async function loadFromPresentationFile(section, title) {
+async function loadFromPresentationFile(section, title, compact) {
   const urls = candidateURLsForTitle(section, title);
+  if (compact?.lookup.size) {
+    for (const url of urls) {
+      const rec = compact.lookup.get(url);
+      if (rec) return normalizeEntry(title, section, decodeCompactPresentation(rec, compact.bundle));
+    }
+  }
   for (const url of urls) {
     const data = await fetchJSONOptional(url);
     if (data) return normalizeEntry(title, section, data);
@@ -357,12 +701,21 @@ async function loadFromPresentationFile(section, title) {
 
 /* ------------------------------ Data Loading ------------------------------ */
 async function loadData(onProgress) {
-  const [presentationList, clinicalIndex, nonClinicalIndex] = await Promise.all([
+  const [presentationList, clinicalIndex, nonClinicalIndex, compactBundle, manifest, schema] = await Promise.all([
     fetchJSON(PATHS.PRESENTATION_LIST),
     fetchJSONOptional(PATHS.INDEX_SOURCES.clinical),
     fetchJSONOptional(PATHS.INDEX_SOURCES.nonClinical),
+    fetchJSONOptional(PATHS.COMPACT_BUNDLE),
+    fetchJSONOptional(PATHS.MANIFEST),
+    fetchJSONOptional(PATHS.SCHEMA),
   ]);
 
+  applyManifest(manifest);
+
+  const bundle = (await compactBundleMatchesSchema(compactBundle, schema)) ? compactBundle : null;
+  if (compactBundle && !bundle) console.warn("Compact bundle does not match the presentations schema; loading per-file JSON");
+  const compact = { bundle, lookup: buildCompactLookup(bundle) };
+
   const indexBySource = {
     clinical: clinicalIndex,
     nonClinical: nonClinicalIndex,
@@ -398,7 +751,7 @@ async function loadData(onProgress) {
         }
       }
 
-      const fromFile = await loadFromPresentationFile(section, title);
+      const fromFile = await loadFromPresentationFile(section, title, compact);
       return prepareEntry(fromFile);
     },
     onProgress
@@ -444,15 +797,21 @@ function renderSystemsChips(allSystems, onChange) {
 }
 
 function applyFilters(entries) {
-  const q = normalizeSearch(UI.q.trim());
+  const hpiKeys = hpiFilterFor(UI.q);
+  const q = hpiKeys ? "" : normalizeSearch(UI.q.trim());
   const hasSystemFilter = UI.systems.size > 0;
 
   return entries
     .filter((e) => !UI.section || e.section === UI.section)
     .map((e) => {
-      const bySystem = hasSystemFilter
-        ? (e.items || []).filter((it) => it._systemChip && UI.systems.has(it._systemChip))
-        : [...(e.items || [])];
+      let bySystem = [...(e.items || [])];
+      if (hasSystemFilter) {
+        // Entries without any selected chip skip the per-item scan
+        const any = [...UI.systems].some((chip) => e._chips.has(chip));
+        bySystem = any ? bySystem.filter((it) => it._systemChip && UI.systems.has(it._systemChip)) : [];
+      }
+
+      if (hpiKeys) bySystem = bySystem.filter((it) => hpiKeys.has(hpiItemKey(e.title, it.name)));
 
       const titleHit = q ? e._q.includes(q) : false;
       const itemHits = q ? bySystem.filter((it) => it._q.includes(q)) : bySystem;
@@ -479,13 +838,14 @@ function emptyNode() {
   return d;
 }
 
-function buildEtiologyTable(items) {
+function buildEtiologyTable(items, title) {
   const table = document.createElement("table");
   table.className = "soft-table";
+  const withAlsoIn = !!ETIOLOGY.index;
 
   const thead = document.createElement("thead");
   const headRow = document.createElement("tr");
-  const headers = ["Etiology", "System", "Frequency"];
+  const headers = withAlsoIn ? ["Etiology", "System", "Frequency", "Also in"] : ["Etiology", "System", "Frequency"];
 
   headers.forEach((label) => {
     const th = document.createElement("th");
@@ -511,6 +871,16 @@ function buildEtiologyTable(items) {
     tdFreq.textContent = it.freq ?? "—";
     tr.appendChild(tdFreq);
 
+    if (withAlsoIn) {
+      const others = otherPresentationsFor(it.name, title);
+      const tdAlso = document.createElement("td");
+      const shown = others.slice(0, ETIOLOGY_ALSO_IN_LIMIT).join(", ");
+      const more = others.length - ETIOLOGY_ALSO_IN_LIMIT;
+      tdAlso.textContent = others.length ? `${shown}${more > 0 ? ` +${more}` : ""}` : "—";
+      if (more > 0) tdAlso.title = others.join(", ");
+      tr.appendChild(tdAlso);
+    }
+
     tbody.appendChild(tr);
   });
 
@@ -575,7 +945,11 @@ function renderDetailPanel(entries) {
     note.textContent = "This presentation is listed but the differential set has not been completed yet.";
     bodyEl.appendChild(note);
   } else {
-    bodyEl.appendChild(buildEtiologyTable(selected.items));
+    bodyEl.appendChild(buildEtiologyTable(selected.items, selected.title));
+    if (!ETIOLOGY.pending) {
+      ETIOLOGY.onReady = () => renderDetailPanel(SESSION.filteredEntries);
+      ensureEtiologyIndex();
+    }
   }
 
   bodyEl.hidden = false;
@@ -652,6 +1026,7 @@ function render(entries) {
 
   const filtered = applyFilters(entries);
   SESSION.filteredEntries = filtered;
+  if (HPI.error && HPI_QUERY_RE.test(UI.q)) setError(HPI.error);
 
   if (SESSION.selectedKey && !filtered.some((entry) => entry._key === SESSION.selectedKey)) {
     SESSION.selectedKey = null;
@@ -672,13 +1047,16 @@ function wireUI(data) {
   const btnCloseDetail = $("#btnCloseDetail");
   const detailScrim = detailScrimEl();
 
-  const systemsAll = uniqSorted(
-    data
-      .flatMap((e) => (e.items || []).map((it) => it._systemChip || ""))
-      .filter(Boolean)
-  );
+  const systemsAll = PRECOMPUTED.chips
+    ? [...PRECOMPUTED.chips]
+    : uniqSorted(
+        data
+          .flatMap((e) => (e.items || []).map((it) => it._systemChip || ""))
+          .filter(Boolean)
+      );
 
   const rerender = () => render(data);
+  HPI.onReady = rerender;
   renderSystemsChips(systemsAll, rerender);
 
   document.body.classList.add("compact");
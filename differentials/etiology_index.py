@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Reverse etiology index: normalized etiology name -> presentations listing it.
+
+Built from the presentation files under `data/presentations` and written as a
+compact JSON artifact; the explorer's detail panel reads it for its "Also in"
+column (differentials_app.js mirrors text_normalize.etiology_key). Repeated strings
+(presentation titles, paths, systems, freqs, display names) are interned into
+a single string table; each postings row is a tuple of table indices.
+
+Usage:
+  python3 etiology_index.py                 # rebuild the artifact
+  python3 etiology_index.py pancreatitis    # query (exact normalized match)
+  python3 etiology_index.py --contains pan  # substring match over index keys
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import py_path  # noqa: F401  (puts <repo>/py on sys.path)
+from text_normalize import etiology_key as normalize_etiology
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+DIFFERENTIALS_DIR = Path(__file__).resolve().parent
+PRESENTATIONS_DIR = DIFFERENTIALS_DIR / "data" / "presentations"
+INDEX_PATH = DIFFERENTIALS_DIR / "data" / "etiology_index.json"
+
+FORMAT_NAME = "etiology-reverse-index"
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class EtiologyHit:
+    presentation: str
+    path: str
+    name: str
+    system: str
+    freq: str
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: Any) -> int:
+        text = "" if value is None else str(value)
+        idx = self._ids.get(text)
+        if idx is None:
+            idx = len(self.strings)
+            self._ids[text] = idx
+            self.strings.append(text)
+        return idx
+
+
+def iter_presentation_docs(root: Path) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    for path in sorted(Path(root).rglob("*.json")):
+        if path.name.startswith("."):
+            continue
+        try:
+            doc = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"! Skipping unreadable {path}: {e}")
+            continue
+        if isinstance(doc, dict):
+            yield path.relative_to(root).as_posix(), doc
+
+
+def build_index(root: Path = PRESENTATIONS_DIR) -> Dict[str, Any]:
+    strings = _StringTable()
+    presentations: List[List[int]] = []
+    postings: Dict[str, List[List[int]]] = {}
+
+    for rel_path, doc in iter_presentation_docs(root):
+        pres_idx = len(presentations)
+        presentations.append([strings.intern(doc.get("presentation", "")), strings.intern(rel_path)])
+        seen = set()
+        for item in doc.get("items") or []:
+            if not isinstance(item, dict):
+                continue
+            key = normalize_etiology(item.get("name", ""))
+            if not key:
+                continue
+            row = [
+                pres_idx,
+                strings.intern(item.get("name", "")),
+                strings.intern(item.get("system", "")),
+                strings.intern(item.get("freq", "")),
+            ]
+            sig = (key, row[2], row[3])
+            if sig in seen:
+                continue
+            seen.add(sig)
+            postings.setdefault(key, []).append(row)
+
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "strings": strings.strings,
+        "presentations": presentations,
+        "index": {k: postings[k] for k in sorted(postings)},
+    }
+
+
+def write_index(root: Path, dest_path: Path) -> Dict[str, Any]:
+    payload = build_index(root)
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest_path.with_name(dest_path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(dest_path)
+    return payload
+
+
+class EtiologyIndex:
+    """Query API over a built reverse index (dict lookups, no corpus scan)."""
+
+    def __init__(self, payload: Dict[str, Any]):
+        if payload.get("format") != FORMAT_NAME or payload.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format: {payload.get('format')} v{payload.get('version')}")
+        self._strings: List[str] = payload["strings"]
+        self._presentations: List[List[int]] = payload["presentations"]
+        self._index: Dict[str, List[List[int]]] = payload["index"]
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "EtiologyIndex":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    @classmethod
+    def build(cls, root: Path = PRESENTATIONS_DIR) -> "EtiologyIndex":
+        return cls(build_index(root))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_etiology(name) in self._index
+
+    def names(self) -> List[str]:
+        return list(self._index)
+
+    def _hit(self, row: List[int]) -> EtiologyHit:
+        s = self._strings
+        title_id, path_id = self._presentations[row[0]]
+        return EtiologyHit(s[title_id], s[path_id], s[row[1]], s[row[2]], s[row[3]])
+
+    def lookup(self, name: str) -> List[EtiologyHit]:
+        return [self._hit(row) for row in self._index.get(normalize_etiology(name), [])]
+
+    def presentations_for(self, name: str) -> List[str]:
+        out: List[str] = []
+        for hit in self.lookup(name):
+            if hit.presentation not in out:
+                out.append(hit.presentation)
+        return out
+
+    def contains(self, fragment: str) -> Dict[str, List[EtiologyHit]]:
+        """Substring search over normalized keys (scans keys, not presentation files)."""
+        needle = normalize_etiology(fragment)
+        return {k: [self._hit(r) for r in rows] for k, rows in self._index.items() if needle and needle in k}
+
+
+def print_hits(key: str, hits: List[EtiologyHit]) -> None:
+    print(f"{key}: {len(hits)} listing(s)")
+    for hit in hits:
+        print(f"  - {hit.presentation} | {hit.system or '—'} | {hit.freq or '—'} | {hit.path}")
+
+
+def main() -> int:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        payload = write_index(PRESENTATIONS_DIR, INDEX_PATH)
+        print(f"Wrote {INDEX_PATH} ({len(payload['index'])} etiologies, {len(payload['strings'])} strings)")
+        return 0
+
+    index = EtiologyIndex.load(INDEX_PATH) if INDEX_PATH.exists() else EtiologyIndex.build(PRESENTATIONS_DIR)
+    query = " ".join(args)
+    if "--contains" in sys.argv:
+        matches = index.contains(query)
+        if not matches:
+            print(f"No etiologies contain '{query}'.")
+            return 1
+        for key, hits in matches.items():
+            print_hits(key, hits)
+        return 0
+
+    hits = index.lookup(query)
+    if not hits:
+        print(f"No presentations list '{query}'.")
+        return 1
+    print_hits(normalize_etiology(query), hits)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -14,12 +14,27 @@ from __future__ import annotations
 
 import copy
 import json
+import os
 import re
-import subprocess
-import unicodedata
+import sys
+import time
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Dict, Iterable, List, Sequence, Set, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+
+try:  # Python 3.11+ moved the regex parser; it is only used to derive prefilter literals.
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+from pdf_page_store import CACHE_ROOT, PageStore, open_page_store
+from pocketbook_fts import PocketbookIndex, ensure_index, evidence_rows
+
+# Shared normalization rules live in <repo>/py/text_normalize.py
+import py_path  # noqa: F401
+from text_normalize import ascii_key as norm_text, ascii_slug as slugify, clean_heading_line
 
 
 # -----------------------------
@@ -34,12 +49,19 @@ PDF_SEARCH_GLOB_NAME = "Pocketbook of Differential Diagnosis (2021).pdf"
 TODO_DIR = Path(
     "/Users/claytongoddard/Git dub/Clerkship_tools_v2/differentials/data/presentations/clinical/todo"
 )
-TEXT_CACHE_PATH = Path("/tmp/pocketbook_differential_text.txt")
+PAGE_CACHE_DIR = CACHE_ROOT  # pdf_page_store.py default; keyed by PDF content hash
 
 WRITE_CHANGES = True
 FORCE_REWRITE_HPI = True
 MIN_CONTENT_PAGE = 20
 HEADING_SCAN_LINES = 35
+FILL_WORKERS = 0  # Processes for fill_docs; 0 = one per core, 1 = serial.
+ATTACH_PROVENANCE = False  # Store supporting book lines per item under "provenance" (pocketbook_fts.py).
+PROVENANCE_LIMIT = 3
+PROFILE = False  # Or pass --profile; writes PROFILE_JSON_PATH and PROFILE_REPORT_PATH.
+PROFILE_JSON_PATH = Path("/tmp/fill_clinical_profile.json")
+PROFILE_REPORT_PATH = Path("/tmp/fill_clinical_profile.txt")
+PROFILE_TOP_N = 25
 
 
 HPI_KEYS: Sequence[str] = (
@@ -103,29 +125,6 @@ VALUE_LIMITS: Dict[str, int] = {
 }
 
 
-def norm_text(value: str) -> str:
-    value = unicodedata.normalize("NFKD", value)
-    value = "".join(ch for ch in value if ord(ch) < 128)
-    value = value.lower()
-    value = re.sub(r"[^a-z0-9]+", "", value)
-    return value
-
-
-def slugify(value: str) -> str:
-    value = unicodedata.normalize("NFKD", value)
-    value = "".join(ch for ch in value if ord(ch) < 128)
-    value = value.lower().strip()
-    value = re.sub(r"[^a-z0-9]+", "-", value).strip("-")
-    return re.sub(r"-{2,}", "-", value)
-
-
-def clean_heading_line(line: str) -> str:
-    line = line.strip()
-    line = re.sub(r"^\d+\s+", "", line)
-    line = re.sub(r"\s+\d+$", "", line)
-    return line.strip(" -\t")
-
-
 def dedupe(values: Iterable[str]) -> List[str]:
     seen: Set[str] = set()
     out: List[str] = []
@@ -136,6 +135,120 @@ def dedupe(values: Iterable[str]) -> List[str]:
     return out
 
 
+# -----------------------------
+# Opt-in profiling (--profile)
+# -----------------------------
+
+class FillProfiler:
+    """Stage timers, TOKEN_RULES counters, heuristic branch counters and per-document timings.
+
+    Disabled by default: stage() hands back a shared no-op context, and the rule
+    engine and the fallback/modifier heuristics only record behind `enabled` checks.
+    Profiling runs fill_docs serially so every counter lands in this process.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.stages: Dict[str, List[float]] = {}
+        # (key, rule index) -> [pattern, evaluated, prefilter rejects, regex runs, hits, seconds]
+        self.rules: Dict[Tuple[str, int], List] = {}
+        self.branch_counts: Dict[str, List[int]] = {}  # group:name -> [evaluated, fired]
+        self.documents: List[Dict[str, object]] = []
+
+    def stage(self, name: str):
+        return self._timed(name) if self.enabled else _NO_PROFILE
+
+    @contextmanager
+    def _timed(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            row = self.stages.setdefault(name, [0, 0.0])
+            row[0] += 1
+            row[1] += time.perf_counter() - t0
+
+    def branches(self, group: str, fires: Dict[str, bool]) -> None:
+        """Count one evaluation of a heuristic's named conditions and which of them held."""
+        for name, fired in fires.items():
+            row = self.branch_counts.setdefault(f"{group}:{name}", [0, 0])
+            row[0] += 1
+            if fired:
+                row[1] += 1
+
+    def rule(self, key: str, idx: int, pattern: str, prefiltered: bool, hit: bool, seconds: float) -> None:
+        row = self.rules.get((key, idx))
+        if row is None:
+            row = self.rules[(key, idx)] = [pattern, 0, 0, 0, 0, 0.0]
+        row[1] += 1
+        if prefiltered:
+            row[2] += 1
+        else:
+            row[3] += 1
+        if hit:
+            row[4] += 1
+        row[5] += seconds
+
+    def document(self, name: str, items: int, seconds: float) -> None:
+        self.documents.append({"document": name, "items": items, "seconds": seconds})
+
+    def to_json(self) -> Dict[str, object]:
+        rules = [
+            {"key": key, "rule": idx, "pattern": row[0], "evaluated": row[1], "prefilterRejected": row[2],
+             "regexRuns": row[3], "hits": row[4], "seconds": row[5]}
+            for (key, idx), row in self.rules.items()
+        ]
+        never = [
+            {"key": key, "rule": idx, "pattern": pattern}
+            for key, rules_for_key in TOKEN_ENGINE.rules.items()
+            for idx, rule in enumerate(rules_for_key)
+            if (key, idx) not in self.rules or not self.rules[(key, idx)][4]
+            for pattern in (rule.regex.pattern,)
+        ]
+        return {
+            "stages": {name: {"calls": c, "seconds": t} for name, (c, t) in self.stages.items()},
+            "rules": sorted(rules, key=lambda r: -r["seconds"]),
+            "rulesNeverHit": never,
+            "branches": {name: {"evaluated": e, "fired": f} for name, (e, f) in sorted(self.branch_counts.items())},
+            "documents": sorted(self.documents, key=lambda d: -d["seconds"]),
+        }
+
+    def report(self, top: int = PROFILE_TOP_N) -> str:
+        data = self.to_json()
+        lines = ["=== Stages (wall time) ==="]
+        for name, row in sorted(data["stages"].items(), key=lambda kv: -kv[1]["seconds"]):
+            lines.append(f"{row['seconds'] * 1000:10.1f} ms  x{row['calls']:<5} {name}")
+        lines.append(f"\n=== TOKEN_RULES by match time (top {top}) ===")
+        lines.append(f"{'ms':>9} {'eval':>7} {'regex':>7} {'hits':>6}  rule")
+        for r in data["rules"][:top]:
+            lines.append(
+                f"{r['seconds'] * 1000:9.2f} {r['evaluated']:7d} {r['regexRuns']:7d} {r['hits']:6d}  {r['key']}#{r['rule']} {r['pattern']}"
+            )
+        lines.append(f"\n=== TOKEN_RULES that never matched ({len(data['rulesNeverHit'])}) ===")
+        lines.extend(f"  {r['key']}#{r['rule']} {r['pattern']}" for r in data["rulesNeverHit"])
+        lines.append("\n=== Heuristic branches (fired / evaluated) ===")
+        for name, row in sorted(data["branches"].items(), key=lambda kv: -kv[1]["fired"]):
+            flag = "  never fired" if not row["fired"] else ""
+            lines.append(f"{row['fired']:7d} / {row['evaluated']:<7d} {name}{flag}")
+        lines.append(f"\n=== Slowest documents (top {top}) ===")
+        for d in data["documents"][:top]:
+            lines.append(f"{d['seconds'] * 1000:9.1f} ms  {d['items']:4d} items  {d['document']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, json_path: Path, report_path: Path) -> str:
+        json_path.write_text(json.dumps(self.to_json(), indent=2), encoding="utf-8")
+        text = self.report()
+        report_path.write_text(text, encoding="utf-8")
+        return text
+
+
+_NO_PROFILE = nullcontext()
+PROFILER = FillProfiler()
+
+
 def discover_pdf_path() -> Path:
     if PDF_PATH.exists():
         return PDF_PATH
@@ -147,14 +260,9 @@ def discover_pdf_path() -> Path:
     return matches[0]
 
 
-def load_pdf_text(pdf_path: Path) -> str:
-    if TEXT_CACHE_PATH.exists():
-        return TEXT_CACHE_PATH.read_text(errors="ignore")
-
-    cmd = ["pdftotext", "-layout", str(pdf_path), "-"]
-    text = subprocess.check_output(cmd).decode("utf-8", "ignore")
-    TEXT_CACHE_PATH.write_text(text)
-    return text
+def load_pdf_pages(pdf_path: Path) -> PageStore:
+    """Per-page text (0-indexed) from the content-addressed page cache."""
+    return open_page_store(pdf_path, PAGE_CACHE_DIR)
 
 
 def heading_variants(presentation: str) -> Set[str]:
@@ -174,42 +282,41 @@ def heading_variants(presentation: str) -> Set[str]:
     return {norm_text(v) for v in variants}
 
 
-def has_causes_marker(page: str, next_page: str | None) -> bool:
-    if re.search(r"^\s*CAUSES(?:\s|$)", page, re.MULTILINE):
-        return True
-    if next_page and re.search(r"^\s*CAUSES(?:\s|$)", next_page, re.MULTILINE):
-        return True
-    return False
+CAUSES_MARKER_RE = re.compile(r"^\s*CAUSES(?:\s|$)", re.MULTILINE)
+NON_LETTERS_RE = re.compile(r"[^A-Za-z]+")
+
 
+def iter_heading_lines(page: str) -> Iterable[str]:
+    """Cleaned all-caps lines near the top of a page (candidate chapter headings)."""
+    for line in page.splitlines()[:HEADING_SCAN_LINES]:
+        cleaned = clean_heading_line(line)
+        if not cleaned:
+            continue
+        if cleaned[0] in {"●", "•", "-"}:
+            continue
+        letters = NON_LETTERS_RE.sub("", cleaned)
+        if not letters or letters != letters.upper():
+            continue
+        yield cleaned
 
-def find_start_page(pages: Sequence[str], presentation: str) -> int | None:
-    variants = heading_variants(presentation)
-    candidates: List[int] = []
 
+def build_heading_index(pages: Sequence[str]) -> Dict[str, List[int]]:
+    """One pass over the book: normalized all-caps heading -> CAUSES pages (1-based, ascending)."""
+    markers = [bool(CAUSES_MARKER_RE.search(page)) for page in pages]
+    index: Dict[str, List[int]] = defaultdict(list)
     for i in range(MIN_CONTENT_PAGE, len(pages) + 1):
-        page = pages[i - 1]
-        next_page = pages[i] if i < len(pages) else None
-        if not has_causes_marker(page, next_page):
+        if not (markers[i - 1] or (i < len(pages) and markers[i])):
             continue
+        for cleaned in iter_heading_lines(pages[i - 1]):
+            hits = index[norm_text(cleaned)]
+            if not hits or hits[-1] != i:
+                hits.append(i)
+    return dict(index)
 
-        lines = page.splitlines()[:HEADING_SCAN_LINES]
-        for line in lines:
-            cleaned = clean_heading_line(line)
-            if not cleaned:
-                continue
-            if cleaned[0] in {"●", "•", "-"}:
-                continue
-            letters = re.sub(r"[^A-Za-z]+", "", cleaned)
-            if not letters or letters != letters.upper():
-                continue
-            if norm_text(cleaned) in variants:
-                candidates.append(i)
-                break
 
-    if not candidates:
-        return None
-
-    return min(candidates)
+def lookup_start_page(heading_index: Dict[str, List[int]], presentation: str) -> int | None:
+    starts = [heading_index[v][0] for v in heading_variants(presentation) if v in heading_index]
+    return min(starts) if starts else None
 
 
 def build_chapter_blocks(
@@ -218,8 +325,9 @@ def build_chapter_blocks(
     starts: Dict[str, int] = {}
     missing_targets: List[str] = []
 
+    heading_index = build_heading_index(pages)
     for presentation in dedupe(boundary_presentations):
-        start = find_start_page(pages, presentation)
+        start = lookup_start_page(heading_index, presentation)
         if start is not None:
             starts[presentation] = start
 
@@ -511,23 +619,132 @@ TOKEN_RULES: Dict[str, Sequence[Tuple[str, Sequence[str]]]] = {
 }
 
 
+def _required_literals(items: Iterable) -> FrozenSet[str] | None:
+    """Literals of which every match must contain at least one, or None if none can be proven.
+
+    Walks the parsed regex: a run of LITERAL ops (zero-width AT ops like \\b do not
+    break it) is required as-is; a BRANCH requires the union of its alternatives;
+    groups and repeats with min >= 1 inherit their body's requirement. The
+    candidate whose shortest literal is longest wins.
+    """
+    candidates: List[FrozenSet[str]] = []
+    run: List[str] = []
+
+    def flush() -> None:
+        if run:
+            candidates.append(frozenset({"".join(run)}))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if op is sre_parse.AT:
+            continue
+        flush()
+        sub: FrozenSet[str] | None = None
+        if op is sre_parse.SUBPATTERN:
+            sub = _required_literals(av[-1])
+        elif op is sre_parse.BRANCH:
+            alts = [_required_literals(alt) for alt in av[1]]
+            if all(alts):
+                sub = frozenset().union(*alts)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            sub = _required_literals(av[2])
+        if sub:
+            candidates.append(sub)
+    flush()
+    if not candidates:
+        return None
+    return max(candidates, key=lambda lits: (min(map(len, lits)), -len(lits)))
+
+
+class CompiledRule:
+    __slots__ = ("regex", "tokens", "literals")
+
+    def __init__(self, pattern: str, tokens: Sequence[str]):
+        self.regex = re.compile(pattern)
+        self.tokens = tuple(tokens)
+        try:
+            self.literals = _required_literals(sre_parse.parse(pattern))
+        except Exception:
+            self.literals = None  # No prefilter; always confirm with the regex.
+
+    def matches(self, text: str) -> bool:
+        if self.literals is not None and not any(lit in text for lit in self.literals):
+            return False
+        return self.regex.search(text) is not None
+
+
+class TokenRuleEngine:
+    """Compiled TOKEN_RULES: substring prefilter, then regex confirmation, in rule order.
+
+    Returns exactly what the per-rule scan returns: tokens in rule order, deduped,
+    truncated to `max_per_key`. Once a key holds `max_per_key` distinct tokens the
+    remaining rules for it are skipped, since they could only append after the cut.
+    """
+
+    def __init__(self, rules: Dict[str, Sequence[Tuple[str, Sequence[str]]]]):
+        self.rules: Dict[str, Tuple[CompiledRule, ...]] = {
+            key: tuple(CompiledRule(pattern, tokens) for pattern, tokens in key_rules)
+            for key, key_rules in rules.items()
+        }
+
+    def extract(
+        self,
+        text: str,
+        include_keys: Set[str] | None = None,
+        max_per_key: int | None = None,
+    ) -> Dict[str, List[str]]:
+        if PROFILER.enabled:
+            return self._extract_profiled(text, include_keys, max_per_key)
+        text = text.lower()
+        out: Dict[str, List[str]] = defaultdict(list)
+        for key, rules in self.rules.items():
+            if include_keys is not None and key not in include_keys:
+                continue
+            found: List[str] = []
+            for rule in rules:
+                if max_per_key is not None and len(found) >= max_per_key:
+                    break
+                if rule.matches(text):
+                    found.extend(tok for tok in rule.tokens if tok not in found)
+            out[key] = found if max_per_key is None else found[:max_per_key]
+        return out
+
+    def _extract_profiled(
+        self, text: str, include_keys: Set[str] | None, max_per_key: int | None
+    ) -> Dict[str, List[str]]:
+        """Same result as extract(), recording per-rule counters and match time."""
+        text = text.lower()
+        out: Dict[str, List[str]] = defaultdict(list)
+        clock = time.perf_counter
+        for key, rules in self.rules.items():
+            if include_keys is not None and key not in include_keys:
+                continue
+            found: List[str] = []
+            for idx, rule in enumerate(rules):
+                if max_per_key is not None and len(found) >= max_per_key:
+                    break
+                t0 = clock()
+                prefiltered = rule.literals is not None and not any(lit in text for lit in rule.literals)
+                matched = not prefiltered and rule.regex.search(text) is not None
+                PROFILER.rule(key, idx, rule.regex.pattern, prefiltered, matched, clock() - t0)
+                if matched:
+                    found.extend(tok for tok in rule.tokens if tok not in found)
+            out[key] = found if max_per_key is None else found[:max_per_key]
+        return out
+
+
+TOKEN_ENGINE = TokenRuleEngine(TOKEN_RULES)
+
+
 def extract_tokens(
     text: str,
     include_keys: Set[str] | None = None,
     max_per_key: int | None = None,
 ) -> Dict[str, List[str]]:
-    text = text.lower()
-    out: Dict[str, List[str]] = defaultdict(list)
-    for key, rules in TOKEN_RULES.items():
-        if include_keys is not None and key not in include_keys:
-            continue
-        for pattern, tokens in rules:
-            if re.search(pattern, text):
-                out[key].extend(tokens)
-        out[key] = dedupe(out[key])
-        if max_per_key is not None:
-            out[key] = out[key][:max_per_key]
-    return out
+    return TOKEN_ENGINE.extract(text, include_keys=include_keys, max_per_key=max_per_key)
 
 
 def merge_hpi(base: Dict[str, List[str]], addition: Dict[str, List[str]]) -> Dict[str, List[str]]:
@@ -542,82 +759,95 @@ def make_blank_hpi() -> Dict[str, List[str]]:
     return {key: [] for key in HPI_KEYS}
 
 
+# Presentation-slug substrings that select each presentation_fallbacks() branch.
+FALLBACK_TRIGGERS: Dict[str, Tuple[str, ...]] = {
+    "headache": ("headache",),
+    "diarr": ("diarr", "constipation", "steator"),
+    "dysphagia": ("dysphagia", "throat", "voice"),
+    "ear": ("ear", "deafness"),
+    "eye": ("eye", "visual"),
+    "neck": ("neck",),
+    "leg": ("leg",),
+    "foot": ("foot",),
+    "backache": ("backache",),
+    "joint": ("joint",),
+    "hematuria": ("hematuria", "polyuria", "urinary", "urethral", "kidney", "vaginal-discharge"),
+    "dyspnoea": ("dyspnoea", "hemoptysis", "cyanosis", "palpitations", "shock"),
+    "ascites": ("ascites", "hepatomegaly", "splenomegaly", "jaundice", "hematemesis"),
+    "hirsutism": ("hirsutism", "gynecomastia", "pruritus"),
+    "coma": ("coma", "hallucinations", "tremor"),
+}
+
+
 def presentation_fallbacks(presentation: str) -> Dict[str, List[str]]:
     slug = slugify(presentation)
     hpi = make_blank_hpi()
+    fires = {name: any(key in slug for key in keys) for name, keys in FALLBACK_TRIGGERS.items()}
+    if PROFILER.enabled:
+        PROFILER.branches("fallback", fires)
 
-    if "headache" in slug:
+    if fires["headache"]:
         hpi["region"] = ["scalp"]
         hpi["quality"] = ["throbbing"]
         hpi["timing"] = ["intermittent"]
         hpi["clinical tests"] = ["cranial-nerve-exam"]
         hpi["other symptoms"] = ["nausea", "photophobia"]
-    if "diarr" in slug or "constipation" in slug or "steator" in slug:
+    if fires["diarr"]:
         hpi["region"] = ["abdomen"]
         hpi["quality"] = ["cramping"]
         hpi["timing"] = ["intermittent"]
         hpi["clinical tests"] = ["palpation", "auscultation"]
         hpi["other symptoms"] = ["abdominal-pain"]
-    if "dysphagia" in slug or "throat" in slug or "voice" in slug:
+    if fires["dysphagia"]:
         hpi["region"] = ["neck"]
         hpi["clinical tests"] = ["palpation"]
         hpi["other symptoms"] = ["odynophagia", "sore-throat"]
-    if "ear" in slug or "deafness" in slug:
+    if fires["ear"]:
         hpi["region"] = ["face"]
         hpi["clinical tests"] = ["otoscopy", "weber-test", "rinne-test"]
         hpi["other symptoms"] = ["deafness"]
-    if "eye" in slug or "visual" in slug:
+    if fires["eye"]:
         hpi["clinical tests"] = ["slit-lamp-exam", "visual-field-test"]
         hpi["other symptoms"] = ["visual-problem"]
-    if "neck" in slug:
+    if fires["neck"]:
         hpi["region"] = ["neck"]
         hpi["clinical tests"] = ["palpation"]
         hpi["other symptoms"] = ["neck-pain"]
-    if "leg" in slug:
+    if fires["leg"]:
         hpi["region"] = ["leg"]
         hpi["clinical tests"] = ["inspection", "palpation"]
         hpi["other symptoms"] = ["pain"]
-    if "foot" in slug:
+    if fires["foot"]:
         hpi["region"] = ["foot"]
         hpi["clinical tests"] = ["inspection", "palpation"]
         hpi["other symptoms"] = ["foot-pain"]
-    if "backache" in slug:
+    if fires["backache"]:
         hpi["region"] = ["low-back"]
         hpi["provoke"] = ["movement"]
         hpi["clinical tests"] = ["straight-leg-raise", "palpation"]
         hpi["other symptoms"] = ["backache"]
-    if "joint" in slug:
+    if fires["joint"]:
         hpi["region"] = ["n/a"]
         hpi["quality"] = ["aching"]
         hpi["clinical tests"] = ["inspection", "palpation"]
         hpi["other symptoms"] = ["pain"]
-    if any(
-        key in slug
-        for key in (
-            "hematuria",
-            "polyuria",
-            "urinary",
-            "urethral",
-            "kidney",
-            "vaginal-discharge",
-        )
-    ):
+    if fires["hematuria"]:
         hpi["region"] = ["suprapubic", "flank"]
         hpi["clinical tests"] = ["urine-dipstick", "suprapubic-tenderness"]
         hpi["other symptoms"] = ["dysuria"]
-    if any(key in slug for key in ("dyspnoea", "hemoptysis", "cyanosis", "palpitations", "shock")):
+    if fires["dyspnoea"]:
         hpi["region"] = ["retrosternal", "lower-chest"]
         hpi["clinical tests"] = ["auscultation", "orthostatic-blood-pressure"]
         hpi["other symptoms"] = ["shortness-of-breath"]
-    if any(key in slug for key in ("ascites", "hepatomegaly", "splenomegaly", "jaundice", "hematemesis")):
+    if fires["ascites"]:
         hpi["region"] = ["abdomen"]
         hpi["clinical tests"] = ["palpation", "percussion", "shifting-dullness"]
         hpi["other symptoms"] = ["abdominal-swelling"]
-    if "hirsutism" in slug or "gynecomastia" in slug or "pruritus" in slug:
+    if fires["hirsutism"]:
         hpi["region"] = ["n/a"]
         hpi["onset"] = ["gradual"]
         hpi["timing"] = ["persistent"]
-    if any(key in slug for key in ("coma", "hallucinations", "tremor")):
+    if fires["coma"]:
         hpi["region"] = ["n/a"]
         hpi["clinical tests"] = ["cranial-nerve-exam", "motor-strength-testing"]
         hpi["other symptoms"] = ["altered-mental-status"]
@@ -653,6 +883,34 @@ def item_modifiers(
     functional_psych = bool(re.search(r"(functional|psychological|anxiety|depression|irritable)", text))
     drug_related = bool(re.search(r"(drug|withdrawal|alcohol|cocaine|amphetamine|medication|toxin)", text))
 
+    stone = bool(re.search(r"\b(stone|calcul|colic)\b", text))
+    neuropathy = bool(re.search(r"\b(neuropathy|neuritis|nerve)\b", text))
+    hypertension = bool(re.search(r"\b(hypertension|pre-eclampsia)\b", text))
+    headache = "headache" in presentation_slug
+    diarrhoea = "diarr" in presentation_slug
+    urinary = "urinary" in presentation_slug or "hematuria" in presentation_slug
+    if PROFILER.enabled:
+        PROFILER.branches(
+            "modifier",
+            {
+                "infectious": infectious,
+                "neoplastic": neoplastic,
+                "vascular": vascular,
+                "traumatic": traumatic,
+                "inflammatory": inflammatory,
+                "obstructive": obstructive,
+                "endocrine-metabolic": endocrine_metabolic,
+                "functional-psych": functional_psych,
+                "drug-related": drug_related,
+                "stone": stone,
+                "neuropathy": neuropathy,
+                "hypertension": hypertension,
+                "headache": headache,
+                "diarr": diarrhoea,
+                "urinary": urinary,
+            },
+        )
+
     if infectious:
         add_if_missing(hpi, "onset", ["acute", "subacute"])
         add_if_missing(hpi, "progression", ["worsening"])
@@ -700,50 +958,87 @@ def item_modifiers(
         add_if_missing(hpi, "provoke", ["alcohol"])
         add_if_missing(hpi, "other symptoms", ["nausea"])
 
-    if re.search(r"\b(stone|calcul|colic)\b", text):
+    if stone:
         add_if_missing(hpi, "onset", ["sudden"])
         add_if_missing(hpi, "quality", ["colicky"])
         add_if_missing(hpi, "severity", ["severe"])
         add_if_missing(hpi, "radiation", ["groin"])
 
-    if re.search(r"\b(neuropathy|neuritis|nerve)\b", text):
+    if neuropathy:
         add_if_missing(hpi, "onset", ["chronic"])
         add_if_missing(hpi, "quality", ["aching"])
         add_if_missing(hpi, "other symptoms", ["numbness", "paresthesia"])
 
-    if re.search(r"\b(hypertension|pre-eclampsia)\b", text):
+    if hypertension:
         add_if_missing(hpi, "severity", ["severe"])
         add_if_missing(hpi, "other symptoms", ["headache"])
 
-    if "headache" in presentation_slug:
+    if headache:
         add_if_missing(hpi, "region", ["scalp"])
-    if "diarr" in presentation_slug:
+    if diarrhoea:
         add_if_missing(hpi, "other symptoms", ["abdominal-pain", "dehydration"])
-    if "urinary" in presentation_slug or "hematuria" in presentation_slug:
+    if urinary:
         add_if_missing(hpi, "provoke", ["urination"])
         add_if_missing(hpi, "other symptoms", ["dysuria"])
 
     return hpi
 
 
-def extract_item_text(block: str, item_name: str) -> str:
-    item_tokens = [
-        tok
-        for tok in re.findall(r"[a-z]{4,}", item_name.lower())
-        if tok not in {"with", "from", "than", "other", "acute", "chronic"}
-    ]
-    if not item_tokens:
-        return ""
+ITEM_TOKEN_STOPWORDS: Set[str] = {"with", "from", "than", "other", "acute", "chronic"}
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[\.\?!])\s+|\n+")
+WORD_RE = re.compile(r"[a-z]+")
+ITEM_TOKEN_RE = re.compile(r"[a-z]{4,}")
+
+
+def item_search_tokens(item_name: str) -> List[str]:
+    return [tok for tok in ITEM_TOKEN_RE.findall(item_name.lower()) if tok not in ITEM_TOKEN_STOPWORDS]
+
 
-    sentences = re.split(r"(?<=[\.\?!])\s+|\n+", block.lower())
-    hits: List[str] = []
-    for idx, sentence in enumerate(sentences):
-        if any(tok in sentence for tok in item_tokens):
-            start = max(0, idx - 1)
-            end = min(len(sentences), idx + 2)
-            hits.extend(sentences[start:end])
+class ChapterText:
+    """A chapter block split into lowercased sentences once, with word -> sentence postings.
 
-    return " ".join(dedupe([s.strip() for s in hits if s.strip()]))
+    Item tokens are letter-only, so `tok in sentence` holds exactly when some
+    letter run (word) of the sentence contains `tok`; lookups expand a token to
+    the matching vocabulary words and union their postings.
+    """
+
+    def __init__(self, block: str):
+        self.sentences: List[str] = SENTENCE_SPLIT_RE.split(block.lower())
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, sentence in enumerate(self.sentences):
+            for word in set(WORD_RE.findall(sentence)):
+                self.postings[word].append(idx)
+        self.postings = dict(self.postings)
+        self._token_hits: Dict[str, Set[int]] = {}
+
+    def sentences_with(self, token: str) -> Set[int]:
+        hits = self._token_hits.get(token)
+        if hits is None:
+            hits = set()
+            for word, ids in self.postings.items():
+                if token in word:
+                    hits.update(ids)
+            self._token_hits[token] = hits
+        return hits
+
+    def context(self, item_name: str) -> str:
+        """±1 sentence windows around every sentence mentioning an item token."""
+        item_tokens = item_search_tokens(item_name)
+        if not item_tokens:
+            return ""
+        matched: Set[int] = set()
+        for tok in item_tokens:
+            matched |= self.sentences_with(tok)
+        sentences = self.sentences
+        hits: List[str] = []
+        for idx in sorted(matched):
+            hits.extend(sentences[max(0, idx - 1) : idx + 2])
+        return " ".join(dedupe([s.strip() for s in hits if s.strip()]))
+
+
+def extract_item_text(block: str | ChapterText, item_name: str) -> str:
+    chapter = block if isinstance(block, ChapterText) else ChapterText(block)
+    return chapter.context(item_name)
 
 
 def finalize_hpi(hpi: Dict[str, List[str]]) -> Dict[str, List[str]]:
@@ -813,49 +1108,111 @@ def is_item_blank(item: Dict) -> bool:
     return all(not hpi.get(key) for key in HPI_KEYS)
 
 
-def fill_docs(docs: List[Tuple[Path, Dict]], chapter_blocks: Dict[str, str]) -> Tuple[int, int]:
-    updated_files = 0
-    updated_items = 0
-
-    for path, doc in docs:
-        if doc.get("locked") is True:
-            continue
-
-        presentation = doc.get("presentation", "")
-        block = chapter_blocks.get(presentation, "")
+def write_doc(path: Path, doc: Dict) -> None:
+    with path.open("w") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def fill_doc(
+    path: Path,
+    doc: Dict,
+    block: str,
+    force_rewrite: bool = True,
+    write_changes: bool = True,
+    evidence_db: Path | None = None,
+) -> Tuple[Dict, int]:
+    """Fill one presentation document; returns (doc, updated item count). Safe to run in a worker.
+
+    With `evidence_db`, each filled item also gets "provenance": the book lines
+    that mention it within this presentation's chapter.
+    """
+    presentation = doc.get("presentation", "")
+    evidence = PocketbookIndex(evidence_db) if evidence_db is not None else None
+    with PROFILER.stage("fill.chapter_index"):
+        chapter = ChapterText(block)
+    with PROFILER.stage("fill.presentation_defaults"):
         pres_defaults = merge_hpi(
             presentation_fallbacks(presentation),
             extract_tokens(block, include_keys=PRESENTATION_TEXT_KEYS, max_per_key=2),
         )
-        pres_slug = slugify(presentation)
+    pres_slug = slugify(presentation)
 
-        file_changed = False
-        items = doc.get("items", [])
-        for item in items:
-            if not FORCE_REWRITE_HPI and not is_item_blank(item):
-                continue
+    updated_items = 0
+    items = doc.get("items", [])
+    for item in items:
+        if not force_rewrite and not is_item_blank(item):
+            continue
 
-            item_name = str(item.get("name", ""))
-            item_system = str(item.get("system", ""))
-            item_text = extract_item_text(block, item_name)
+        item_name = str(item.get("name", ""))
+        item_system = str(item.get("system", ""))
+        with PROFILER.stage("fill.item_context"):
+            item_text = chapter.context(item_name)
 
+        with PROFILER.stage("fill.item_hpi"):
             hpi = make_blank_hpi()
             hpi = merge_hpi(hpi, pres_defaults)
             hpi = merge_hpi(hpi, extract_tokens(item_text, include_keys=ITEM_TEXT_KEYS, max_per_key=2))
             hpi = item_modifiers(hpi, item_name, item_system, pres_slug)
             hpi = finalize_hpi(hpi)
 
-            item["hpi"] = hpi
-            file_changed = True
-            updated_items += 1
+        item["hpi"] = hpi
+        if evidence is not None:
+            item["provenance"] = evidence_rows(evidence.evidence_for(item_name, presentation, PROVENANCE_LIMIT))
+        updated_items += 1
+
+    if evidence is not None:
+        evidence.close()
+    if updated_items and write_changes:
+        with PROFILER.stage("fill.write"):
+            write_doc(path, doc)
+
+    return doc, updated_items
+
+
+def fill_docs(
+    docs: List[Tuple[Path, Dict]],
+    chapter_blocks: Dict[str, str],
+    workers: int = FILL_WORKERS,
+    evidence_db: Path | None = None,
+) -> Tuple[int, int]:
+    """Fill every unlocked document, fanning out to a process pool when `workers` != 1.
+
+    Each task only carries its own chapter block, so workers never receive the
+    whole book. Filled docs are copied back into `docs` in place.
+    """
+    jobs = [
+        (idx, path, doc, chapter_blocks.get(doc.get("presentation", ""), ""))
+        for idx, (path, doc) in enumerate(docs)
+        if doc.get("locked") is not True
+    ]
+    workers = 1 if PROFILER.enabled else (workers or os.cpu_count() or 1)
+    results: List[Tuple[int, Dict, int]] = []
+
+    if workers == 1 or len(jobs) < 2:
+        for idx, path, doc, block in jobs:
+            t0 = time.perf_counter()
+            filled, count = fill_doc(path, doc, block, FORCE_REWRITE_HPI, WRITE_CHANGES, evidence_db)
+            if PROFILER.enabled:
+                PROFILER.document(path.name, count, time.perf_counter() - t0)
+            results.append((idx, filled, count))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {
+                pool.submit(fill_doc, path, doc, block, FORCE_REWRITE_HPI, WRITE_CHANGES, evidence_db): idx
+                for idx, path, doc, block in jobs
+            }
+            for future in as_completed(futures):
+                filled, count = future.result()
+                results.append((futures[future], filled, count))
 
-        if file_changed:
+    updated_files = 0
+    updated_items = 0
+    for idx, filled, count in results:
+        docs[idx] = (docs[idx][0], filled)
+        if count:
             updated_files += 1
-            if WRITE_CHANGES:
-                with path.open("w") as f:
-                    json.dump(doc, f, indent=2, ensure_ascii=False)
-                    f.write("\n")
-
+            updated_items += count
     return updated_files, updated_items
 
 
@@ -874,16 +1231,20 @@ def validate_no_blanks(todo_dir: Path) -> List[str]:
 
 
 def main() -> None:
+    if "--profile" in sys.argv or PROFILE:
+        PROFILER.enabled = True
     pdf_path = discover_pdf_path()
-    text = load_pdf_text(pdf_path)
-    pages = text.split("\f")
+    with PROFILER.stage("pdf_load"):
+        pages = load_pdf_pages(pdf_path)
 
-    docs = load_todo_docs(TODO_DIR)
+    with PROFILER.stage("load_todo_docs"):
+        docs = load_todo_docs(TODO_DIR)
     target_presentations = [doc.get("presentation", "") for _, doc in docs]
-    boundary_presentations = load_all_clinical_presentations(TODO_DIR.parent)
-    chapter_blocks, chapter_ranges, missing = build_chapter_blocks(
-        pages, boundary_presentations, target_presentations
-    )
+    with PROFILER.stage("chapter_mapping"):
+        boundary_presentations = load_all_clinical_presentations(TODO_DIR.parent)
+        chapter_blocks, chapter_ranges, missing = build_chapter_blocks(
+            pages, boundary_presentations, target_presentations
+        )
 
     if missing:
         print("Warning: missing chapter matches for:")
@@ -895,12 +1256,20 @@ def main() -> None:
             start, end = chapter_ranges[name]
             print(f"Mapped: {name} -> pages {start}-{end}")
 
-    updated_files, updated_items = fill_docs(docs, chapter_blocks)
+    evidence_db = None
+    if ATTACH_PROVENANCE:
+        with PROFILER.stage("evidence_index"):
+            _, all_ranges, _ = build_chapter_blocks(pages, boundary_presentations, boundary_presentations)
+            evidence_db = ensure_index(pages, pages.store_dir, all_ranges, pages.pdf_sha256)
+
+    with PROFILER.stage("fill"):
+        updated_files, updated_items = fill_docs(docs, chapter_blocks, evidence_db=evidence_db)
     print(f"Updated files: {updated_files}")
     print(f"Updated items: {updated_items}")
 
     if WRITE_CHANGES:
-        failures = validate_no_blanks(TODO_DIR)
+        with PROFILER.stage("validation"):
+            failures = validate_no_blanks(TODO_DIR)
         if failures:
             print("Validation failures:")
             for fail in failures[:50]:
@@ -910,6 +1279,11 @@ def main() -> None:
         else:
             print("Validation passed: no empty HPI arrays remain in todo JSON files.")
 
+    if PROFILER.enabled:
+        print()
+        print(PROFILER.export(PROFILE_JSON_PATH, PROFILE_REPORT_PATH), end="")
+        print(f"Profile (fill ran serially): {PROFILE_JSON_PATH}, {PROFILE_REPORT_PATH}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Parity and timing checks for fill_clinical_todo_from_pdf.py's fast paths.
+
+Keeps the straightforward reference implementations the fill script replaced:
+
+- find_start_page: scan every page per presentation (vs the one-pass heading index)
+- extract_tokens_scan: one re.search per TOKEN_RULES rule (vs TOKEN_ENGINE)
+- extract_item_text_scan: re-split the chapter per item (vs ChapterText)
+
+Each mode loads the book the same way the fill script does, times both paths
+and exits non-zero if their outputs differ.
+
+Usage:
+  python3 fill_reference_checks.py --time-headings
+  python3 fill_reference_checks.py --bench-tokens
+  python3 fill_reference_checks.py --bench-items
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Sequence, Set
+
+import fill_clinical_todo_from_pdf as fill
+from fill_clinical_todo_from_pdf import (
+    ChapterText,
+    dedupe,
+    extract_item_text,
+    extract_tokens,
+    item_search_tokens,
+    norm_text,
+)
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+BENCH_REPEATS = 3
+
+
+# -----------------------------
+# Reference implementations
+# -----------------------------
+
+def has_causes_marker(page: str, next_page: str | None) -> bool:
+    if fill.CAUSES_MARKER_RE.search(page):
+        return True
+    if next_page and fill.CAUSES_MARKER_RE.search(next_page):
+        return True
+    return False
+
+
+def find_start_page(pages: Sequence[str], presentation: str) -> int | None:
+    variants = fill.heading_variants(presentation)
+    candidates: List[int] = []
+
+    for i in range(fill.MIN_CONTENT_PAGE, len(pages) + 1):
+        page = pages[i - 1]
+        next_page = pages[i] if i < len(pages) else None
+        if not has_causes_marker(page, next_page):
+            continue
+
+        for cleaned in fill.iter_heading_lines(page):
+            if norm_text(cleaned) in variants:
+                candidates.append(i)
+                break
+
+    if not candidates:
+        return None
+
+    return min(candidates)
+
+
+def extract_tokens_scan(
+    text: str,
+    include_keys: Set[str] | None = None,
+    max_per_key: int | None = None,
+) -> Dict[str, List[str]]:
+    text = text.lower()
+    out: Dict[str, List[str]] = defaultdict(list)
+    for key, rules in fill.TOKEN_RULES.items():
+        if include_keys is not None and key not in include_keys:
+            continue
+        for pattern, tokens in rules:
+            if re.search(pattern, text):
+                out[key].extend(tokens)
+        out[key] = dedupe(out[key])
+        if max_per_key is not None:
+            out[key] = out[key][:max_per_key]
+    return out
+
+
+def extract_item_text_scan(block: str, item_name: str) -> str:
+    item_tokens = item_search_tokens(item_name)
+    if not item_tokens:
+        return ""
+
+    sentences = re.split(r"(?<=[\.\?!])\s+|\n+", block.lower())
+    hits: List[str] = []
+    for idx, sentence in enumerate(sentences):
+        if any(tok in sentence for tok in item_tokens):
+            start = max(0, idx - 1)
+            end = min(len(sentences), idx + 2)
+            hits.extend(sentences[start:end])
+
+    return " ".join(dedupe([s.strip() for s in hits if s.strip()]))
+
+
+# -----------------------------
+# Checks
+# -----------------------------
+
+def time_heading_lookup(pages: Sequence[str], presentations: Sequence[str]) -> int:
+    """Compare per-presentation page scans with the single-pass heading index."""
+    names = dedupe(presentations)
+
+    t0 = time.perf_counter()
+    scanned = {name: find_start_page(pages, name) for name in names}
+    scan_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    heading_index = fill.build_heading_index(pages)
+    build_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    indexed = {name: fill.lookup_start_page(heading_index, name) for name in names}
+    lookup_s = time.perf_counter() - t0
+
+    mismatches = [name for name in names if scanned[name] != indexed[name]]
+    print(f"Presentations: {len(names)}, pages: {len(pages)}, indexed headings: {len(heading_index)}")
+    print(f"Per-presentation scans: {scan_s * 1000:.1f} ms")
+    print(f"Heading index:          {(build_s + lookup_s) * 1000:.1f} ms (build {build_s * 1000:.1f}, lookups {lookup_s * 1000:.2f})")
+    if mismatches:
+        print(f"Mismatched start pages: {', '.join(mismatches)}")
+        return 1
+    print("Start pages identical.")
+    return 0
+
+
+def bench_token_extraction(texts: Sequence[str], repeats: int = BENCH_REPEATS) -> int:
+    """Texts/second for the per-rule scan vs TOKEN_ENGINE, with an output parity check."""
+    variants = (
+        ("presentation keys", fill.PRESENTATION_TEXT_KEYS, 2),
+        ("item keys", fill.ITEM_TEXT_KEYS, 2),
+        ("all keys, no cap", None, None),
+    )
+    status = 0
+    for label, keys, cap in variants:
+        timings = {}
+        for name, fn in (("scan", extract_tokens_scan), ("engine", extract_tokens)):
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                results = [fn(text, include_keys=keys, max_per_key=cap) for text in texts]
+            timings[name] = (time.perf_counter() - t0, results)
+        same = timings["scan"][1] == timings["engine"][1]
+        rates = {name: len(texts) * repeats / max(secs, 1e-9) for name, (secs, _) in timings.items()}
+        print(
+            f"{label:<18} scan {rates['scan']:9.1f} texts/s | engine {rates['engine']:9.1f} texts/s"
+            f" | x{rates['engine'] / max(rates['scan'], 1e-9):.1f} | {'identical' if same else 'MISMATCH'}"
+        )
+        status |= 0 if same else 1
+    return status
+
+
+def bench_item_text(blocks: Dict[str, str], items: Dict[str, List[str]], repeats: int = BENCH_REPEATS) -> int:
+    """Per-item chapter re-splits vs one ChapterText per chapter, with an output parity check."""
+    pairs = [(name, item) for name, names in items.items() if name in blocks for item in names]
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        scanned = [extract_item_text_scan(blocks[name], item) for name, item in pairs]
+    scan_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        chapters = {name: ChapterText(block) for name, block in blocks.items()}
+        indexed = [extract_item_text(chapters[name], item) for name, item in pairs]
+    index_s = time.perf_counter() - t0
+
+    same = scanned == indexed
+    print(f"Items: {len(pairs)} across {len(items)} presentations")
+    print(f"Per-item scans: {scan_s / repeats * 1000:.1f} ms | ChapterText: {index_s / repeats * 1000:.1f} ms"
+          f" | {'identical' if same else 'MISMATCH'}")
+    return 0 if same else 1
+
+
+def main() -> int:
+    modes = {"--time-headings", "--bench-tokens", "--bench-items"}
+    chosen = [a for a in sys.argv[1:] if a in modes]
+    if len(chosen) != 1:
+        print(__doc__.strip())
+        return 2
+
+    pages = fill.load_pdf_pages(fill.discover_pdf_path())
+    boundary = fill.load_all_clinical_presentations(fill.TODO_DIR.parent)
+    if chosen[0] == "--time-headings":
+        return time_heading_lookup(pages, boundary)
+
+    if chosen[0] == "--bench-tokens":
+        blocks, _, _ = fill.build_chapter_blocks(pages, boundary, boundary)
+        print(f"Chapter blocks: {len(blocks)} ({sum(map(len, blocks.values()))} chars)")
+        return bench_token_extraction(list(blocks.values()))
+
+    docs = fill.load_todo_docs(fill.TODO_DIR)
+    items = {
+        doc.get("presentation", ""): [item.get("name", "") for item in doc.get("items", [])]
+        for _, doc in docs
+    }
+    blocks, _, _ = fill.build_chapter_blocks(pages, boundary, list(items))
+    return bench_item_text(blocks, items)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,12 +3,19 @@
 
 from __future__ import annotations
 
+import hashlib
+import io
 import json
+import random
 import re
 import sys
+import tempfile
+import time
+import tracemalloc
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from itertools import islice
+from typing import Any, Callable, Iterator, Sequence, TextIO
 
 # -----------------------------
 # Config (edit these in VS Code)
@@ -26,6 +33,13 @@ SKIP_AMBIGUOUS_KEYS = {
     "Vitamin A deﬁciency (common in underdeveloped countries)",
 }
 REPORT_PATH_LIMIT = 40
+STREAM_CHUNK_SIZE = 1 << 16  # Characters read per chunk by the streaming repair pass.
+BLOCK_CACHE_PATH: Path | None = None  # Per-symptom normalization cache; None = next to INPUT_PATH, saved only with --apply.
+BLOCK_CACHE_VERSION = 1  # Bump when normalize_node / collect_remaining_candidates change behavior.
+BENCH_BASE_BLOCKS = 97  # Top-level symptoms in the current clinical index.
+BENCH_SCALE = 100
+BENCH_MAX_DEPTH = 8  # Extra group levels between a system label and its etiologies.
+BENCH_SEED = 7
 
 
 FREQ_KEYS = ("freq", "frequency", "rank")
@@ -34,12 +48,24 @@ CLOSING_WITH_COMMA_RE = re.compile(r"^\s*}\s*,\s*$")
 PAREN_GROUP_RE = re.compile(r"\(([^()]*)\)")
 
 
+@dataclass(frozen=True)
+class RepairDiagnostic:
+    line: int
+    column: int
+    kind: str
+    detail: str
+
+    def __str__(self) -> str:
+        return f"{self.line}:{self.column}: {self.kind}: {self.detail}"
+
+
 @dataclass
 class StructuralSummary:
     inserted_before_top_keys: int = 0
     appended_final_closers: int = 0
     removed_trailing_over_closers: int = 0
     inserted_before_lines: list[int] = field(default_factory=list)
+    diagnostics: list[RepairDiagnostic] = field(default_factory=list)
 
 
 @dataclass
@@ -70,8 +96,47 @@ def is_freq_leaf(node: Any) -> bool:
     return isinstance(node, dict) and extract_freq(node) is not None
 
 
+_STRUCTURAL_TOKEN_RE = re.compile(r'["{}\[\]]')
+_STRING_TOKEN_RE = re.compile(r'["\\]')
+
+
 def scan_depth_state(line: str, depth: int, in_string: bool, escaped: bool) -> tuple[int, bool, bool]:
-    for ch in line:
+    """Advance (depth, in_string, escaped) over one line, jumping between tokens via regex."""
+    pos = 0
+    size = len(line)
+    if escaped and size:
+        pos, escaped = 1, False
+    while pos < size:
+        if in_string:
+            m = _STRING_TOKEN_RE.search(line, pos)
+            if m is None:
+                break
+            if m.group() == "\\":
+                if m.end() >= size:
+                    return depth, True, True
+                pos = m.end() + 1
+                continue
+            in_string = False
+            pos = m.end()
+            continue
+
+        m = _STRUCTURAL_TOKEN_RE.search(line, pos)
+        if m is None:
+            break
+        ch = m.group()
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        else:
+            depth -= 1
+        pos = m.end()
+    return depth, in_string, escaped
+
+
+def first_negative_column(line: str, depth: int, in_string: bool, escaped: bool) -> int:
+    """1-based column where `depth` first drops below zero on `line` (diagnostics only)."""
+    for col, ch in enumerate(line, start=1):
         if in_string:
             if escaped:
                 escaped = False
@@ -80,63 +145,135 @@ def scan_depth_state(line: str, depth: int, in_string: bool, escaped: bool) -> t
             elif ch == '"':
                 in_string = False
             continue
-
         if ch == '"':
             in_string = True
         elif ch in "{[":
             depth += 1
         elif ch in "}]":
             depth -= 1
-    return depth, in_string, escaped
+            if depth < 0:
+                return col
+    return len(line) + 1
 
 
-def structural_prepass(raw_text: str) -> tuple[str, StructuralSummary]:
+def iter_stream_lines(src: TextIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[tuple[str, bool]]:
+    """Yield (line, ended_with_newline) from `src` reading fixed-size chunks; "\r\n" is folded to "\n"."""
+    tail = ""
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        parts = (tail + chunk).split("\n")
+        tail = parts.pop()
+        for part in parts:
+            yield (part[:-1] if part.endswith("\r") else part), True
+    if tail:
+        yield (tail[:-1] if tail.endswith("\r") else tail), False
+
+
+class _LineSink:
+    """Writes lines joined by "\n", holding back the last one so a closer can be slotted before it."""
+
+    def __init__(self, dst: TextIO) -> None:
+        self.dst = dst
+        self.pending: str | None = None
+        self._started = False
+
+    def _write(self, line: str) -> None:
+        if self._started:
+            self.dst.write("\n")
+        self.dst.write(line)
+        self._started = True
+
+    def push(self, line: str) -> None:
+        if self.pending is not None:
+            self._write(self.pending)
+        self.pending = line
+
+    def insert_before_pending(self, line: str) -> None:
+        self._write(line)
+
+    def close(self, trailing_newline: bool) -> None:
+        if self.pending is not None:
+            self._write(self.pending)
+            self.pending = None
+        if trailing_newline and self._started:
+            self.dst.write("\n")
+
+
+def repair_stream(
+    src: TextIO,
+    dst: TextIO,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    on_diagnostic: Callable[[RepairDiagnostic], None] | None = None,
+) -> StructuralSummary:
+    """Single O(n) streaming pass: drop over-closers, close open blocks before top-level keys.
+
+    Memory is bounded by `chunk_size` plus the longest line, not by file size.
+    """
     summary = StructuralSummary()
-    out_lines: list[str] = []
+    sink = _LineSink(dst)
+
+    def report(diag: RepairDiagnostic) -> None:
+        summary.diagnostics.append(diag)
+        if on_diagnostic is not None:
+            on_diagnostic(diag)
 
     depth = 0
     in_string = False
     escaped = False
+    line_no = 0
+    ended_with_newline = False
 
-    for line_no, line in enumerate(raw_text.splitlines(), start=1):
+    for line_no, (line, ended_with_newline) in enumerate(iter_stream_lines(src, chunk_size), start=1):
         stripped = line.strip()
-        if stripped and set(stripped) == {"}"}:
+        if stripped and not in_string and stripped.count("}") == len(stripped):
             keep = min(depth, len(stripped))
             removed = len(stripped) - keep
             if removed > 0:
                 summary.removed_trailing_over_closers += removed
+                column = len(line) - len(line.lstrip()) + keep + 1
+                report(RepairDiagnostic(line_no, column, "removed_over_closer", f"dropped {removed} '}}'"))
             if keep == 0:
                 continue
             if removed > 0:
                 line = "}" * keep
 
-        if TOP_LEVEL_SYMPTOM_RE.match(line):
-            while depth > 1:
-                if out_lines and CLOSING_WITH_COMMA_RE.match(out_lines[-1]):
-                    out_lines.insert(len(out_lines) - 1, "}")
-                else:
-                    out_lines.append("}")
-                depth -= 1
-                summary.inserted_before_top_keys += 1
-                summary.inserted_before_lines.append(line_no)
-
-        out_lines.append(line)
-        depth, in_string, escaped = scan_depth_state(line, depth, in_string, escaped)
-        if depth < 0:
-            raise ValueError(f"Unexpected extra closing brace/bracket near line {line_no}.")
-
+        if depth > 1 and not in_string and TOP_LEVEL_SYMPTOM_RE.match(line):
+            missing = depth - 1
+            summary.inserted_before_top_keys += missing
+            summary.inserted_before_lines.extend([line_no] * missing)
+            report(RepairDiagnostic(line_no, 1, "inserted_closer", f"closed {missing} open block(s) before top-level key"))
+            if sink.pending is not None and CLOSING_WITH_COMMA_RE.match(sink.pending):
+                for _ in range(missing):
+                    sink.insert_before_pending("}")
+            else:
+                for _ in range(missing):
+                    sink.push("}")
+            depth = 1
+
+        sink.push(line)
+        new_depth, in_string, escaped = scan_depth_state(line, depth, in_string, escaped)
+        if new_depth < 0:
+            column = first_negative_column(line, depth, in_string, escaped)
+            raise ValueError(f"Unexpected extra closing brace/bracket at line {line_no}, column {column}.")
+        depth = new_depth
+
+    if depth > 0:
+        report(RepairDiagnostic(line_no + 1, 1, "appended_closer", f"appended {depth} final closer(s)"))
     while depth > 0:
-        out_lines.append("}")
+        sink.push("}")
         depth -= 1
         summary.appended_final_closers += 1
 
-    if depth != 0:
-        raise ValueError("Failed to rebalance JSON structural depth.")
+    sink.close(trailing_newline=ended_with_newline)
+    return summary
 
-    repaired = "\n".join(out_lines)
-    if raw_text.endswith("\n"):
-        repaired += "\n"
-    return repaired, summary
+
+def structural_prepass(raw_text: str) -> tuple[str, StructuralSummary]:
+    out = io.StringIO()
+    summary = repair_stream(io.StringIO(raw_text), out)
+    return out.getvalue(), summary
 
 
 def extract_base_and_note(parent_key: str, continuation_key: str | None) -> tuple[str, str | None]:
@@ -231,52 +368,116 @@ def insert_or_record(
     target: dict[str, Any],
     key: str,
     value: Any,
-    context_path: tuple[str, ...],
+    context_path: Sequence[str],
     summary: NormalizeSummary,
-) -> bool:
-    if key in target and target[key] != value:
-        summary.collision_paths.append(context_path + (key,))
+) -> str | None:
+    """Insert `value`, renaming on collision; return the key newly added to `target` (None if none)."""
+    if key in target:
+        if target[key] == value:
+            return None
+        summary.collision_paths.append((*context_path, key))
         alternate_key = build_collision_key(key, value)
         if alternate_key in target:
-            if target[alternate_key] == value:
-                return True
-            return False
+            return None
         target[alternate_key] = value
-        summary.resolved_collision_paths.append(context_path + (alternate_key,))
-        return True
+        summary.resolved_collision_paths.append((*context_path, alternate_key))
+        return alternate_key
     target[key] = value
-    return True
+    return key
 
 
-def normalize_node(node: Any, path: tuple[str, ...], summary: NormalizeSummary) -> Any:
+def _normalize(node: Any, stack: list[str], summary: NormalizeSummary, found: list[tuple[str, ...] | None]) -> Any:
+    """Single pass: transform malformed entries and collect remaining candidates of the result.
+
+    `stack` is the shared path of `node`; paths are only materialized when reported.
+    Remaining candidates go to the shared `found` list in the same pre-order as
+    collect_remaining_candidates: a None slot is reserved ahead of a child that could
+    be a candidate and filled once its normalized value is known. Unchanged
+    subtrees are returned as-is (copy-on-write), so a clean tree allocates no new
+    containers.
+    """
     if isinstance(node, list):
-        return [normalize_node(item, path, summary) for item in node]
+        items: list[Any] | None = None
+        for i, item in enumerate(node):
+            new_item = _normalize(item, stack, summary, found)
+            if items is None and new_item is not item:
+                items = node[:i]
+            if items is not None:
+                items.append(new_item)
+        return node if items is None else items
 
     if not isinstance(node, dict):
         return node
 
-    out: dict[str, Any] = {}
-    for key, value in node.items():
-        if clear_malformed_candidate(path, key, value):
+    check_candidates = len(stack) >= 2
+    out: dict[str, Any] | None = None
+
+    for i, (key, value) in enumerate(node.items()):
+        if check_candidates and "(" in key and clear_malformed_candidate(stack, key, value):
             if key in SKIP_AMBIGUOUS_KEYS:
-                summary.skipped_paths.append(path + (key,))
-                insert_or_record(out, key, value, path, summary)
+                summary.skipped_paths.append((*stack, key))
+                inserted: str | None = key if out is None else insert_or_record(out, key, value, stack, summary)
+                if inserted is not None:
+                    found.append((*stack, inserted))
+                    stack.append(key)
+                    found.extend(collect_remaining_candidates(value, tuple(stack)))
+                    stack.pop()
                 continue
 
+            if out is None:
+                out = dict(islice(node.items(), i))
             flattened, fallback_parent_key = flatten_malformed_entry(key, value)
-            summary.transformed_paths.append(path + (key,))
+            summary.transformed_paths.append((*stack, key))
             for idx, (new_key, new_value) in enumerate(flattened):
-                normalized_value = normalize_node(new_value, path + (new_key,), summary)
+                mark = len(found)
+                found.append(None)
+                stack.append(new_key)
+                normalized_value = _normalize(new_value, stack, summary, found)
+                stack.pop()
                 target_key = new_key
                 if target_key in out and out[target_key] != normalized_value and idx == 0:
                     target_key = fallback_parent_key
-                insert_or_record(out, target_key, normalized_value, path, summary)
+                inserted = insert_or_record(out, target_key, normalized_value, stack, summary)
+                if inserted is None:
+                    del found[mark:]
+                elif "(" in inserted and clear_malformed_candidate(stack, inserted, normalized_value):
+                    found[mark] = (*stack, inserted)
             continue
 
-        normalized_value = normalize_node(value, path + (key,), summary)
-        insert_or_record(out, key, normalized_value, path, summary)
+        # Only keys with "(" (or a pending collision rename) can become candidates.
+        mark = len(found)
+        slot = check_candidates and ("(" in key or (out is not None and key in out))
+        if slot:
+            found.append(None)
+        stack.append(key)
+        normalized_value = _normalize(value, stack, summary, found)
+        stack.pop()
+        if out is None:
+            if normalized_value is value:
+                if slot and clear_malformed_candidate(stack, key, value):
+                    found[mark] = (*stack, key)
+                continue
+            out = dict(islice(node.items(), i))
+        inserted = insert_or_record(out, key, normalized_value, stack, summary)
+        if inserted is None:
+            del found[mark:]
+        elif slot and "(" in inserted and clear_malformed_candidate(stack, inserted, normalized_value):
+            found[mark] = (*stack, inserted)
 
-    return out
+    return node if out is None else out
+
+
+def normalize_tree(
+    node: Any, path: tuple[str, ...], summary: NormalizeSummary
+) -> tuple[Any, list[tuple[str, ...]]]:
+    """Normalize `node` and return (result, remaining candidates in the result) in one traversal."""
+    found: list[tuple[str, ...] | None] = []
+    normalized = _normalize(node, list(path), summary, found)
+    return normalized, [p for p in found if p is not None]
+
+
+def normalize_node(node: Any, path: tuple[str, ...], summary: NormalizeSummary) -> Any:
+    return normalize_tree(node, path, summary)[0]
 
 
 def collect_remaining_candidates(node: Any, path: tuple[str, ...] = ()) -> list[tuple[str, ...]]:
@@ -292,6 +493,205 @@ def collect_remaining_candidates(node: Any, path: tuple[str, ...] = ()) -> list[
     return found
 
 
+# -----------------------------
+# Per-symptom block cache
+# -----------------------------
+# Normalization never crosses top-level symptom boundaries (transforms need
+# len(path) >= 2), so each top-level block can be normalized and verified on
+# its own and reused while its content hash is unchanged.
+
+
+@dataclass
+class BlockStats:
+    total: int = 0
+    reused: int = 0
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+def cache_salt() -> str:
+    return json.dumps([BLOCK_CACHE_VERSION, sorted(SKIP_AMBIGUOUS_KEYS), list(FREQ_KEYS)], ensure_ascii=False)
+
+
+def block_digest(key: str, block: Any, salt: str) -> str:
+    payload = json.dumps([salt, key, block], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_block_cache(path: Path) -> dict[str, Any]:
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_block_cache(path: Path, cache: dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(cache, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+
+
+def _paths(rows: list[list[str]]) -> list[tuple[str, ...]]:
+    return [tuple(row) for row in rows]
+
+
+def normalize_block(key: str, block: Any) -> dict[str, Any]:
+    """Normalize and verify one top-level symptom block; result is JSON-serializable for the cache."""
+    summary = NormalizeSummary()
+    normalized, remaining = normalize_tree(block, (key,), summary)
+    return {
+        "normalized": normalized,
+        "transformed": summary.transformed_paths,
+        "skipped": summary.skipped_paths,
+        "collisions": summary.collision_paths,
+        "resolved": summary.resolved_collision_paths,
+        "remaining": remaining,
+    }
+
+
+def normalize_blocks(
+    data: Any, cache: dict[str, Any] | None
+) -> tuple[Any, NormalizeSummary, list[tuple[str, ...]], BlockStats]:
+    """Normalize `data` block by block, reusing `cache` entries (mutated in place, pruned to live blocks)."""
+    stats = BlockStats()
+    summary = NormalizeSummary()
+    t0 = time.perf_counter()
+    if not isinstance(data, dict):
+        normalized, remaining = normalize_tree(data, (), summary)
+        stats.timings["normalize"] = time.perf_counter() - t0
+        return normalized, summary, remaining, stats
+
+    salt = cache_salt()
+    live: dict[str, Any] = {}
+    out: dict[str, Any] = {}
+    remaining: list[tuple[str, ...]] = []
+    hash_time = 0.0
+    for key, block in data.items():
+        stats.total += 1
+        h0 = time.perf_counter()
+        digest = block_digest(key, block, salt)
+        hash_time += time.perf_counter() - h0
+        entry = cache.get(digest) if cache is not None else None
+        if entry is None:
+            entry = normalize_block(key, block)
+        else:
+            stats.reused += 1
+        live[digest] = entry
+        out[key] = entry["normalized"]
+        summary.transformed_paths.extend(_paths(entry["transformed"]))
+        summary.skipped_paths.extend(_paths(entry["skipped"]))
+        summary.collision_paths.extend(_paths(entry["collisions"]))
+        summary.resolved_collision_paths.extend(_paths(entry["resolved"]))
+        remaining.extend(_paths(entry["remaining"]))
+
+    if cache is not None:
+        cache.clear()
+        cache.update(live)
+    stats.timings["hash"] = hash_time
+    stats.timings["normalize+verify"] = time.perf_counter() - t0 - hash_time
+    return out, summary, remaining, stats
+
+
+# -----------------------------
+# Synthetic benchmark (--bench)
+# -----------------------------
+BENCH_FREQS = ("common", "less common", "rare")
+
+
+def _synthetic_etiologies(rng: random.Random, prefix: str) -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for i in range(rng.randint(4, 14)):
+        name = f"{prefix} etiology {i}"
+        roll = rng.random()
+        if roll < 0.04:
+            # Split parenthetical: "Name (start" -> {"rest)": leaf, ...}
+            out[f"{name} (seen in"] = {
+                "older adults)": {"freq": rng.choice(BENCH_FREQS)},
+                f"{name} variant": {"freq": rng.choice(BENCH_FREQS)},
+            }
+        elif roll < 0.06:
+            out[f"{name} (note {i})"] = {f"{name} subtype": {"freq": rng.choice(BENCH_FREQS)}}
+            if rng.random() < 0.5:
+                out[name] = {"freq": "rare"}  # Collides with the flattened base name.
+        elif roll < 0.25:
+            out[f"{name} (qualifier)"] = {"freq": rng.choice(BENCH_FREQS)}
+        else:
+            out[name] = {"freq": rng.choice(BENCH_FREQS)}
+    return out
+
+
+def build_synthetic_index(
+    scale: int = BENCH_SCALE, max_depth: int = BENCH_MAX_DEPTH, seed: int = BENCH_SEED
+) -> dict[str, Any]:
+    """Clinical-index-shaped tree: symptom > system > 0..max_depth groups > etiologies."""
+    rng = random.Random(seed)
+    index: dict[str, Any] = {}
+    for b in range(BENCH_BASE_BLOCKS * scale):
+        block: dict[str, Any] = {}
+        for s in range(rng.randint(2, 5)):
+            node: Any = _synthetic_etiologies(rng, f"S{b}.{s}")
+            for level in range(rng.randint(0, max_depth)):
+                node = {f"Group {level}": node, f"Group {level} (misc)": _synthetic_etiologies(rng, f"G{b}.{s}.{level}")}
+            block[f"SYSTEM {s}"] = node
+        index[f"Symptom {b}"] = block
+    return index
+
+
+def count_nodes(node: Any) -> int:
+    total = 0
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        total += 1
+        if isinstance(current, dict):
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+    return total
+
+
+def run_benchmark() -> int:
+    t0 = time.perf_counter()
+    data = build_synthetic_index()
+    build_s = time.perf_counter() - t0
+    print("=== Normalizer Benchmark ===")
+    print(f"synthetic index: {len(data)} symptoms, {count_nodes(data)} nodes, depth <= {BENCH_MAX_DEPTH + 4} (built in {build_s:.2f} s)")
+
+    t0 = time.perf_counter()
+    summary = NormalizeSummary()
+    normalized, remaining = normalize_tree(data, (), summary)
+    elapsed = time.perf_counter() - t0
+
+    # Separate traced run: tracemalloc slows allocation-heavy code too much to time it.
+    del normalized
+    tracemalloc.start()
+    normalized, _ = normalize_tree(data, (), NormalizeSummary())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"single pass:     {elapsed * 1000:8.1f} ms, peak alloc {peak / 1e6:.1f} MB")
+    print(f"transformed:     {len(summary.transformed_paths)}")
+    print(f"collisions:      {len(summary.collision_paths)} ({len(summary.resolved_collision_paths)} resolved)")
+    print(f"remaining:       {len(remaining)}")
+
+    t0 = time.perf_counter()
+    verified = collect_remaining_candidates(normalized)
+    print(f"re-walk check:   {(time.perf_counter() - t0) * 1000:8.1f} ms (not needed by main(); parity only)")
+    if verified != remaining:
+        print("ERROR: single-pass remaining candidates differ from a full re-walk.")
+        return 1
+    print("parity:          ok")
+    return 0
+
+
 def should_apply_from_cli() -> bool:
     if "--dry-run" in sys.argv:
         return False
@@ -311,21 +711,56 @@ def print_path_sample(label: str, paths: list[tuple[str, ...]]) -> None:
         print(f"  ... {extra} more")
 
 
-def main() -> int:
-    apply_changes = should_apply_from_cli()
+def repair_only_to_stdout() -> int:
+    """Stream the structurally repaired JSON to stdout; diagnostics go to stderr as line:col."""
+    try:
+        with INPUT_PATH.open("r", encoding="utf-8", newline="") as src:
+            summary = repair_stream(src, sys.stdout, on_diagnostic=lambda d: print(f"{INPUT_PATH}:{d}", file=sys.stderr))
+    except ValueError as e:
+        print(f"{INPUT_PATH}: ERROR: {e}", file=sys.stderr)
+        return 1
+    sys.stdout.flush()
+    print(f"repairs: {len(summary.diagnostics)}", file=sys.stderr)
+    return 0
 
-    raw_text = INPUT_PATH.read_text(encoding="utf-8")
-    repaired_text, structural_summary = structural_prepass(raw_text)
 
-    data = json.loads(repaired_text)
-    normalize_summary = NormalizeSummary()
-    normalized_data = normalize_node(data, (), normalize_summary)
+def main() -> int:
+    if "--repair-only" in sys.argv:
+        return repair_only_to_stdout()
+    if "--bench" in sys.argv:
+        return run_benchmark()
 
-    remaining = collect_remaining_candidates(normalized_data)
+    apply_changes = should_apply_from_cli()
+
+    use_cache = "--no-cache" not in sys.argv
+    timings: dict[str, float] = {}
+
+    t0 = time.perf_counter()
+    with INPUT_PATH.open("r", encoding="utf-8", newline="") as src, tempfile.TemporaryFile("w+", encoding="utf-8") as repaired:
+        structural_summary = repair_stream(src, repaired)
+        t1 = time.perf_counter()
+        repaired.seek(0)
+        data = json.load(repaired)
+    t2 = time.perf_counter()
+    timings["repair"] = t1 - t0
+    timings["parse"] = t2 - t1
+
+    # A dry run may reuse the default cache but only leaves one behind when the path was set explicitly
+    cache_path = BLOCK_CACHE_PATH or INPUT_PATH.with_name(".fix_parenthetical_cache.json")
+    cache = load_block_cache(cache_path) if use_cache else None
+    timings["cache_load"] = time.perf_counter() - t2
+    normalized_data, normalize_summary, remaining, block_stats = normalize_blocks(data, cache)
+    timings.update(block_stats.timings)
     remaining_unskipped = [p for p in remaining if p[-1] not in SKIP_AMBIGUOUS_KEYS]
 
+    t3 = time.perf_counter()
     output_text = json.dumps(normalized_data, ensure_ascii=False, indent=JSON_INDENT) + "\n"
-    changed = output_text != raw_text
+    timings["serialize"] = time.perf_counter() - t3
+    if cache is not None and (apply_changes or BLOCK_CACHE_PATH is not None):
+        t4 = time.perf_counter()
+        save_block_cache(cache_path, cache)
+        timings["cache_save"] = time.perf_counter() - t4
+    changed = hashlib.sha256(output_text.encode("utf-8")).hexdigest() != sha256_file(INPUT_PATH)
 
     print("=== Structural Pre-pass ===")
     print(f"inserted_before_top_keys: {structural_summary.inserted_before_top_keys}")
@@ -334,6 +769,8 @@ def main() -> int:
     if structural_summary.inserted_before_lines:
         lines = ", ".join(str(n) for n in structural_summary.inserted_before_lines[:REPORT_PATH_LIMIT])
         print(f"inserted_before_lines:    {lines}")
+    for diag in structural_summary.diagnostics[:REPORT_PATH_LIMIT]:
+        print(f"  - {diag}")
 
     print("\n=== Normalization Summary ===")
     print_path_sample("transformed_entries", normalize_summary.transformed_paths)
@@ -343,6 +780,13 @@ def main() -> int:
     print_path_sample("remaining_candidates", remaining)
     print_path_sample("remaining_unskipped", remaining_unskipped)
 
+    print("\n=== Block Cache ===")
+    print(f"blocks:      {block_stats.total}")
+    print(f"reused:      {block_stats.reused}" + ("" if use_cache else " (cache disabled)"))
+    print(f"normalized:  {block_stats.total - block_stats.reused}")
+    for label, seconds in timings.items():
+        print(f"{label + ':':<18} {seconds * 1000:8.1f} ms")
+
     print("\n=== File Summary ===")
     print(f"input_path:  {INPUT_PATH}")
     print(f"output_path: {OUTPUT_PATH}")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Bitmap index over HPI attributes for cross-presentation feature queries.
+
+Every (presentation, item) pair gets a dense integer id. For each
+(HPI key, enum value) from `presentations_schema.json` there is one bitmap with
+bit `id` set when that item lists the value. Bitmaps are Python ints in memory,
+so boolean queries are plain `&`, `|` and `~` over the whole corpus.
+
+On disk each bitmap is run-length encoded as alternating [gap, run, gap, run, ...]
+lengths. differentials_app.js expands them into Uint32Array bitsets and runs the
+same query grammar when the search box holds key=value terms.
+
+Usage:
+  python3 hpi_bitmap_index.py                      # rebuild the artifact
+  python3 hpi_bitmap_index.py "onset=sudden AND region=ruq AND radiation=back"
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from etiology_index import iter_presentation_docs
+from presentation_codec import EnumTables, load_enum_tables, load_enum_tables_from_path
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+DIFFERENTIALS_DIR = Path(__file__).resolve().parent
+PRESENTATIONS_DIR = DIFFERENTIALS_DIR / "data" / "presentations"
+SCHEMA_PATH = DIFFERENTIALS_DIR.parent / "assets" / "presentations_schema.json"
+INDEX_PATH = DIFFERENTIALS_DIR / "data" / "hpi_bitmap_index.json"
+
+FORMAT_NAME = "hpi-bitmap-index"
+FORMAT_VERSION = 1
+QUERY_RESULT_LIMIT = 40
+BENCH_REPEATS = 10000
+
+
+# -----------------------------
+# Run-length bitmap encoding
+# -----------------------------
+
+def encode_runs(bits: int) -> List[int]:
+    """Encode a bitset as alternating [gap, run, gap, run, ...] lengths."""
+    runs: List[int] = []
+    pos = 0
+    while bits:
+        low = bits & -bits
+        start = low.bit_length() - 1
+        shifted = bits >> start
+        length = (~shifted & (shifted + 1)).bit_length() - 1
+        runs.extend((start - pos, length))
+        pos = start + length
+        bits &= ~(((1 << length) - 1) << start)
+    return runs
+
+
+def decode_runs(runs: List[int]) -> int:
+    bits = 0
+    pos = 0
+    for i in range(0, len(runs) - 1, 2):
+        pos += runs[i]
+        length = runs[i + 1]
+        bits |= ((1 << length) - 1) << pos
+        pos += length
+    return bits
+
+
+def iter_ids(bits: int):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+# -----------------------------
+# Build
+# -----------------------------
+
+def build_index(root: Path, tables: EnumTables) -> Dict[str, Any]:
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value: Any) -> int:
+        text = "" if value is None else str(value)
+        if text not in string_ids:
+            string_ids[text] = len(strings)
+            strings.append(text)
+        return string_ids[text]
+
+    presentations: List[List[Any]] = []
+    items: List[List[int]] = []
+    bitmaps: Dict[str, Dict[str, int]] = {k: {v: 0 for v in tables.enums[k]} for k in tables.keys}
+
+    for rel_path, doc in iter_presentation_docs(root):
+        pres_idx = len(presentations)
+        start = len(items)
+        for item in doc.get("items") or []:
+            if not isinstance(item, dict):
+                continue
+            item_id = len(items)
+            items.append([pres_idx, intern(item.get("name", "")), intern(item.get("system", ""))])
+            hpi = item.get("hpi")
+            if not isinstance(hpi, dict):
+                continue
+            bit = 1 << item_id
+            for key, values in hpi.items():
+                per_key = bitmaps.get(key)
+                if per_key is None or not isinstance(values, list):
+                    continue
+                for value in values:
+                    if value in per_key:
+                        per_key[value] |= bit
+        presentations.append([intern(doc.get("presentation", "")), intern(rel_path), start, len(items) - start])
+
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "schemaHash": tables.schema_hash,
+        "count": len(items),
+        "strings": strings,
+        "presentations": presentations,
+        "items": items,
+        "bitmaps": {
+            key: {value: encode_runs(bits) for value, bits in per_key.items()}
+            for key, per_key in bitmaps.items()
+        },
+    }
+
+
+def write_index(root: Path, schema_obj: Dict[str, Any], dest_path: Path) -> Dict[str, Any]:
+    payload = build_index(root, load_enum_tables(schema_obj))
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest_path.with_name(dest_path.name + ".tmp")
+    tmp.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(dest_path)
+    return payload
+
+
+# -----------------------------
+# Query engine
+# -----------------------------
+# Grammar (case-insensitive operators, NOT binds tightest, then AND, then OR):
+#   expr   := term (OR term)*
+#   term   := factor (AND factor)*
+#   factor := NOT factor | "(" expr ")" | key "=" value
+# Keys may contain spaces ("clinical tests=palpation").
+
+_TOKEN_RE = re.compile(r"\s*(\(|\)|\bAND\b|\bOR\b|\bNOT\b|[^()]+?(?=\s+(?:AND|OR)\b|\s*[()]|\s*$))", re.IGNORECASE)
+
+
+def tokenize(expr: str) -> List[str]:
+    tokens: List[str] = []
+    pos = 0
+    expr = expr.strip()
+    while pos < len(expr):
+        m = _TOKEN_RE.match(expr, pos)
+        if not m or m.end() == pos:
+            raise ValueError(f"Cannot parse query near: {expr[pos:]!r}")
+        tok = m.group(1).strip()
+        if tok:
+            tokens.append(tok.upper() if tok.upper() in {"AND", "OR", "NOT"} else tok)
+        pos = m.end()
+    return tokens
+
+
+@dataclass(frozen=True)
+class ItemRef:
+    item_id: int
+    presentation: str
+    path: str
+    name: str
+    system: str
+
+
+class HpiBitmapIndex:
+    def __init__(self, payload: Dict[str, Any]):
+        if payload.get("format") != FORMAT_NAME or payload.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format: {payload.get('format')} v{payload.get('version')}")
+        self.schema_hash: str = payload["schemaHash"]
+        self.count: int = payload["count"]
+        self.universe: int = (1 << self.count) - 1
+        self._strings: List[str] = payload["strings"]
+        self._presentations: List[List[Any]] = payload["presentations"]
+        self._items: List[List[int]] = payload["items"]
+        self.bitmaps: Dict[str, Dict[str, int]] = {
+            key: {value: decode_runs(runs) for value, runs in per_key.items()}
+            for key, per_key in payload["bitmaps"].items()
+        }
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "HpiBitmapIndex":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    @classmethod
+    def build(cls, root: Path = PRESENTATIONS_DIR, tables: EnumTables | None = None) -> "HpiBitmapIndex":
+        return cls(build_index(root, tables or load_enum_tables_from_path(SCHEMA_PATH)))
+
+    def bitmap(self, key: str, value: str) -> int:
+        per_key = self.bitmaps.get(key.strip().lower())
+        if per_key is None:
+            raise KeyError(f"Unknown HPI key: {key!r}")
+        value = value.strip()
+        if value not in per_key:
+            raise KeyError(f"'{value}' is not an enum value of {key!r}")
+        return per_key[value]
+
+    def compile(self, expr: str) -> Callable[[], int]:
+        """Parse `expr` once; the returned callable evaluates it with bitwise ops."""
+        tokens = tokenize(expr)
+        pos = 0
+
+        def peek() -> str | None:
+            return tokens[pos] if pos < len(tokens) else None
+
+        def take() -> str:
+            nonlocal pos
+            tok = tokens[pos]
+            pos += 1
+            return tok
+
+        def parse_expr() -> Callable[[], int]:
+            parts = [parse_term()]
+            while peek() == "OR":
+                take()
+                parts.append(parse_term())
+            if len(parts) == 1:
+                return parts[0]
+
+            def run_or() -> int:
+                out = 0
+                for part in parts:
+                    out |= part()
+                return out
+            return run_or
+
+        def parse_term() -> Callable[[], int]:
+            parts = [parse_factor()]
+            while peek() == "AND":
+                take()
+                parts.append(parse_factor())
+            if len(parts) == 1:
+                return parts[0]
+
+            def run_and() -> int:
+                out = self.universe
+                for part in parts:
+                    out &= part()
+                    if not out:
+                        break
+                return out
+            return run_and
+
+        def parse_factor() -> Callable[[], int]:
+            tok = peek()
+            if tok is None:
+                raise ValueError("Unexpected end of query")
+            if tok == "NOT":
+                take()
+                inner = parse_factor()
+                universe = self.universe
+                return lambda: universe & ~inner()
+            if tok == "(":
+                take()
+                inner = parse_expr()
+                if peek() != ")":
+                    raise ValueError("Missing closing parenthesis")
+                take()
+                return inner
+            take()
+            if "=" not in tok:
+                raise ValueError(f"Expected key=value, got {tok!r}")
+            key, value = tok.split("=", 1)
+            bits = self.bitmap(key, value)
+            return lambda: bits
+
+        node = parse_expr()
+        if pos != len(tokens):
+            raise ValueError(f"Unexpected token {tokens[pos]!r}")
+        return node
+
+    def query_bits(self, expr: str) -> int:
+        return self.compile(expr)()
+
+    def count_matches(self, expr: str) -> int:
+        return bin(self.query_bits(expr)).count("1")
+
+    def item(self, item_id: int) -> ItemRef:
+        s = self._strings
+        pres_idx, name_id, system_id = self._items[item_id]
+        title_id, path_id = self._presentations[pres_idx][:2]
+        return ItemRef(item_id, s[title_id], s[path_id], s[name_id], s[system_id])
+
+    def query(self, expr: str) -> List[ItemRef]:
+        return [self.item(i) for i in iter_ids(self.query_bits(expr))]
+
+
+def main() -> int:
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        schema_obj = json.loads(SCHEMA_PATH.read_text(encoding="utf-8"))
+        payload = write_index(PRESENTATIONS_DIR, schema_obj, INDEX_PATH)
+        nbitmaps = sum(len(v) for v in payload["bitmaps"].values())
+        print(f"Wrote {INDEX_PATH} ({payload['count']} items, {nbitmaps} bitmaps)")
+        return 0
+
+    index = HpiBitmapIndex.load(INDEX_PATH) if INDEX_PATH.exists() else HpiBitmapIndex.build(PRESENTATIONS_DIR)
+    expr = " ".join(args)
+    try:
+        run = index.compile(expr)
+    except (KeyError, ValueError) as e:
+        print(f"ERROR: {e}")
+        return 2
+
+    t0 = time.perf_counter()
+    for _ in range(BENCH_REPEATS):
+        bits = run()
+    per_query_us = (time.perf_counter() - t0) / BENCH_REPEATS * 1e6
+
+    hits = [index.item(i) for i in iter_ids(bits)]
+    print(f"{expr}: {len(hits)} item(s) of {index.count} ({per_query_us:.2f} us/eval)")
+    for hit in hits[:QUERY_RESULT_LIMIT]:
+        print(f"  - {hit.name} | {hit.system or '—'} | {hit.presentation}")
+    extra = len(hits) - QUERY_RESULT_LIMIT
+    if extra > 0:
+        print(f"  ... {extra} more")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""Content-addressed, page-level text cache for PDFs (pdftotext -layout).
+
+Cache layout under CACHE_ROOT/<sha256 of the PDF bytes>/:
+  ranges/<first>-<last>.txt   per-range pdftotext output, written as workers finish
+  pages.bin                   every page's UTF-8 text, back to back
+  pages.json                  {"pageCount": n, "offsets": [n + 1 byte offsets], ...}
+
+A cold start splits the book into PAGES_PER_TASK ranges and runs one
+`pdftotext -f/-l` process per range, up to one per core. Finished ranges
+survive an interrupted run and are reused. Once every range is present they are
+assembled into pages.bin. Readers get a `PageStore`: a Sequence[str] over an
+mmap of pages.bin that decodes one page at a time instead of holding the whole
+book as one string. Editing the PDF changes its hash, so stale text is never
+served.
+
+Usage:
+  python3 pdf_page_store.py book.pdf        # warm the cache, print stats
+  python3 pdf_page_store.py book.pdf 123    # print page 123 (1-based)
+  python3 pdf_page_store.py --check         # self-check on generated PDFs
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List, Sequence, Tuple, overload
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+CACHE_ROOT = Path("/tmp/pdf_page_cache")
+PAGES_PER_TASK = 16
+MAX_WORKERS = os.cpu_count() or 1
+PDFTOTEXT_ARGS: Tuple[str, ...] = ("-layout",)
+
+FORMAT_NAME = "pdf-page-store"
+FORMAT_VERSION = 1
+
+
+RangeExtractor = Callable[[Path, int, int], List[str]]
+
+
+def pdf_sha256(pdf_path: Path) -> str:
+    h = hashlib.sha256()
+    with Path(pdf_path).open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def pdf_page_count(pdf_path: Path) -> int:
+    out = subprocess.check_output(["pdfinfo", str(pdf_path)]).decode("utf-8", "ignore")
+    m = re.search(r"^Pages:\s+(\d+)", out, re.MULTILINE)
+    if not m:
+        raise ValueError(f"pdfinfo reported no page count for {pdf_path}")
+    return int(m.group(1))
+
+
+def pdftotext_range(pdf_path: Path, first: int, last: int) -> List[str]:
+    """Text of pages first..last (1-based, inclusive). pdftotext ends every page with a form feed."""
+    cmd = ["pdftotext", *PDFTOTEXT_ARGS, "-f", str(first), "-l", str(last), str(pdf_path), "-"]
+    text = subprocess.check_output(cmd).decode("utf-8", "ignore")
+    pages = text.split("\f")
+    expected = last - first + 1
+    if len(pages) == expected + 1 and pages[-1] == "":
+        pages.pop()
+    if len(pages) != expected:
+        raise ValueError(f"pdftotext returned {len(pages)} page(s) for {first}-{last}, expected {expected}")
+    return pages
+
+
+def plan_ranges(page_count: int, per_task: int = PAGES_PER_TASK) -> List[Tuple[int, int]]:
+    return [(first, min(page_count, first + per_task - 1)) for first in range(1, page_count + 1, per_task)]
+
+
+# -----------------------------
+# Store
+# -----------------------------
+
+class PageStore(Sequence[str]):
+    """Read-only, 0-indexed sequence of page texts backed by an mmap of pages.bin."""
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+        meta = json.loads((self.store_dir / "pages.json").read_text(encoding="utf-8"))
+        if meta.get("format") != FORMAT_NAME or meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported page store: {meta.get('format')} v{meta.get('version')}")
+        self.pdf_sha256: str = meta["pdfSha256"]
+        self._offsets: List[int] = meta["offsets"]
+        self._file = (self.store_dir / "pages.bin").open("rb")
+        size = self._offsets[-1]
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+        return self._buf[self._offsets[index] : self._offsets[index + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def page(self, number: int) -> str:
+        """1-based page access, matching pdftotext's -f/-l numbering."""
+        return self[number - 1]
+
+    def close(self) -> None:
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._file.close()
+
+    def __enter__(self) -> "PageStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _range_path(ranges_dir: Path, first: int, last: int) -> Path:
+    return ranges_dir / f"{first:05d}-{last:05d}.txt"
+
+
+def _read_range(path: Path) -> List[str]:
+    return path.read_text(encoding="utf-8").split("\f")
+
+
+def build_store(
+    pdf_path: Path,
+    store_dir: Path,
+    page_count: int,
+    extractor: RangeExtractor = pdftotext_range,
+    per_task: int = PAGES_PER_TASK,
+    max_workers: int = MAX_WORKERS,
+) -> dict:
+    """Extract missing ranges in parallel, then assemble pages.bin/pages.json. Returns build stats."""
+    ranges_dir = store_dir / "ranges"
+    ranges_dir.mkdir(parents=True, exist_ok=True)
+    ranges = plan_ranges(page_count, per_task)
+    todo = [r for r in ranges if not _range_path(ranges_dir, *r).exists()]
+
+    def run(rng: Tuple[int, int]) -> None:
+        pages = extractor(pdf_path, *rng)
+        # Pages never contain form feeds (pdftotext uses them as separators).
+        _write_atomic(_range_path(ranges_dir, *rng), "\f".join(pages).encode("utf-8"))
+
+    t0 = time.perf_counter()
+    # Each task is an external pdftotext process; threads only wait on them.
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        list(pool.map(run, todo))
+    extract_s = time.perf_counter() - t0
+
+    offsets = [0]
+    tmp_bin = store_dir / f"pages.bin.{os.getpid()}.tmp"
+    with tmp_bin.open("wb") as out:
+        for rng in ranges:
+            pages = _read_range(_range_path(ranges_dir, *rng))
+            if len(pages) != rng[1] - rng[0] + 1:
+                raise ValueError(f"Cached range {rng} has {len(pages)} page(s)")
+            for page in pages:
+                data = page.encode("utf-8")
+                out.write(data)
+                offsets.append(offsets[-1] + len(data))
+    tmp_bin.replace(store_dir / "pages.bin")
+    meta = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "pdfSha256": store_dir.name,
+        "pageCount": page_count,
+        "offsets": offsets,
+    }
+    _write_atomic(store_dir / "pages.json", json.dumps(meta, separators=(",", ":")).encode("utf-8"))
+    shutil.rmtree(ranges_dir, ignore_errors=True)
+    return {"ranges": len(ranges), "extracted": len(todo), "reused": len(ranges) - len(todo), "extract_s": extract_s}
+
+
+def open_page_store(
+    pdf_path: Path,
+    cache_root: Path = CACHE_ROOT,
+    extractor: RangeExtractor = pdftotext_range,
+    page_counter: Callable[[Path], int] = pdf_page_count,
+    verbose: bool = True,
+) -> PageStore:
+    """Return the cached store for this PDF's content, building missing pages first."""
+    digest = pdf_sha256(pdf_path)
+    store_dir = Path(cache_root) / digest
+    if (store_dir / "pages.json").exists():
+        return PageStore(store_dir)
+
+    page_count = page_counter(pdf_path)
+    stats = build_store(pdf_path, store_dir, page_count, extractor=extractor)
+    if verbose:
+        print(
+            f"Page cache: {page_count} page(s) in {stats['ranges']} range(s), "
+            f"{stats['extracted']} extracted / {stats['reused']} reused in {stats['extract_s']:.2f}s -> {store_dir}"
+        )
+    return PageStore(store_dir)
+
+
+# -----------------------------
+# Self-check (--check)
+# -----------------------------
+
+def make_test_pdf(pages: Sequence[str]) -> bytes:
+    """Minimal single-font PDF with one text line per page (enough for pdftotext)."""
+    objects: List[bytes] = []
+    n = len(pages)
+    page_ids = [4 + 2 * i for i in range(n)]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {n} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, text in enumerate(pages):
+        safe = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        stream = f"BT /F1 12 Tf 72 720 Td ({safe}) Tj ET".encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_ids[i] + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    xref = []
+    for num, body in enumerate(objects, start=1):
+        xref.append(len(out))
+        out += f"{num} 0 obj\n".encode() + body + b"\nendobj\n"
+    start = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{off:010d} 00000 n \n".encode() for off in xref)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{start}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def run_check() -> int:
+    failures: List[str] = []
+
+    def expect(cond: bool, label: str) -> None:
+        print(f"  {'ok  ' if cond else 'FAIL'} {label}")
+        if not cond:
+            failures.append(label)
+
+    texts = [f"PAGE {i} CAUSES line {i}" for i in range(1, 38)]
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        pdf = root / "book.pdf"
+        pdf.write_bytes(make_test_pdf(texts))
+
+        print("Store mechanics (in-process extractor):")
+        calls: List[Tuple[int, int]] = []
+
+        def fake_extract(_pdf: Path, first: int, last: int) -> List[str]:
+            calls.append((first, last))
+            return [f"{texts[p - 1]}\n" for p in range(first, last + 1)]
+
+        def count(_pdf: Path) -> int:
+            return len(texts)
+
+        with open_page_store(pdf, root / "cache", fake_extract, count, verbose=False) as store:
+            expect(len(store) == len(texts), "page count")
+            expect(store.page(1) == texts[0] + "\n" and store[-1] == texts[-1] + "\n", "first/last page text")
+            expect(store[3:6] == [t + "\n" for t in texts[3:6]], "slice access")
+            expect(len(calls) == len(plan_ranges(len(texts))), "one extraction per range")
+
+        calls.clear()
+        with open_page_store(pdf, root / "cache", fake_extract, count, verbose=False):
+            expect(not calls, "warm start extracts nothing")
+
+        # Interrupted cold start: keep two finished ranges, rebuild the rest.
+        digest = pdf_sha256(pdf)
+        partial = root / "partial" / digest / "ranges"
+        partial.mkdir(parents=True)
+        for rng in plan_ranges(len(texts))[:2]:
+            _range_path(partial, *rng).write_text("\f".join(fake_extract(pdf, *rng)), encoding="utf-8")
+        calls.clear()
+        with open_page_store(pdf, root / "partial", fake_extract, count, verbose=False) as store:
+            expect(len(calls) == len(plan_ranges(len(texts))) - 2, "finished ranges reused after interruption")
+            expect(list(store) == [t + "\n" for t in texts], "reassembled text")
+
+        pdf.write_bytes(make_test_pdf(texts[:5]))
+        calls.clear()
+        with open_page_store(pdf, root / "cache", fake_extract, lambda _p: 5, verbose=False) as store:
+            expect(len(store) == 5 and bool(calls), "content change invalidates cache")
+
+        if shutil.which("pdftotext") and shutil.which("pdfinfo"):
+            print("pdftotext parity:")
+            pdf.write_bytes(make_test_pdf(texts))
+            whole = subprocess.check_output(["pdftotext", *PDFTOTEXT_ARGS, str(pdf), "-"]).decode("utf-8", "ignore")
+            whole_pages = whole.split("\f")[:-1]
+            with open_page_store(pdf, root / "real", verbose=False) as store:
+                expect(list(store) == whole_pages, "per-range pages match a whole-document run")
+                expect(all(t in p for t, p in zip(texts, store)), "page text present")
+        else:
+            print("pdftotext parity: SKIP (pdftotext/pdfinfo not installed)")
+
+    print("FAILED" if failures else "All checks passed.")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    if "--check" in sys.argv:
+        return run_check()
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print(__doc__)
+        return 2
+    t0 = time.perf_counter()
+    with open_page_store(Path(args[0])) as store:
+        if len(args) > 1:
+            print(store.page(int(args[1])))
+        else:
+            chars = sum(len(p) for p in store)
+            print(f"{len(store)} page(s), {chars} chars, ready in {time.perf_counter() - t0:.2f}s ({store.store_dir})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Persistent full-text index over the Pocketbook page text (SQLite FTS5).
+
+One row per non-blank layout line, keyed by (page, line) and attributed to the
+chapter (presentation) whose page range `build_chapter_blocks` assigns it. The
+database lives next to the page cache for the same PDF hash, so it goes stale
+together with the text; it is rebuilt when the chapter mapping changes.
+
+FTS5 is positional, so phrase ("acute pancreatitis") and NEAR(...) queries are
+answered from the index. Matching is per layout line: a phrase split across a
+line break is not found.
+
+Usage:
+  python3 pocketbook_fts.py build
+  python3 pocketbook_fts.py '"acute pancreatitis" OR gallstone*'   # raw FTS5 syntax
+  python3 pocketbook_fts.py --phrase acute pancreatitis
+  python3 pocketbook_fts.py --near 8 pancreatitis alcohol
+  options: --chapter "Abdominal pain"  --limit 20
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import py_path  # noqa: F401
+from cli_util import take_option
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+DB_NAME = "fts.sqlite"  # Stored inside the page store directory for the PDF.
+TOKENIZER = "unicode61 remove_diacritics 2"
+DEFAULT_LIMIT = 20
+SNIPPET_MARKS = ("[", "]")
+
+FORMAT_VERSION = 1
+
+
+_WORD_RE = re.compile(r"\w+")
+_QUALIFIER_RE = re.compile(r"\s*\([^()]*\)")  # "Pancreatitis (alcohol-induced)" -> "Pancreatitis"
+
+
+@dataclass(frozen=True)
+class Evidence:
+    page: int
+    line: int
+    chapter: str | None
+    text: str
+
+
+def chapter_key(chapter_ranges: Dict[str, Tuple[int, int]]) -> str:
+    payload = json.dumps(sorted(chapter_ranges.items()), separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def page_chapters(page_count: int, chapter_ranges: Dict[str, Tuple[int, int]]) -> List[str | None]:
+    owners: List[str | None] = [None] * page_count
+    for name, (start, end) in sorted(chapter_ranges.items(), key=lambda kv: kv[1]):
+        for page in range(max(1, start), min(page_count, end) + 1):
+            owners[page - 1] = name
+    return owners
+
+
+def iter_line_rows(
+    pages: Sequence[str], chapter_ranges: Dict[str, Tuple[int, int]]
+) -> Iterable[Tuple[int, int, str | None, str]]:
+    owners = page_chapters(len(pages), chapter_ranges)
+    for page_no, page in enumerate(pages, start=1):
+        for line_no, line in enumerate(page.splitlines(), start=1):
+            text = " ".join(line.split())  # Collapse layout column gaps.
+            if text:
+                yield page_no, line_no, owners[page_no - 1], text
+
+
+def build_index(
+    pages: Sequence[str], db_path: Path, chapter_ranges: Dict[str, Tuple[int, int]], pdf_sha256: str
+) -> int:
+    """(Re)build the database at `db_path`; returns the number of indexed lines."""
+    db_path = Path(db_path)
+    tmp = db_path.with_name(db_path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(
+            f"""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE lines (
+                id INTEGER PRIMARY KEY,
+                page INTEGER NOT NULL,
+                line INTEGER NOT NULL,
+                chapter TEXT,
+                text TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE lines_fts USING fts5(
+                text, content='lines', content_rowid='id', tokenize='{TOKENIZER}'
+            );
+            """
+        )
+        conn.executemany(
+            "INSERT INTO lines (page, line, chapter, text) VALUES (?, ?, ?, ?)",
+            iter_line_rows(pages, chapter_ranges),
+        )
+        conn.execute("INSERT INTO lines_fts (rowid, text) SELECT id, text FROM lines")
+        conn.execute("INSERT INTO lines_fts (lines_fts) VALUES ('optimize')")
+        conn.execute("CREATE INDEX lines_chapter ON lines (chapter)")
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [
+                ("version", str(FORMAT_VERSION)),
+                ("pdfSha256", pdf_sha256),
+                ("chapterKey", chapter_key(chapter_ranges)),
+                ("pageCount", str(len(pages))),
+            ],
+        )
+        count = conn.execute("SELECT COUNT(*) FROM lines").fetchone()[0]
+        conn.commit()
+    finally:
+        conn.close()
+    tmp.replace(db_path)
+    return count
+
+
+def read_meta(db_path: Path) -> Dict[str, str]:
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return {}
+    try:
+        return dict(conn.execute("SELECT key, value FROM meta").fetchall())
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+
+
+def ensure_index(
+    pages: Sequence[str], store_dir: Path, chapter_ranges: Dict[str, Tuple[int, int]], pdf_sha256: str
+) -> Path:
+    """Path to an up-to-date index for these pages and chapter ranges, building it if needed."""
+    db_path = Path(store_dir) / DB_NAME
+    meta = read_meta(db_path) if db_path.exists() else {}
+    if (
+        meta.get("version") != str(FORMAT_VERSION)
+        or meta.get("pdfSha256") != pdf_sha256
+        or meta.get("chapterKey") != chapter_key(chapter_ranges)
+    ):
+        t0 = time.perf_counter()
+        count = build_index(pages, db_path, chapter_ranges, pdf_sha256)
+        print(f"Full-text index: {count} lines in {time.perf_counter() - t0:.2f}s -> {db_path}")
+    return db_path
+
+
+# -----------------------------
+# Queries
+# -----------------------------
+
+def fts_phrase(text: str) -> str:
+    """Free text -> FTS5 phrase ("a b c"); punctuation is dropped like the tokenizer does."""
+    words = _WORD_RE.findall(text.lower())
+    return '"' + " ".join(words) + '"' if words else ""
+
+
+def fts_near(terms: Sequence[str], distance: int) -> str:
+    phrases = [p for p in (fts_phrase(t) for t in terms) if p]
+    if len(phrases) < 2:
+        return phrases[0] if phrases else ""
+    return f"NEAR({' '.join(phrases)}, {int(distance)})"
+
+
+class PocketbookIndex:
+    """Read-only query API over a built index."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "PocketbookIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def search(
+        self, match: str, chapter: str | None = None, limit: int = DEFAULT_LIMIT, highlight: bool = True
+    ) -> List[Evidence]:
+        """Lines matching an FTS5 expression, in book order (matches wrapped in SNIPPET_MARKS)."""
+        if not match:
+            return []
+        text_col = "highlight(lines_fts, 0, ?, ?)" if highlight else "l.text"
+        sql = (
+            f"SELECT l.page, l.line, l.chapter, {text_col} "
+            "FROM lines_fts JOIN lines l ON l.id = lines_fts.rowid "
+            "WHERE lines_fts MATCH ?"
+        )
+        params: List[object] = [*SNIPPET_MARKS, match] if highlight else [match]
+        if chapter is not None:
+            sql += " AND l.chapter = ?"
+            params.append(chapter)
+        sql += " ORDER BY l.page, l.line LIMIT ?"
+        params.append(limit)
+        return [Evidence(*row) for row in self._conn.execute(sql, params)]
+
+    def phrase(
+        self, text: str, chapter: str | None = None, limit: int = DEFAULT_LIMIT, highlight: bool = True
+    ) -> List[Evidence]:
+        return self.search(fts_phrase(text), chapter, limit, highlight)
+
+    def near(
+        self,
+        terms: Sequence[str],
+        distance: int,
+        chapter: str | None = None,
+        limit: int = DEFAULT_LIMIT,
+        highlight: bool = True,
+    ) -> List[Evidence]:
+        return self.search(fts_near(terms, distance), chapter, limit, highlight)
+
+    def evidence_for(self, item_name: str, chapter: str | None, limit: int = 3, distance: int = 8) -> List[Evidence]:
+        """Supporting lines for an item: exact phrase first, then its content words NEAR each other.
+
+        Items whose parenthetical qualifier the book doesn't repeat fall back to the same two
+        lookups on the head term alone.
+        """
+        head = " ".join(_QUALIFIER_RE.sub(" ", item_name).split())
+        for name in dict.fromkeys(n for n in (item_name, head) if n):
+            hits = self.phrase(name, chapter, limit, highlight=False)
+            if hits:
+                return hits
+            words = [w for w in _WORD_RE.findall(name.lower()) if len(w) >= 4]
+            if len(words) >= 2:
+                hits = self.near(words, distance, chapter, limit, highlight=False)
+                if hits:
+                    return hits
+        return []
+
+
+def evidence_rows(hits: Iterable[Evidence]) -> List[Dict[str, object]]:
+    return [asdict(hit) for hit in hits]
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def open_book_index() -> Path:
+    """Build or reuse the index for the configured Pocketbook PDF and chapter mapping."""
+    import fill_clinical_todo_from_pdf as fill  # Lazy: fill imports this module for provenance.
+
+    pages = fill.load_pdf_pages(fill.discover_pdf_path())
+    boundary = fill.load_all_clinical_presentations(fill.TODO_DIR.parent)
+    _, ranges, _ = fill.build_chapter_blocks(pages, boundary, boundary)
+    return ensure_index(pages, pages.store_dir, ranges, pages.pdf_sha256)
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    chapter = take_option(args, "--chapter")
+    limit = int(take_option(args, "--limit") or DEFAULT_LIMIT)
+    near = take_option(args, "--near")
+    phrase = "--phrase" in args
+    args = [a for a in args if a != "--phrase"]
+
+    if not args:
+        print(__doc__)
+        return 2
+    db_path = open_book_index()
+    if args == ["build"]:
+        return 0
+
+    if near is not None:
+        match = fts_near(args, int(near))
+    elif phrase:
+        match = fts_phrase(" ".join(args))
+    else:
+        match = " ".join(args)
+
+    with PocketbookIndex(db_path) as index:
+        t0 = time.perf_counter()
+        try:
+            hits = index.search(match, chapter, limit)
+        except sqlite3.OperationalError as e:
+            print(f"ERROR: {e} (query: {match})")
+            return 2
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    print(f"{match}: {len(hits)} line(s){' (limit)' if len(hits) == limit else ''} in {elapsed_ms:.1f} ms")
+    for hit in hits:
+        print(f"  p{hit.page}:{hit.line} [{hit.chapter or '—'}] {hit.text}")
+    return 0 if hits else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Compact, enum-coded encoding for presentation JSON files.
+
+The readable files under `data/presentations` stay the authoring format. This
+module packs them into a single column-wise bundle for the explorer:
+- HPI values become integer indices into the enum tables of
+  `presentations_schema.json` (values outside the enum are kept as strings).
+- Items are stored column-wise per presentation; system/freq labels are interned.
+- The bundle carries a hash of the enum tables so stale decoders fail loudly.
+
+Run directly to rebuild the bundle, or with `--check` to verify that every
+presentation file round-trips exactly and to print size/parse-time numbers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+DIFFERENTIALS_DIR = Path(__file__).resolve().parent
+PRESENTATIONS_DIR = DIFFERENTIALS_DIR / "data" / "presentations"
+SCHEMA_PATH = DIFFERENTIALS_DIR.parent / "assets" / "presentations_schema.json"
+BUNDLE_PATH = DIFFERENTIALS_DIR / "data" / "presentations.compact.json"
+
+FORMAT_NAME = "presentation-compact"
+FORMAT_VERSION = 2
+SCHEMA_HASH_LENGTH = 16
+
+# Item fields that get dedicated columns; anything else goes to `extras`.
+# Interned fields repeat heavily within a presentation and are stored as label-table indices.
+INTERNED_FIELDS = ("system", "freq", "systemChip")
+COLUMN_FIELDS = ("name", "redFlag", "hpi") + INTERNED_FIELDS
+
+DEFAULT_HPI_KEYS: Sequence[str] = (
+    "onset",
+    "progression",
+    "palliate",
+    "provoke",
+    "quality",
+    "timing",
+    "region",
+    "radiation",
+    "severity",
+    "clinical tests",
+    "other symptoms",
+)
+
+
+class EnumTables:
+    """HPI key order plus per-key enum value tables (value -> index and back)."""
+
+    def __init__(self, keys: Sequence[str], enums: Dict[str, List[str]]):
+        self.keys: List[str] = list(keys)
+        self.enums: Dict[str, List[str]] = {k: list(enums.get(k, [])) for k in self.keys}
+        self.codes: Dict[str, Dict[str, int]] = {
+            k: {v: i for i, v in enumerate(vals)} for k, vals in self.enums.items()
+        }
+        payload = json.dumps(
+            {"keys": self.keys, "enums": self.enums},
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        self.schema_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:SCHEMA_HASH_LENGTH]
+
+
+def _enum_of(prop: Any) -> List[str] | None:
+    if not isinstance(prop, dict):
+        return None
+    items = prop.get("items")
+    if isinstance(items, dict) and isinstance(items.get("enum"), list):
+        return [str(v) for v in items["enum"]]
+    return None
+
+
+def load_enum_tables(schema_obj: Dict[str, Any]) -> EnumTables:
+    """Read HPI enum tables from the presentations schema.
+
+    The schema nests `hpi` under `properties`, and some keys (e.g. "other symptoms")
+    sit beside `properties` rather than inside it, so both places are checked.
+    """
+    hpi = schema_obj.get("hpi")
+    if not isinstance(hpi, dict):
+        hpi = (schema_obj.get("properties") or {}).get("hpi")
+    if not isinstance(hpi, dict):
+        hpi = {}
+
+    required = hpi.get("required")
+    keys = list(required) if isinstance(required, list) and required else list(DEFAULT_HPI_KEYS)
+
+    enums: Dict[str, List[str]] = {}
+    props = hpi.get("properties") if isinstance(hpi.get("properties"), dict) else {}
+    for key in keys:
+        table = _enum_of(props.get(key)) or _enum_of(hpi.get(key))
+        enums[key] = table or []
+    return EnumTables(keys, enums)
+
+
+def load_enum_tables_from_path(path: Path = SCHEMA_PATH) -> EnumTables:
+    return load_enum_tables(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+class _Interner:
+    def __init__(self) -> None:
+        self.table: List[Any] = []
+        self._ids: Dict[str, int] = {}
+
+    def add(self, value: Any) -> int:
+        key = json.dumps(value, ensure_ascii=False)
+        idx = self._ids.get(key)
+        if idx is None:
+            idx = len(self.table)
+            self._ids[key] = idx
+            self.table.append(value)
+        return idx
+
+
+# -----------------------------
+# Encoder / decoder
+# -----------------------------
+
+def encode_hpi_values(key: str, values: Any, tables: EnumTables) -> Any:
+    if not isinstance(values, list):
+        return {"raw": values}
+    codes = tables.codes.get(key, {})
+    out: List[Any] = []
+    for value in values:
+        code = codes.get(value) if isinstance(value, str) else None
+        out.append(code if code is not None else {"v": value})
+    return out
+
+
+def decode_hpi_values(key: str, encoded: Any, tables: EnumTables) -> Any:
+    if isinstance(encoded, dict):
+        return encoded.get("raw")
+    table = tables.enums.get(key, [])
+    return [table[c] if isinstance(c, int) else c["v"] for c in encoded]
+
+
+def encode_presentation(doc: Dict[str, Any], tables: EnumTables) -> Dict[str, Any]:
+    """Encode one presentation document into its column-wise form."""
+    items = doc.get("items")
+    top_keys = list(doc.keys())
+    header = {k: v for k, v in doc.items() if k != "items"}
+    if not isinstance(items, list) or not all(isinstance(it, dict) for it in items):
+        return {"keys": top_keys, "header": header, "rawItems": items}
+
+    shapes = _Interner()
+    hpi_shapes = _Interner()
+    labels = {field: _Interner() for field in INTERNED_FIELDS}
+
+    shape_col: List[int] = []
+    name_col: List[Any] = []
+    label_cols: Dict[str, List[int]] = {field: [] for field in INTERNED_FIELDS}
+    red_col: List[Any] = []
+    hpi_shape_col: List[int] = []
+    hpi_cols: Dict[str, List[Any]] = {k: [] for k in tables.keys}
+    extras: Dict[str, Any] = {}
+
+    for row, item in enumerate(items):
+        shape_col.append(shapes.add(list(item.keys())))
+        name_col.append(item.get("name"))
+        for field in INTERNED_FIELDS:
+            label_cols[field].append(labels[field].add(item.get(field)))
+        red = item.get("redFlag")
+        red_col.append(int(red) if isinstance(red, bool) else {"v": red})
+
+        hpi = item.get("hpi")
+        if isinstance(hpi, dict) and set(hpi).issubset(tables.keys):
+            hpi_shape_col.append(hpi_shapes.add(list(hpi.keys())))
+            for key in tables.keys:
+                hpi_cols[key].append(encode_hpi_values(key, hpi[key], tables) if key in hpi else 0)
+        else:
+            hpi_shape_col.append(-1)
+            for key in tables.keys:
+                hpi_cols[key].append(0)
+
+        row_extras = {k: v for k, v in item.items() if k not in COLUMN_FIELDS}
+        if hpi_shape_col[-1] == -1 and "hpi" in item:
+            row_extras["hpi"] = hpi
+        if row_extras:
+            extras[str(row)] = row_extras
+
+    out: Dict[str, Any] = {
+        "keys": top_keys,
+        "header": header,
+        "count": len(items),
+        "shapes": shapes.table,
+        "hpiShapes": hpi_shapes.table,
+        "labels": {field: labels[field].table for field in INTERNED_FIELDS},
+        "cols": {
+            "shape": shape_col,
+            "name": name_col,
+            "redFlag": red_col,
+            "hpiShape": hpi_shape_col,
+            "hpi": hpi_cols,
+            **label_cols,
+        },
+    }
+    if extras:
+        out["extras"] = extras
+    return out
+
+
+def decode_presentation(enc: Dict[str, Any], tables: EnumTables) -> Dict[str, Any]:
+    """Rebuild the readable presentation document from `encode_presentation` output."""
+    header = enc.get("header", {})
+    if "rawItems" in enc:
+        items: Any = enc["rawItems"]
+    else:
+        cols = enc["cols"]
+        extras = enc.get("extras", {})
+        items = []
+        for row in range(enc["count"]):
+            row_extras = extras.get(str(row), {})
+            hpi_shape = cols["hpiShape"][row]
+            values: Dict[str, Any] = {"name": cols["name"][row]}
+            for field, table in enc["labels"].items():
+                values[field] = table[cols[field][row]]
+            red = cols["redFlag"][row]
+            values["redFlag"] = bool(red) if isinstance(red, int) else red["v"]
+            if hpi_shape >= 0:
+                values["hpi"] = {
+                    key: decode_hpi_values(key, cols["hpi"][key][row], tables)
+                    for key in enc["hpiShapes"][hpi_shape]
+                }
+            values.update(row_extras)
+            items.append({key: values[key] for key in enc["shapes"][cols["shape"][row]]})
+
+    doc: Dict[str, Any] = {}
+    for key in enc["keys"]:
+        doc[key] = items if key == "items" else header[key]
+    return doc
+
+
+def iter_presentation_files(root: Path = PRESENTATIONS_DIR) -> List[Path]:
+    return sorted(p for p in Path(root).rglob("*.json") if not p.name.startswith("."))
+
+
+def build_bundle(root: Path, tables: EnumTables) -> Dict[str, Any]:
+    """Encode every presentation file under `root` into one bundle object."""
+    root = Path(root)
+    presentations: List[Dict[str, Any]] = []
+    for path in iter_presentation_files(root):
+        try:
+            doc = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"! Skipping unreadable {path}: {e}")
+            continue
+        if not isinstance(doc, dict):
+            continue
+        enc = encode_presentation(doc, tables)
+        enc["path"] = path.relative_to(root).as_posix()
+        presentations.append(enc)
+
+    return {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "schemaHash": tables.schema_hash,
+        "hpiKeys": tables.keys,
+        "enums": tables.enums,
+        "presentations": presentations,
+    }
+
+
+def decode_bundle(bundle: Dict[str, Any], tables: EnumTables | None = None) -> Dict[str, Dict[str, Any]]:
+    """Return {relative path: readable doc}; raises if the schema hash does not match."""
+    if bundle.get("format") != FORMAT_NAME or bundle.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format: {bundle.get('format')} v{bundle.get('version')}")
+    if tables is None:
+        tables = EnumTables(bundle["hpiKeys"], bundle["enums"])
+    if bundle.get("schemaHash") != tables.schema_hash:
+        raise ValueError(
+            f"Schema hash mismatch: bundle={bundle.get('schemaHash')} decoder={tables.schema_hash}"
+        )
+    return {enc["path"]: decode_presentation(enc, tables) for enc in bundle["presentations"]}
+
+
+def dumps_bundle(bundle: Dict[str, Any]) -> str:
+    return json.dumps(bundle, ensure_ascii=False, separators=(",", ":"))
+
+
+def write_bundle(root: Path, schema_obj: Dict[str, Any], dest_path: Path) -> Dict[str, Any]:
+    tables = load_enum_tables(schema_obj)
+    bundle = build_bundle(root, tables)
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest_path.with_name(dest_path.name + ".tmp")
+    tmp.write_text(dumps_bundle(bundle), encoding="utf-8")
+    tmp.replace(dest_path)
+    return bundle
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+
+def check_round_trip(root: Path, tables: EnumTables) -> Tuple[int, List[str]]:
+    bundle = build_bundle(root, tables)
+    decoded = decode_bundle(json.loads(dumps_bundle(bundle)), tables)
+    failures: List[str] = []
+    for path in iter_presentation_files(root):
+        rel = path.relative_to(root).as_posix()
+        original = json.loads(path.read_text(encoding="utf-8"))
+        if rel not in decoded:
+            failures.append(f"{rel}: missing from bundle")
+            continue
+        if json.dumps(decoded[rel]) != json.dumps(original):
+            failures.append(f"{rel}: decoded document differs")
+    return len(decoded), failures
+
+
+def report_sizes(root: Path, tables: EnumTables) -> None:
+    files = iter_presentation_files(root)
+    raw_texts = [p.read_text(encoding="utf-8") for p in files]
+    bundle_text = dumps_bundle(build_bundle(root, tables))
+
+    t0 = time.perf_counter()
+    for text in raw_texts:
+        json.loads(text)
+    t_raw = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    bundle = json.loads(bundle_text)
+    t_bundle = time.perf_counter() - t0
+    decode_bundle(bundle, tables)
+    t_decoded = time.perf_counter() - t0
+
+    raw_bytes = sum(len(t.encode("utf-8")) for t in raw_texts)
+    bundle_bytes = len(bundle_text.encode("utf-8"))
+    print(f"readable: {len(files)} files, {raw_bytes:,} bytes, parse {t_raw * 1000:.1f} ms")
+    print(
+        f"compact:  1 file, {bundle_bytes:,} bytes, parse {t_bundle * 1000:.1f} ms,"
+        f" parse+decode {t_decoded * 1000:.1f} ms"
+    )
+    if bundle_bytes:
+        print(f"ratio:    {raw_bytes / bundle_bytes:.1f}x smaller")
+
+
+def main() -> int:
+    tables = load_enum_tables_from_path(SCHEMA_PATH)
+    if "--check" in sys.argv:
+        count, failures = check_round_trip(PRESENTATIONS_DIR, tables)
+        print(f"schema_hash: {tables.schema_hash}")
+        print(f"round-tripped: {count} presentations")
+        report_sizes(PRESENTATIONS_DIR, tables)
+        if failures:
+            print("\nERROR: round-trip mismatches:")
+            for fail in failures:
+                print(f"  - {fail}")
+            return 1
+        return 0
+
+    schema_obj = json.loads(SCHEMA_PATH.read_text(encoding="utf-8"))
+    bundle = write_bundle(PRESENTATIONS_DIR, schema_obj, BUNDLE_PATH)
+    print(f"Wrote {BUNDLE_PATH} ({len(bundle['presentations'])} presentations, schema {bundle['schemaHash']})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
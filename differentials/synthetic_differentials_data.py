@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""Generate differentials pipeline inputs (index, presentation list, book pages) at any scale.
+
+Section sizes, systems per symptom, etiologies per system and the non-clinical
+list lengths are profiled from today's `Presentation_list.json` and index files.
+On top of that shape the clinical index gets extra group levels (deep nesting),
+the malformed parentheticals `fix_parenthetical_etiologies.py` repairs, and the
+structural damage its pre-pass repairs (top-level keys pasted in before the
+previous block was closed, missing or surplus final closers). List names
+resolve to index keys exactly, after punctuation/case normalization, as
+umbrella names, or not at all, roughly as today. Output is deterministic for a
+given seed, scale and source files.
+
+Writes into OUT_DIR:
+1) clinical_presentation_index.json      malformed on purpose; run fix_parenthetical_etiologies.py first
+2) non-clinical_presentation_index.json
+3) Presentation_list.json                ~ SCALE x today's 121 presentations
+4) presentations_schema.json             copied as-is
+5) book_pages.json                       page texts: front matter, then one chapter (heading + CAUSES) per
+                                         clinical presentation, mentioning its etiologies
+6) dataset.json                          what was generated, from what, with which seed
+
+Usage:
+  python3 differentials/synthetic_differentials_data.py OUT_DIR [--scale N] [--seed N]
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import shutil
+import sys
+import textwrap
+from collections import Counter
+from itertools import accumulate
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Sequence, TextIO, Tuple
+
+from write_presentation import SECTION_INDEX_TYPE
+
+# Shared normalization rules live in <repo>/py/text_normalize.py
+import py_path  # noqa: F401
+from cli_util import take_option
+from text_normalize import compact_key
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+DIFFERENTIALS_DIR = Path(__file__).resolve().parent
+SOURCE_LIST_PATH = DIFFERENTIALS_DIR / "Presentation_list.json"
+SOURCE_CLINICAL_INDEX_PATH = DIFFERENTIALS_DIR / "clinical_presentation_index.json"
+SOURCE_NONCLINICAL_INDEX_PATH = DIFFERENTIALS_DIR / "non-clinical_presentation_index.json"
+SCHEMA_PATH = DIFFERENTIALS_DIR.parent / "assets" / "presentations_schema.json"
+
+DEFAULT_SCALE = 1
+DEFAULT_SEED = 7
+GENERATOR_VERSION = 1  # Bump when output for a given seed changes; invalidates cached bench datasets.
+
+# How list names relate to index keys (today: 112 exact, 1 alias, 8 unmatched of 121).
+LIST_MATCH_MIX: Dict[str, float] = {
+    "exact": 0.87,  # Same key
+    "normalized": 0.04,  # "KALOMI-PAIN" for "Kalomi pain"; matched by compact_key
+    "umbrella": 0.02,  # "Kalomi" -> "Kalomi pain", "Kalomi swellings"; substring match
+    "unmatched": 0.07,  # No index key
+}
+# Extra group levels between a system label and its etiologies (today: 0, a few 1).
+GROUP_DEPTH_WEIGHTS: Dict[int, float] = {0: 0.70, 1: 0.15, 2: 0.08, 4: 0.05, 8: 0.02}
+SPLIT_PAREN_RATE = 0.03  # "Name (seen in" -> {"older adults)": leaf, ...}
+NOTE_WITH_SUBTYPES_RATE = 0.02  # "Name (note)" -> {"Name subtype": leaf}; half also collide with "Name"
+QUALIFIER_RATE = 0.15  # Well-formed "Name (qualifier)" leaves
+UNCLOSED_BLOCK_RATE = 0.05  # Block missing closers; next top-level key pasted at column 0
+BOOK_CHAPTER_RATE = 0.97  # Clinical presentations that have a chapter in the book
+
+FRONT_MATTER_PAGES = 20  # fill_clinical_todo_from_pdf.MIN_CONTENT_PAGE
+PAGE_LINES = 45
+LINE_WIDTH = 78
+
+SYLLABLES = [c + v for c in "bdfgklmnprstvz" for v in "aeiou"]
+PRESENTATION_SUFFIXES = ["pain", "swellings", "ulcers", "lesions", "discharge", "deformities", "weakness", "bleeding"]
+DISEASE_ENDINGS = ["itis", "osis", "oma", "opathy", "algia", "emia", "iasis", "ectasia"]
+ETIOLOGY_PREFIXES = ["", "", "", "Acute", "Chronic", "Primary", "Secondary", "Viral", "Bacterial", "Congenital",
+                     "Drug-induced", "Idiopathic", "Traumatic", "Malignant"]
+SYSTEM_LABELS = ["GASTROINTESTINAL", "CARDIAC", "RESPIRATORY", "NEUROLOGICAL", "RENAL", "HEPATIC", "ENDOCRINE",
+                 "MUSCULOSKELETAL", "INFECTIVE", "VASCULAR", "HAEMATOLOGICAL", "DERMATOLOGICAL", "GENITOURINARY",
+                 "MALIGNANT DISEASE", "DRUGS", "PSYCHIATRIC"]
+GROUP_LABELS = ["Infective", "Inflammatory", "Neoplastic", "Primary", "Secondary", "Congenital", "Acquired",
+                "Local", "Systemic", "Bacterial", "Viral", "Autoimmune"]
+FREQS = ["common", "uncommon", "rare"]
+PAREN_NOTES = ["seen in|older adults", "usually|bilateral", "especially|after travel", "rarely|in children"]
+QUALIFIERS = ["acute", "chronic", "rare", "bilateral", "recurrent", "post-operative"]
+# Phrases the fill script's TOKEN_RULES pick up, with filler so not every sentence hits.
+CUE_PHRASES = [
+    "is usually of sudden onset", "has an insidious, gradual onset", "follows a chronic, relapsing course",
+    "is progressive and worsening over months", "often improves with rest", "is relieved by antacids",
+    "is made worse by exertion", "is provoked by eating", "is described as a burning pain",
+    "causes a dull, aching discomfort", "is colicky and intermittent", "is typically worse at night",
+    "is felt in the epigastric region", "may radiate to the back", "can radiate to the left arm",
+    "is severe and may wake the patient", "is mild in most cases", "is confirmed on ultrasound",
+    "needs a CT scan to exclude other causes", "shows a raised ESR and CRP", "is associated with fever and weight loss",
+    "comes with nausea and vomiting", "may present with jaundice", "is rarely seen in general practice",
+    "should be considered in the elderly", "is more frequent in smokers", "tends to recur",
+]
+SECTION_HEADINGS = ["HISTORY", "EXAMINATION", "GENERAL INVESTIGATIONS"]
+
+
+# -----------------------------
+# Source profile
+# -----------------------------
+
+def _leaf_counts(node: Any) -> Iterator[int]:
+    """Etiologies per innermost group of a real index block."""
+    if isinstance(node, dict):
+        leaves = [v for v in node.values() if isinstance(v, dict) and "freq" in v]
+        if leaves:
+            yield len(leaves)
+        for v in node.values():
+            if isinstance(v, dict) and "freq" not in v:
+                yield from _leaf_counts(v)
+
+
+def profile_source() -> Dict[str, Any]:
+    """Counts and histograms from today's list and index files (everything else is synthetic)."""
+    listing = json.loads(SOURCE_LIST_PATH.read_text(encoding="utf-8"))
+    clinical = json.loads(SOURCE_CLINICAL_INDEX_PATH.read_text(encoding="utf-8"))
+    nonclinical = json.loads(SOURCE_NONCLINICAL_INDEX_PATH.read_text(encoding="utf-8"))
+    return {
+        "sections": {section: len(entries) for section, entries in listing.items()},
+        "systemsPerSymptom": dict(Counter(len(block) for block in clinical.values())),
+        "etiologiesPerSystem": dict(Counter(n for block in clinical.values() for n in _leaf_counts(block))),
+        "nonclinicalSystemsPerSymptom": dict(Counter(len(block) for block in nonclinical.values())),
+        "nonclinicalItemsPerSystem": dict(
+            Counter(len(v) for block in nonclinical.values() for v in block.values() if isinstance(v, list))
+        ),
+    }
+
+
+class _Sampler:
+    """rng.choices over a {value: weight} histogram with the cumulative weights built once."""
+
+    def __init__(self, hist: Dict[Any, float]):
+        self.values = list(hist)
+        self.cum = list(accumulate(hist.values()))
+
+    def __call__(self, rng: random.Random) -> Any:
+        return rng.choices(self.values, cum_weights=self.cum)[0]
+
+
+# -----------------------------
+# Names
+# -----------------------------
+
+def coined_word(index: int) -> str:
+    """Bijective base-len(SYLLABLES) word, at least two syllables ("baba", "babe", ...)."""
+    n = len(SYLLABLES)
+    parts: List[str] = []
+    index += n  # Skip the one-syllable words
+    while True:
+        index, digit = divmod(index, n)
+        parts.append(SYLLABLES[digit])
+        if index == 0:
+            break
+        index -= 1
+    return "".join(reversed(parts))
+
+
+class Names:
+    """Presentation names (unique under compact_key, so index matching is unambiguous) and etiology names."""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.next_stem = 0
+        self.keys: set[str] = set()
+
+    def presentation(self, suffixes: int = 1) -> Tuple[str, List[str]]:
+        """(stem, [stem + suffix, ...]) with every compact key new."""
+        while True:
+            stem = coined_word(self.next_stem).capitalize()
+            self.next_stem += 1
+            names = [f"{stem} {s}" for s in self.rng.sample(PRESENTATION_SUFFIXES, suffixes)]
+            keys = {compact_key(stem), *(compact_key(n) for n in names)}
+            if not keys & self.keys:
+                self.keys |= keys
+                return stem, names
+
+    def etiology(self) -> str:
+        rng = self.rng
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3))) + rng.choice(DISEASE_ENDINGS)
+        prefix = rng.choice(ETIOLOGY_PREFIXES)
+        return f"{prefix} {word}" if prefix else word.capitalize()
+
+
+# -----------------------------
+# Index blocks
+# -----------------------------
+
+class BlockFactory:
+    """Clinical / non-clinical index blocks; counts what it made malformed."""
+
+    def __init__(self, rng: random.Random, names: Names, profile: Dict[str, Any]):
+        self.rng = rng
+        self.names = names
+        self.systems = _Sampler(profile["systemsPerSymptom"])
+        self.etiologies = _Sampler(profile["etiologiesPerSystem"])
+        self.group_depth = _Sampler(GROUP_DEPTH_WEIGHTS)
+        self.nc_systems = _Sampler(profile["nonclinicalSystemsPerSymptom"])
+        self.nc_items = _Sampler(profile["nonclinicalItemsPerSystem"])
+        self.counts: Counter = Counter()
+
+    def _leaf(self) -> Dict[str, str]:
+        return {"freq": self.rng.choice(FREQS)}
+
+    def etiology_group(self, count: int, shown: List[str]) -> Dict[str, Any]:
+        """{etiology: {"freq"}} with some malformed parentheticals; display names go to `shown`."""
+        rng = self.rng
+        out: Dict[str, Any] = {}
+        for _ in range(count):
+            name = self.names.etiology()
+            if any(key.startswith(name) for key in out):
+                continue
+            self.counts["etiologies"] += 1
+            roll = rng.random()
+            if roll < SPLIT_PAREN_RATE:
+                start, rest = rng.choice(PAREN_NOTES).split("|")
+                out[f"{name} ({start}"] = {f"{rest})": self._leaf(), f"{name} variant": self._leaf()}
+                shown.extend((name, f"{name} variant"))
+                self.counts["splitParentheticals"] += 1
+            elif roll < SPLIT_PAREN_RATE + NOTE_WITH_SUBTYPES_RATE:
+                out[f"{name} ({rng.choice(QUALIFIERS)})"] = {f"{name} subtype": self._leaf()}
+                if rng.random() < 0.5:
+                    out[name] = self._leaf()  # Collides with the flattened base name
+                    self.counts["collisions"] += 1
+                shown.extend((name, f"{name} subtype"))
+                self.counts["notesWithSubtypes"] += 1
+            elif roll < SPLIT_PAREN_RATE + NOTE_WITH_SUBTYPES_RATE + QUALIFIER_RATE:
+                out[f"{name} ({rng.choice(QUALIFIERS)})"] = self._leaf()
+                shown.append(name)
+            else:
+                out[name] = self._leaf()
+                shown.append(name)
+        return out
+
+    def clinical(self) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+        """(symptom block, system -> etiology display names for the book)."""
+        rng = self.rng
+        block: Dict[str, Any] = {}
+        shown: Dict[str, List[str]] = {}
+        for system in rng.sample(SYSTEM_LABELS, min(self.systems(rng), len(SYSTEM_LABELS))):
+            names: List[str] = []
+            node: Any = self.etiology_group(self.etiologies(rng), names)
+            depth = self.group_depth(rng)
+            for _ in range(depth):
+                inner, sibling = rng.sample(GROUP_LABELS, 2)
+                node = {inner: node, sibling: self.etiology_group(self.etiologies(rng), names)}
+            self.counts["maxDepth"] = max(self.counts["maxDepth"], depth + 3)
+            block[system] = node
+            shown[system] = names
+        return block, shown
+
+    def nonclinical(self) -> Dict[str, List[str]]:
+        rng = self.rng
+        return {
+            system: [self.names.etiology() for _ in range(self.nc_items(rng))]
+            for system in rng.sample(SYSTEM_LABELS, min(self.nc_systems(rng), len(SYSTEM_LABELS)))
+        }
+
+
+def _trailing_closers(lines: Sequence[str]) -> int:
+    n = 0
+    for line in reversed(lines):
+        if line.strip().rstrip(",") != "}":
+            break
+        n += 1
+    return n
+
+
+def write_damaged_index(fh: TextIO, blocks: Sequence[Tuple[str, Any]], rng: random.Random) -> Counter:
+    """Write `blocks` as an indent-2 JSON object with the structural damage repair_stream fixes.
+
+    An unclosed block loses 1..n of its trailing closers (the last kept one gets the
+    comma) and the next top-level key starts at column 0, as when a block is pasted
+    in by hand. The file either ends short of its final closers or with surplus ones.
+    """
+    damage: Counter = Counter()
+    fh.write("{\n")
+    column0 = False
+    for i, (key, block) in enumerate(blocks):
+        last = i == len(blocks) - 1
+        body = json.dumps(block, indent=2, ensure_ascii=False).split("\n")
+        head = f"{json.dumps(key, ensure_ascii=False)}: {{"
+        lines = [head if column0 else "  " + head, *("  " + line for line in body[1:-1]), "  }" + ("" if last else ",")]
+        column0 = False
+        closers = _trailing_closers(lines)
+        if not last and closers > 1 and rng.random() < UNCLOSED_BLOCK_RATE:
+            del lines[-rng.randint(1, closers - 1):]
+            lines[-1] += ","
+            column0 = True
+            damage["unclosedBlocks"] += 1
+        if last:
+            lines.append("}")
+            if rng.random() < 0.5:
+                drop = rng.randint(1, _trailing_closers(lines) - 1)
+                del lines[-drop:]
+                damage["missingFinalClosers"] += drop
+            else:
+                extra = rng.randint(1, 3)
+                lines.extend("}" * extra)
+                damage["surplusFinalClosers"] += extra
+        fh.write("\n".join(lines) + "\n")
+    if not blocks:
+        fh.write("}\n")
+    return damage
+
+
+# -----------------------------
+# Book pages
+# -----------------------------
+
+def _wrap(text: str) -> List[str]:
+    return textwrap.wrap(text, LINE_WIDTH) or [""]
+
+
+def chapter_lines(rng: random.Random, title: str, causes: Dict[str, List[str]]) -> List[str]:
+    """One chapter: all-caps heading, CAUSES list by system, then prose sections mentioning the causes."""
+    lines = [title.upper(), ""]
+    lines += _wrap(f"{title} is a common presentation. The causes below are grouped by system; "
+                   "history and examination narrow them down.")
+    lines += ["", "CAUSES", ""]
+    for system, names in causes.items():
+        lines.append(system)
+        lines.extend(f"● {name}" for name in names)
+    all_names = [name for names in causes.values() for name in names]
+    for heading in SECTION_HEADINGS:
+        sentences = [f"{name} {rng.choice(CUE_PHRASES)}." for name in all_names if rng.random() < 0.6]
+        lines += ["", heading, *_wrap(" ".join(sentences) or f"{title} {rng.choice(CUE_PHRASES)}.")]
+    return lines
+
+
+def iter_pages(lines: Sequence[str]) -> Iterator[str]:
+    for i in range(0, len(lines), PAGE_LINES):
+        yield "\n".join(lines[i : i + PAGE_LINES])
+
+
+def write_book(fh: TextIO, rng: random.Random, chapters: Sequence[Tuple[str, Dict[str, List[str]]]]) -> int:
+    """Stream a JSON list of page texts; returns the page count."""
+    pages = 0
+
+    def emit(page: str) -> None:
+        nonlocal pages
+        fh.write(("[\n" if pages == 0 else ",\n") + json.dumps(page, ensure_ascii=False))
+        pages += 1
+
+    preface = " ".join(f"{title} is covered in its own chapter." for title, _ in chapters[:40]) or "Preface."
+    for n in range(FRONT_MATTER_PAGES):
+        emit(f"Preface page {n + 1}\n\n" + "\n".join(_wrap(preface)[: PAGE_LINES - 2]))
+    for title, causes in chapters:
+        for page in iter_pages(chapter_lines(rng, title, causes)):
+            emit(page)
+    fh.write("\n]\n")
+    return pages
+
+
+# -----------------------------
+# Generate
+# -----------------------------
+
+def generate(out_dir: Path, scale: int = DEFAULT_SCALE, seed: int = DEFAULT_SEED) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    profile = profile_source()
+    names = Names(rng)
+    factory = BlockFactory(rng, names, profile)
+    mix = _Sampler(LIST_MATCH_MIX)
+
+    listing: Dict[str, List[Dict[str, str]]] = {}
+    clinical: List[Tuple[str, Any]] = []
+    nonclinical: List[Tuple[str, Any]] = []
+    chapters: List[Tuple[str, Dict[str, List[str]]]] = []
+    modes: Counter = Counter()
+    for section, count in profile["sections"].items():
+        is_clinical = SECTION_INDEX_TYPE.get(section) == "clinical"
+        entries = listing[section] = []
+        for _ in range(count * scale):
+            mode = mix(rng)
+            modes[mode] += 1
+            stem, variants = names.presentation(2 if mode == "umbrella" else 1)
+            list_name = stem if mode == "umbrella" else variants[0]
+            keys = {"exact": [list_name], "normalized": [list_name.upper().replace(" ", "-")],
+                    "umbrella": variants, "unmatched": []}[mode]
+            entries.append({"name": list_name})
+            causes: Dict[str, List[str]] = {}
+            for key in keys:
+                if is_clinical:
+                    block, shown = factory.clinical()
+                    clinical.append((key, block))
+                    for system, items in shown.items():
+                        causes.setdefault(system, []).extend(items)
+                else:
+                    nonclinical.append((key, factory.nonclinical()))
+            if is_clinical and rng.random() < BOOK_CHAPTER_RATE:
+                if not causes:
+                    causes = {rng.choice(SYSTEM_LABELS): [names.etiology() for _ in range(rng.randint(3, 8))]}
+                chapters.append((list_name, causes))
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with (out_dir / "clinical_presentation_index.json").open("w", encoding="utf-8") as fh:
+        damage = write_damaged_index(fh, clinical, rng)
+    (out_dir / "non-clinical_presentation_index.json").write_text(
+        json.dumps(dict(nonclinical), indent=2, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+    (out_dir / "Presentation_list.json").write_text(json.dumps(listing, indent=2) + "\n", encoding="utf-8")
+    shutil.copyfile(SCHEMA_PATH, out_dir / "presentations_schema.json")
+    with (out_dir / "book_pages.json").open("w", encoding="utf-8") as fh:
+        pages = write_book(fh, rng, chapters)
+
+    meta = {
+        "generatorVersion": GENERATOR_VERSION,
+        "seed": seed,
+        "scale": scale,
+        "profile": profile,
+        "presentations": sum(len(v) for v in listing.values()),
+        "listMatchModes": dict(modes),
+        "clinicalIndexKeys": len(clinical),
+        "nonclinicalIndexKeys": len(nonclinical),
+        **dict(factory.counts),
+        **dict(damage),
+        "bookChapters": len(chapters),
+        "bookPages": pages,
+    }
+    (out_dir / "dataset.json").write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+    return meta
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    scale = int(take_option(args, "--scale") or DEFAULT_SCALE)
+    seed = int(take_option(args, "--seed") or DEFAULT_SEED)
+    if len(args) != 1:
+        print(__doc__)
+        return 2
+    meta = generate(Path(args[0]), scale, seed)
+    print(
+        f"✅ {meta['presentations']:,} presentations, {meta['clinicalIndexKeys']:,} clinical symptoms "
+        f"({meta['etiologies']:,} etiologies, depth <= {meta['maxDepth']}), {meta['bookPages']:,} book pages -> {args[0]}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Watch mode for the differentials pipeline with debounced incremental rebuilds.
+
+Polls the sources `write_presentation.py` reads (Presentation_list.json, both
+presentation indexes, the schema) plus the presentation files themselves. Bursts
+of saves are coalesced; once the tree has been quiet for DEBOUNCE_SECONDS:
+- changed top-level index blocks / list entries -> rebuild only the presentations
+  whose resolved index keys touch them (or whose key resolution changed),
+- schema changes -> rebuild every presentation,
+- any change (including hand-curated presentation files) -> rebuild derived artifacts.
+
+Usage:
+  python3 watch_presentations.py            # watch; Ctrl-C to stop
+  python3 watch_presentations.py --initial  # full build first, then watch
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set, Tuple
+
+import write_presentation as wp
+
+
+# -----------------------------
+# Config (edit here)
+# -----------------------------
+POLL_INTERVAL_SECONDS = 0.5
+DEBOUNCE_SECONDS = 0.75
+REPORT_NAME_LIMIT = 12
+
+
+EntryKey = Tuple[str, str]  # (section, presentation name)
+
+
+def block_hash(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def block_hashes(index_obj: Dict[str, Any]) -> Dict[str, str]:
+    return {key: block_hash(block) for key, block in index_obj.items()}
+
+
+def source_paths() -> List[str]:
+    return [wp.PRESENTATION_LIST_PATH, wp.CLINICAL_INDEX_PATH, wp.NONCLINICAL_INDEX_PATH, wp.SCHEMA_PATH]
+
+
+def stat_snapshot() -> Dict[str, Tuple[int, int]]:
+    """(mtime_ns, size) for every watched file; missing files are simply absent."""
+    snap: Dict[str, Tuple[int, int]] = {}
+    paths = list(source_paths())
+    for dirpath, _, filenames in os.walk(wp.BASE_DIR):
+        paths.extend(os.path.join(dirpath, n) for n in filenames if n.endswith(".json") and not n.startswith("."))
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        snap[path] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+
+def earliest_change(old: Dict[str, Tuple[int, int]], new: Dict[str, Tuple[int, int]]) -> float:
+    """Wall-clock time of the oldest save among files that differ (now, if only deletions)."""
+    mtimes = [st[0] for path, st in new.items() if old.get(path) != st]
+    return min(mtimes) / 1e9 if mtimes else time.time()
+
+
+@dataclass
+class SourceState:
+    presentation_data: Dict[str, Any]
+    clinical_idx: Dict[str, Any]
+    nonclinical_idx: Dict[str, Any]
+    schema_data: Dict[str, Any]
+    entry_hashes: Dict[EntryKey, str] = field(default_factory=dict)
+    clinical_blocks: Dict[str, str] = field(default_factory=dict)
+    nonclinical_blocks: Dict[str, str] = field(default_factory=dict)
+    schema_hash: str = ""
+    matched: Dict[EntryKey, Tuple[str, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls) -> "SourceState":
+        state = cls(
+            presentation_data=wp.load_json(wp.PRESENTATION_LIST_PATH),
+            clinical_idx=wp.load_json(wp.CLINICAL_INDEX_PATH),
+            nonclinical_idx=wp.load_json(wp.NONCLINICAL_INDEX_PATH),
+            schema_data=wp.load_json(wp.SCHEMA_PATH),
+        )
+        for section, entries in state.presentation_data.items():
+            for entry in entries:
+                name = entry["name"] if isinstance(entry, dict) else str(entry)
+                state.entry_hashes[(section, name)] = block_hash(entry)
+        state.clinical_blocks = block_hashes(state.clinical_idx)
+        state.nonclinical_blocks = block_hashes(state.nonclinical_idx)
+        state.schema_hash = block_hash(state.schema_data)
+        for section, name in state.entry_hashes:
+            state.matched[(section, name)] = tuple(
+                wp.resolve_index_keys(name, section, state.clinical_idx, state.nonclinical_idx)
+            )
+        return state
+
+
+def changed_keys(old: Dict[str, str], new: Dict[str, str]) -> Set[str]:
+    return {k for k in old.keys() | new.keys() if old.get(k) != new.get(k)}
+
+
+def plan_rebuild(old: SourceState, new: SourceState) -> Tuple[List[EntryKey], str]:
+    """Return (entries to rebuild, reason) for the transition old -> new."""
+    if old.schema_hash != new.schema_hash:
+        return list(new.entry_hashes), "schema changed"
+
+    dirty_blocks = {
+        "clinical": changed_keys(old.clinical_blocks, new.clinical_blocks),
+        "non-clinical": changed_keys(old.nonclinical_blocks, new.nonclinical_blocks),
+    }
+    targets: List[EntryKey] = []
+    for key, entry_hash in new.entry_hashes.items():
+        section = key[0]
+        index_type = wp.SECTION_INDEX_TYPE.get(section, "clinical")
+        if old.entry_hashes.get(key) != entry_hash:
+            targets.append(key)
+        elif old.matched.get(key) != new.matched.get(key):
+            targets.append(key)
+        elif dirty_blocks[index_type].intersection(new.matched.get(key, ())):
+            targets.append(key)
+
+    parts = []
+    if dirty_blocks["clinical"] or dirty_blocks["non-clinical"]:
+        parts.append(f"{len(dirty_blocks['clinical']) + len(dirty_blocks['non-clinical'])} index block(s)")
+    list_changes = changed_keys(
+        {f"{s}::{n}": h for (s, n), h in old.entry_hashes.items()},
+        {f"{s}::{n}": h for (s, n), h in new.entry_hashes.items()},
+    )
+    if list_changes:
+        parts.append(f"{len(list_changes)} list entr{'y' if len(list_changes) == 1 else 'ies'}")
+    return targets, ", ".join(parts) or "presentation files only"
+
+
+class PipelineWatcher:
+    def __init__(self) -> None:
+        self.snapshot = stat_snapshot()
+        self.state = SourceState.load()
+        self.rebuilds = 0
+
+    def full_build(self) -> None:
+        t0 = time.perf_counter()
+        _, written = self._build(list(self.state.entry_hashes), self.state)
+        self._adopt_own_writes(self.snapshot, written)
+        print(f"[initial] full build in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    def _build(self, targets: List[EntryKey], state: SourceState) -> Tuple[Dict[str, int], Set[str]]:
+        """Returns (action counts, presentation files written)."""
+        required = wp.get_required_symptom_keys(state.schema_data)
+        actions: Dict[str, int] = {}
+        written: Set[str] = set()
+        for section, name in targets:
+            row = wp.build_presentation(section, name, state.clinical_idx, state.nonclinical_idx, required)
+            actions[row["Action"]] = actions.get(row["Action"], 0) + 1
+            if row["Action"] in ("created", "updated") and not wp.DRY_RUN:
+                written.add(row["Path"])
+        if not wp.DRY_RUN:
+            wp.write_derived_artifacts(state.schema_data, (state.clinical_idx, state.nonclinical_idx))
+        return actions, written
+
+    def _adopt_own_writes(self, before: Dict[str, Tuple[int, int]], written: Set[str]) -> None:
+        """Snapshot = `before` (taken ahead of loading the sources) plus the files we just wrote,
+        so our own writes don't retrigger but a save that landed mid-rebuild still does."""
+        snap = dict(before)
+        for path in written:
+            try:
+                st = os.stat(path)
+            except OSError:
+                snap.pop(path, None)
+                continue
+            snap[path] = (st.st_mtime_ns, st.st_size)
+        self.snapshot = snap
+
+    def rebuild(self, first_change: float, coalesced: int) -> None:
+        """first_change is the wall-clock mtime of the oldest save in the burst."""
+        before = stat_snapshot()
+        t0 = time.perf_counter()
+        try:
+            new_state = SourceState.load()
+        except (OSError, ValueError) as e:
+            # Usually a half-written save; the next change will retrigger.
+            print(f"! Sources not loadable yet ({e}); waiting for next save.")
+            return
+        t_load = time.perf_counter()
+
+        targets, reason = plan_rebuild(self.state, new_state)
+        actions, written = self._build(targets, new_state)
+        t_done = time.perf_counter()
+        save_to_done = time.time() - first_change
+
+        self.state = new_state
+        self._adopt_own_writes(before, written)
+        self.rebuilds += 1
+
+        names = ", ".join(name for _, name in targets[:REPORT_NAME_LIMIT])
+        if len(targets) > REPORT_NAME_LIMIT:
+            names += f", ... {len(targets) - REPORT_NAME_LIMIT} more"
+        action_text = " ".join(f"{k}={v}" for k, v in sorted(actions.items())) or "none"
+        print(
+            f"[rebuild #{self.rebuilds}] {reason}: {len(targets)} presentation(s) [{action_text}]"
+            f" | load {(t_load - t0) * 1000:.0f} ms, build {(t_done - t_load) * 1000:.0f} ms,"
+            f" save->done {save_to_done * 1000:.0f} ms, coalesced {coalesced} change(s)"
+        )
+        if names:
+            print(f"  {names}")
+
+    def run(self) -> None:
+        print(f"Watching {len(self.snapshot)} files (poll {POLL_INTERVAL_SECONDS}s, debounce {DEBOUNCE_SECONDS}s). Ctrl-C to stop.")
+        first_change = 0.0
+        last_change = 0.0
+        coalesced = 0
+        while True:
+            time.sleep(POLL_INTERVAL_SECONDS)
+            current = stat_snapshot()
+            now = time.perf_counter()
+            if current != self.snapshot:
+                if not coalesced:
+                    first_change = earliest_change(self.snapshot, current)
+                coalesced += 1
+                last_change = now
+                self.snapshot = current
+                continue
+            if coalesced and now - last_change >= DEBOUNCE_SECONDS:
+                self.rebuild(first_change, coalesced)
+                coalesced = 0
+
+
+def main() -> int:
+    watcher = PipelineWatcher()
+    if "--initial" in sys.argv:
+        watcher.full_build()
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print(f"\nStopped after {watcher.rebuilds} rebuild(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
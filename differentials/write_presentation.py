@@ -1,9 +1,26 @@
 import os
 import json
 import re
+from collections import Counter
+from datetime import datetime, timezone
 from typing import Dict, Any, Iterable, Tuple, Optional, List
 from pathlib import Path
 
+from etiology_index import write_index as write_etiology_index
+from hpi_bitmap_index import write_index as write_hpi_bitmap_index
+from presentation_codec import write_bundle
+
+# Shared normalization rules live in <repo>/py/text_normalize.py
+import py_path  # noqa: F401
+from text_normalize import (
+    compact_key,
+    memoize,
+    normalize_label,
+    normalize_search,
+    normalize_system_label,
+    presentation_slug as slugify,
+)
+
 # ! -----------------------------
 # ! Config: paths & behavior (explicit paths; no dry run)
 # ! -----------------------------
@@ -18,6 +35,15 @@ LOW_PRIORITY_MODE = "subfolder"
 REBUILD_EXISTING = True              # Rebuild items array from sources on existing files
 SUMMARY_PATH = "/Users/claytongoddard/Desktop/presentation_build_summary.md"
 DRY_RUN = False                      # <= per user request
+WRITE_COMPACT_BUNDLE = True          # Also emit the enum-coded, column-wise bundle for the explorer
+COMPACT_BUNDLE_PATH = os.path.join(os.path.dirname(BASE_DIR), "presentations.compact.json")
+WRITE_ETIOLOGY_INDEX = True          # Also emit the reverse etiology -> presentations index
+ETIOLOGY_INDEX_PATH = os.path.join(os.path.dirname(BASE_DIR), "etiology_index.json")
+WRITE_HPI_BITMAP_INDEX = True        # Also emit per-(HPI key, enum value) bitmaps for feature queries
+HPI_BITMAP_INDEX_PATH = os.path.join(os.path.dirname(BASE_DIR), "hpi_bitmap_index.json")
+WRITE_MANIFEST = True                # Also emit precomputed system labels + chips for the explorer
+MANIFEST_PATH = os.path.join(os.path.dirname(BASE_DIR), "manifest.json")
+MANIFEST_VERSION = 2
 
 # --- Completion/locking flags ---
 SKIP_COMPLETED = True            # Skip files that appear fully curated
@@ -94,12 +120,6 @@ LOW_PRIORITY_SLUGS = {os.path.splitext(os.path.basename(p))[0] for p in _LOW_PRI
 # ! -----------------------------
 # ! Utilities
 # ! -----------------------------
-_def_slug_cleanup = re.compile(r"[^a-z0-9\s-]")
-_bullet_pat = re.compile(r"^[\u2022\u2023\u25E6\u2043\u2219\-•\s]+")
-_fig_pat = re.compile(r"\((?:fig|figure|see)[:\s][^\)]*\)", re.IGNORECASE)
-_eg_tail_pat = re.compile(r"\be\.g\.[^;,.]*", re.IGNORECASE)
-_trailing_punct = re.compile(r"[\s,:;\-]+$")
-
 SYSTEM_FIX = {
     "‘medical’ causes": "Medical",
     "medical causes": "Medical",
@@ -119,23 +139,25 @@ SECTION_INDEX_TYPE = {
     "Hematological Presentations": "non-clinical",
 }
 
-
-def slugify(name: str) -> str:
-    s = name.lower()
-    s = _def_slug_cleanup.sub("", s)
-    s = s.strip().replace(" ", "-")
-    s = re.sub(r"-+", "-", s)
-    return s
-
-
-def normalize_label(s: str) -> str:
-    s = s.strip()
-    s = _bullet_pat.sub("", s)
-    s = _fig_pat.sub("", s)
-    s = _eg_tail_pat.sub("", s)
-    s = _trailing_punct.sub("", s)
-    return s.strip()
-
+# Canonical groups for the explorer's sidebar "Systems" chips.
+# ! Keep in sync with SYSTEM_CHIP_RULES in differentials_app.js (first match wins).
+SYSTEM_CHIP_RULES: List[Tuple[str, re.Pattern]] = [
+    (label, re.compile(pattern, re.ASCII))
+    for label, pattern in [
+        ("Cardiovascular", r"\b(cardio|cardiac|vascular|vasovagal|arrhythm|hypotension|venous|arterial|circulatory)\b"),
+        ("Respiratory", r"\b(respir|pulmonary|airway|trache|bronch|pleur)\b"),
+        ("Neurologic", r"\b(neuro|cns|cerebr|brain|spinal|neurone|neuromuscular|neuropath|seizure|migraine|tremor|syncope)\b"),
+        ("Gastrointestinal / Hepatic", r"\b(gastro|abdominal|bowel|intestinal|stomach|duoden|colon|rect|anal|anorectal|esoph|oesoph|hepato|liver|pancrea|biliar|splen|periton|visceral)\b"),
+        ("Renal / Genitourinary", r"\b(renal|kidney|ureter|urethra|bladder|urinary|nephro|prostate|post renal)\b"),
+        ("Hematologic", r"\b(haemat|hemat|haemol|hemol|leuk|platelet|anemi|thromb)\b"),
+        ("Endocrine / Metabolic", r"\b(endocrine|metabolic|pituitary|adrenal|thyroid)\b"),
+        ("Musculoskeletal", r"\b(musculo|joint|ligament|menisci|tendon|bone|gait)\b"),
+        ("Dermatologic", r"\b(dermat|skin|nail|scalp|pruritus|ulcer)\b"),
+        ("Reproductive", r"\b(gynae|gyne|ovar|uter|fallopian|vaginal|pregnan|obstet|penis|scrot|foreskin|breast|testic)\b"),
+        ("HEENT", r"\b(eye|ear|nasal|nose|throat|pharyn|laryng|mastoid|salivary|parotid|tongue|lip|jaw)\b"),
+        ("Systemic", r"\b(systemic|general|constitutional)\b"),
+    ]
+]
 
 
 # Helper to convert ALL-CAPS labels to Title/Normal case, preserving separators
@@ -159,6 +181,7 @@ def _title_from_all_caps(text: str) -> str:
             out.append(p[:1].upper() + p[1:])
     return "".join(out)
 
+@memoize
 def title_case_system(cat: str) -> str:
     if not cat:
         return ""
@@ -174,6 +197,18 @@ def title_case_system(cat: str) -> str:
     return c[:1].upper() + c[1:]
 
 
+# Mirrors deriveSystemChip in differentials_app.js (normalizeSystemLabel/normalizeSearch: py/text_normalize.py)
+def derive_system_chip(system: Any) -> Optional[str]:
+    clean = normalize_system_label(system)
+    if not clean:
+        return None
+    normalized = normalize_search(clean)
+    for label, pattern in SYSTEM_CHIP_RULES:
+        if pattern.search(normalized):
+            return label
+    return None
+
+
 def load_json(path: str) -> Any:
     with open(path, "r") as f:
         return json.load(f)
@@ -275,9 +310,7 @@ def iter_etiologies(index_block: Any, parent_category: str = "") -> Iterable[Tup
 
 
 def build_index_lookup(d: Dict[str, Any]) -> Dict[str, str]:
-    def norm(t: str) -> str:
-        return re.sub(r"[^a-z0-9]+", "", t.lower())
-    return {norm(k): k for k in d.keys()}
+    return {compact_key(k): k for k in d.keys()}
 
 
 def resolve_index_keys(pres_name: str, section: str, clinical_idx: Dict[str, Any], nonclinical_idx: Dict[str, Any]) -> List[str]:
@@ -294,17 +327,15 @@ def resolve_index_keys(pres_name: str, section: str, clinical_idx: Dict[str, Any
             return [k]
 
     # Token-normalized
-    def norm(t: str) -> str:
-        return re.sub(r"[^a-z0-9]+", "", t.lower())
-    n_name = norm(pres_name)
+    n_name = compact_key(pres_name)
 
     # Exact normalized
     for k in idx.keys():
-        if norm(k) == n_name:
+        if compact_key(k) == n_name:
             return [k]
 
     # Contains: if the list name is umbrella, gather children with substring match
-    matches = [k for k in idx.keys() if n_name and n_name in norm(k)]
+    matches = [k for k in idx.keys() if n_name and n_name in compact_key(k)]
     return matches
 
 
@@ -316,10 +347,188 @@ def write_json_atomically(dest_path: str, data: Dict[str, Any]) -> None:
     os.replace(tmp, dest_path)
 
 
+def build_explorer_manifest(root: Path, index_sources: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Precompute what the explorer would otherwise derive per item at load time:
+    raw system string -> display label, display label -> chip (both covering the
+    presentation files and the index blocks), and the chip list for the sidebar.
+    """
+    system_labels: Dict[str, str] = {}
+    system_chips: Dict[str, Optional[str]] = {}
+
+    def see(system: Any) -> None:
+        if not isinstance(system, str) or system in system_labels:
+            return
+        label = system_labels[system] = normalize_system_label(system)
+        if label not in system_chips:
+            system_chips[label] = derive_system_chip(label)
+
+    for path in sorted(root.rglob("*.json")):
+        if path.name.startswith("."):
+            continue
+        try:
+            doc = load_json(str(path))
+        except Exception:
+            continue
+        if not isinstance(doc, dict):
+            continue
+        for it in doc.get("items") or []:
+            if isinstance(it, dict):
+                see(it.get("system"))
+
+    # Index blocks feed the explorer directly (top-level keys are system labels).
+    for idx in index_sources:
+        for block in (idx or {}).values():
+            if isinstance(block, dict):
+                for system in block.keys():
+                    see(system)
+
+    return {
+        "version": MANIFEST_VERSION,
+        "generatedAt": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+        "chipRules": [label for label, _ in SYSTEM_CHIP_RULES],
+        "chips": sorted({c for c in system_chips.values() if c}),
+        "systemLabels": dict(sorted(system_labels.items())),
+        "systemChips": dict(sorted(system_chips.items())),
+    }
+
+
+def write_derived_artifacts(schema_data: Dict[str, Any], index_sources: Iterable[Dict[str, Any]] = ()) -> None:
+    """Rebuild browser artifacts from the presentation files on disk.
+    Readable JSON stays the authoring format; each artifact is derived and can be toggled above.
+    """
+    root = Path(BASE_DIR)
+    artifacts = [
+        (WRITE_COMPACT_BUNDLE, "Compact bundle", COMPACT_BUNDLE_PATH,
+         lambda: write_bundle(root, schema_data, Path(COMPACT_BUNDLE_PATH))),
+        (WRITE_ETIOLOGY_INDEX, "Etiology index", ETIOLOGY_INDEX_PATH,
+         lambda: write_etiology_index(root, Path(ETIOLOGY_INDEX_PATH))),
+        (WRITE_HPI_BITMAP_INDEX, "HPI bitmap index", HPI_BITMAP_INDEX_PATH,
+         lambda: write_hpi_bitmap_index(root, schema_data, Path(HPI_BITMAP_INDEX_PATH))),
+        (WRITE_MANIFEST, "Explorer manifest", MANIFEST_PATH,
+         lambda: write_json_atomically(MANIFEST_PATH, build_explorer_manifest(root, list(index_sources)))),
+    ]
+    for enabled, label, path, build in artifacts:
+        if not enabled:
+            continue
+        try:
+            build()
+            print(f"{label}: {path}")
+        except Exception as e:
+            print(f"! Failed to write {label.lower()}: {e}")
+
+
 # ! -----------------------------
 # ! Main build
 # ! -----------------------------
 
+def iter_list_entries(presentation_data: Dict[str, Any]) -> Iterable[Tuple[str, str]]:
+    """Yield (section, presentation name) in Presentation_list.json order."""
+    for section, entries in presentation_data.items():
+        for entry in entries:
+            yield section, (entry["name"] if isinstance(entry, dict) else str(entry))
+
+
+def presentation_dest_path(section: str, pres_name: str) -> str:
+    slug = slugify(pres_name)
+    # Low priority routing
+    subfolder = SECTION_FOLDERS.get(section, "misc")
+    if slug in LOW_PRIORITY_SLUGS and LOW_PRIORITY_MODE == "subfolder":
+        subfolder = "clinical/other"
+    return os.path.join(BASE_DIR, subfolder, f"{slug}.json")
+
+
+def build_presentation(
+    section: str,
+    pres_name: str,
+    clinical_idx: Dict[str, Any],
+    nonclinical_idx: Dict[str, Any],
+    required_symptoms: List[str],
+) -> Dict[str, Any]:
+    """Build (and write, unless skipped) one presentation file; returns its summary row."""
+    index_type = SECTION_INDEX_TYPE.get(section, "clinical")
+    dest_path = presentation_dest_path(section, pres_name)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+    # Resolve which index keys to use
+    matched_keys = resolve_index_keys(pres_name, section, clinical_idx, nonclinical_idx)
+    used_keys: List[str] = []
+
+    # Build items
+    items: List[Dict[str, Any]] = []
+    seen = set()
+    chosen_idx = clinical_idx if index_type == "clinical" else nonclinical_idx
+
+    for key in matched_keys:
+        block = chosen_idx.get(key)
+        if block is None:
+            continue
+        used_keys.append(key)
+        for cat, et, fq in iter_etiologies(block):
+            system = title_case_system(cat)
+            name = et
+            sig = (system.lower(), name.lower())
+            if sig in seen:
+                continue
+            seen.add(sig)
+            item: Dict[str, Any] = {
+                "name": name,
+                "system": system,
+                "systemChip": derive_system_chip(system),
+                "redFlag": False,
+                "hpi": blank_symptoms(required_symptoms),
+            }
+            if INCLUDE_FREQ:
+                item["freq"] = fq if fq else "unknown"
+            items.append(item)
+
+    # Build document
+    doc: Dict[str, Any] = {
+        "presentation": pres_name,
+        "items": items,
+        "sources": {
+            "index_keys": used_keys,
+            "index_type": index_type,
+        },
+    }
+
+    action = ""
+    if os.path.exists(dest_path):
+        # Load existing once for checks/preservation
+        try:
+            existing = load_json(dest_path)
+        except Exception:
+            existing = {}
+
+        # Skip if file is explicitly locked or appears fully curated
+        if SKIP_COMPLETED and (is_file_locked(existing) or is_document_complete(existing, required_symptoms)):
+            action = "skipped-complete"
+        elif REBUILD_EXISTING:
+            # Preserve extra top-level fields (if any) not managed by us
+            for k in existing.keys():
+                if k not in doc and k not in {"items", "sources"}:
+                    doc[k] = existing[k]
+            if not DRY_RUN:
+                write_json_atomically(dest_path, doc)
+            action = "updated"
+        else:
+            action = "skipped"
+    else:
+        if not DRY_RUN:
+            write_json_atomically(dest_path, doc)
+        action = "created"
+
+    return {
+        "Presentation": pres_name,
+        "Section": section,
+        "Action": action,
+        "IndexType": index_type,
+        "#Etiologies": len(items),
+        "AliasesUsed": ", ".join(used_keys) if used_keys else "",
+        "Path": dest_path,
+        "MatchedKeys": matched_keys,
+    }
+
+
 def main() -> None:
     # Load resources
     presentation_data: Dict[str, Any] = load_json(PRESENTATION_LIST_PATH)
@@ -328,112 +537,15 @@ def main() -> None:
     schema_data: Dict[str, Any] = load_json(SCHEMA_PATH)
     required_symptoms = get_required_symptom_keys(schema_data)
 
-    created = 0
-    updated = 0
-    skipped = 0
-    no_index = 0
-
-    summary_rows = []
-
-    for section, entries in presentation_data.items():
-        folder_name = SECTION_FOLDERS.get(section, "misc")
-        index_type = SECTION_INDEX_TYPE.get(section, "clinical")
-
-        for entry in entries:
-            pres_name = entry["name"] if isinstance(entry, dict) else str(entry)
-            slug = slugify(pres_name)
-
-            # Low priority routing
-            subfolder = folder_name
-            if slug in LOW_PRIORITY_SLUGS and LOW_PRIORITY_MODE == "subfolder":
-                subfolder = "clinical/other"
-
-            dest_path = os.path.join(BASE_DIR, subfolder, f"{slug}.json")
-            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-
-            # Resolve which index keys to use
-            matched_keys = resolve_index_keys(pres_name, section, clinical_idx, nonclinical_idx)
-            used_keys: List[str] = []
-
-            # Build items
-            items: List[Dict[str, Any]] = []
-            seen = set()
-            chosen_idx = clinical_idx if index_type == "clinical" else nonclinical_idx
-
-            for key in matched_keys:
-                block = chosen_idx.get(key)
-                if block is None:
-                    continue
-                used_keys.append(key)
-                for cat, et, fq in iter_etiologies(block):
-                    system = title_case_system(cat)
-                    name = et
-                    sig = (system.lower(), name.lower())
-                    if sig in seen:
-                        continue
-                    seen.add(sig)
-                    item: Dict[str, Any] = {
-                        "name": name,
-                        "system": system,
-                        "redFlag": False,
-                        "hpi": blank_symptoms(required_symptoms),
-                    }
-                    if INCLUDE_FREQ:
-                        item["freq"] = fq if fq else "unknown"
-                    items.append(item)
-
-            # Build document
-            doc: Dict[str, Any] = {
-                "presentation": pres_name,
-                "items": items,
-                "sources": {
-                    "index_keys": used_keys,
-                    "index_type": index_type,
-                },
-            }
-
-            action = ""
-            if os.path.exists(dest_path):
-                # Load existing once for checks/preservation
-                try:
-                    existing = load_json(dest_path)
-                except Exception:
-                    existing = {}
-
-                # Skip if file is explicitly locked or appears fully curated
-                if SKIP_COMPLETED and (is_file_locked(existing) or is_document_complete(existing, required_symptoms)):
-                    skipped += 1
-                    action = "skipped-complete"
-                elif REBUILD_EXISTING:
-                    # Preserve extra top-level fields (if any) not managed by us
-                    for k in existing.keys():
-                        if k not in doc and k not in {"items", "sources"}:
-                            doc[k] = existing[k]
-                    if not DRY_RUN:
-                        write_json_atomically(dest_path, doc)
-                    updated += 1
-                    action = "updated"
-                else:
-                    skipped += 1
-                    action = "skipped"
-            else:
-                if not DRY_RUN:
-                    write_json_atomically(dest_path, doc)
-                created += 1
-                action = "created"
-
-            if not used_keys:
-                no_index += 1
-
-            summary_rows.append({
-                "Presentation": pres_name,
-                "Section": section,
-                "Action": action,
-                "IndexType": index_type,
-                "#Etiologies": len(items),
-                "AliasesUsed": ", ".join(used_keys) if used_keys else "",
-                "Path": dest_path,
-            })
+    summary_rows = [
+        build_presentation(section, pres_name, clinical_idx, nonclinical_idx, required_symptoms)
+        for section, pres_name in iter_list_entries(presentation_data)
+    ]
+    actions = Counter(r["Action"] for r in summary_rows)
+    created = actions["created"]
+    updated = actions["updated"]
+    skipped = actions["skipped"] + actions["skipped-complete"]
+    no_index = sum(1 for r in summary_rows if not r["AliasesUsed"])
 
     # Write summary markdown
     lines = [
@@ -452,6 +564,9 @@ def main() -> None:
             f"| {r['Presentation']} | {r['Section']} | {r['Action']} | {r['IndexType']} | {r['#Etiologies']} | {r['AliasesUsed']} | `{r['Path']}` |\n"
         )
 
+    if not DRY_RUN:
+        write_derived_artifacts(schema_data, (clinical_idx, nonclinical_idx))
+
     try:
         if not DRY_RUN:
             os.makedirs(os.path.dirname(SUMMARY_PATH), exist_ok=True)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the pharm pipeline: import -> expand -> subclasses.
+
+Each scale gets a synthetic dataset from synthetic_pharm_data.py (cached under
+.bench/data/ by scale, seed, generator version and source TSV); the stages write
+to a scratch directory and are timed on run() plus the phases listed in STAGES.
+Child processes, results files and --save-baseline / --compare are shared with
+the differentials suite (py/bench_harness.py).
+
+Usage:
+  python3 pharm/scripts/bench_pharm_pipeline.py [--scales 1,10,100] [--seed N] [--repeat N]
+                                                [--save-baseline] [--compare] [--baseline PATH]
+                                                [--out PATH] [--regen]
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import List
+
+# Measurement, the suite CLI and baseline comparison live in <repo>/py/bench_harness.py
+import py_path  # noqa: F401
+import bench_harness as bh
+import synthetic_pharm_data as synth
+
+
+# ================================================================
+# Configurable values (change here)
+# ================================================================
+SCALES = (1, 10, 100)  # 1 = today's 7.7k-row TSV / 57 curated records; 1000 works but needs several GB
+SEED = synth.DEFAULT_SEED
+REPEATS = 3  # Fastest of N full pipeline runs per scale; the spread sets --compare's noise floor
+DATA_DIR = bh.BENCH_DIR / "data"
+WORK_DIR = bh.BENCH_DIR / "work"
+RESULTS_PATH = bh.BENCH_DIR / "pharm_results.json"
+BASELINE_PATH = bh.BENCH_DIR / "pharm_baseline.json"
+SUITE = "pharm"
+
+
+# ----------------------------------------------------------------
+# Stages
+# ----------------------------------------------------------------
+def _tsv_rows(data: Path) -> int:
+    return int(json.loads((data / "dataset.json").read_text(encoding="utf-8"))["tsvRows"])
+
+
+def _run_import(mod, data: Path, work: Path) -> int:
+    mod.DRUGBANK_TSV_PATH = data / "drugbank.tsv"
+    mod.INPUT_PHARM_JSON_PATH = data / "pharm_data.json"
+    mod.OUTPUT_PHARM_JSON_PATH = work / "pharm_data_drugbank_enriched.json"
+    mod.OUTPUT_REPORT_PATH = work / "drugbank_import_report.json"
+    mod.OVERWRITE_INPUT_PHARM_JSON = False
+    return int(mod.run()["summary"]["drugbank_rows"])
+
+
+def _run_expand(mod, data: Path, work: Path) -> int:
+    mod.DRUGBANK_TSV_PATH = data / "drugbank.tsv"
+    mod.INPUT_ENRICHED_JSON_PATH = work / "pharm_data_drugbank_enriched.json"
+    mod.OUTPUT_ENRICHED_JSON_PATH = work / "pharm_data_drugbank_enriched.json"
+    mod.OUTPUT_REPORT_PATH = work / "drugbank_catalog_report.json"
+    mod.run()
+    return _tsv_rows(data)
+
+
+def _run_subclasses(mod, data: Path, work: Path) -> int:
+    mod.CLASSES_SIMPLE_PATH = data / "classes_simple.json"
+    mod.ENRICHED_DATA_PATH = work / "pharm_data_drugbank_enriched.json"
+    mod.OUTPUT_CLASSES_DIR = work / "classes"
+    mod.MASTER_INDEX_PATH = work / "classes" / "class_subclasses_index.json"
+    loaded: List[int] = []
+    load = mod.load_medications
+    mod.load_medications = lambda path: loaded.append(len(meds := load(path))) or meds
+    mod.run()
+    return loaded[0]
+
+
+STAGES: List[bh.Stage] = [
+    bh.Stage(
+        "import_drugbank_tsv",
+        "import_drugbank_tsv",
+        ("load_drugbank_rows", "build_drugbank_index", "find_match", "add_drugbank_metadata"),
+        _run_import,
+    ),
+    bh.Stage(
+        "expand_drugbank_catalog",
+        "expand_drugbank_catalog",
+        ("load_json", "load_tsv_rows", "build_preferred_name_index", "build_generated_record", "missing_required_fields"),
+        _run_expand,
+    ),
+    bh.Stage(
+        "build_class_subclasses",
+        "build_class_subclasses",
+        ("load_classes_simple", "load_medications", "collect_approved_supported_classes", "build_primary_records",
+         "write_primary_files", "validate_outputs"),
+        _run_subclasses,
+    ),
+]
+
+
+# ----------------------------------------------------------------
+# Datasets
+# ----------------------------------------------------------------
+def ensure_dataset(scale: int, seed: int, regen: bool = False) -> Path:
+    out = DATA_DIR / f"pharm-x{scale}-seed{seed}"
+    meta_path = out / "dataset.json"
+    if not regen and meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if (
+            meta.get("generatorVersion") == synth.GENERATOR_VERSION
+            and meta.get("sourceTsvSha256") == synth.sha256_path(synth.SOURCE_TSV_PATH)
+        ):
+            return out
+    if out.exists():
+        shutil.rmtree(out)
+    t0 = time.perf_counter()
+    meta = synth.generate(out, scale, seed)
+    print(f"  generated {meta['tsvRows']:,} rows / {meta['curatedRecords']:,} curated in {time.perf_counter() - t0:.1f}s -> {out}")
+    return out
+
+
+def main() -> int:
+    return bh.suite_main(
+        __doc__, SUITE, __file__, STAGES, ensure_dataset,
+        scales=SCALES, seed=SEED, repeats=REPEATS, work_dir=WORK_DIR,
+        results_path=RESULTS_PATH, baseline_path=BASELINE_PATH, generator_version=synth.GENERATOR_VERSION,
+    )
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,11 +10,14 @@ Outputs:
 from __future__ import annotations
 
 import json
-import re
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Iterable, List, Set, Tuple
 
+# Shared normalization rules live in <repo>/py/text_normalize.py
+import py_path  # noqa: F401
+from text_normalize import class_slug as slugify, clean_text, normalize_name as normalize_text
+
 
 # ================================================================
 # Configurable values (change here)
@@ -48,24 +51,6 @@ STEM_OVERRIDES: Dict[str, str] = {
 }
 
 
-def clean_text(value: object) -> str:
-    return str(value or "").strip()
-
-
-def normalize_text(value: object) -> str:
-    text = clean_text(value).lower()
-    text = text.replace("&", " and ")
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    return re.sub(r"\s+", " ", text).strip()
-
-
-def slugify(value: object) -> str:
-    text = normalize_text(value)
-    slug = text.replace(" ", "-")
-    slug = re.sub(r"-+", "-", slug).strip("-")
-    return slug or "class"
-
-
 def ensure_unique_slug(base_slug: str, used_slugs: Set[str]) -> str:
     if base_slug not in used_slugs:
         used_slugs.add(base_slug)
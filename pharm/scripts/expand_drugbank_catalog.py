@@ -14,6 +14,10 @@ import re
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+# Shared normalization rules live in <repo>/py/text_normalize.py
+import py_path  # noqa: F401
+from text_normalize import clean_text, normalize_name, split_pipe
+
 
 # ================================================================
 # Configurable values (change here)
@@ -72,25 +76,6 @@ ATC_TOP_LEVEL = {
 }
 
 
-def clean_text(value: object) -> str:
-    return str(value or "").strip()
-
-
-def split_pipe(value: object) -> List[str]:
-    raw = clean_text(value)
-    if not raw:
-        return []
-    return [item.strip() for item in raw.split("|") if item.strip()]
-
-
-def normalize_name(value: object) -> str:
-    text = clean_text(value).lower()
-    text = text.replace("&", " and ")
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
 def first_sentence(value: object, max_len: int = 320) -> str:
     text = clean_text(value)
     if not text:
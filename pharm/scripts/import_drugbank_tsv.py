@@ -16,6 +16,10 @@ import re
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple, TypedDict
 
+# Shared normalization rules live in <repo>/py/text_normalize.py
+import py_path  # noqa: F401
+from text_normalize import clean_text, normalize_column, normalize_name, split_pipe
+
 
 # ================================================================
 # Configurable values (change here)
@@ -88,25 +92,6 @@ class DrugBankImportReport(TypedDict):
     missing_required_fields: List[Dict[str, object]]
 
 
-def clean_text(value: object) -> str:
-    return str(value or "").strip()
-
-
-def split_pipe(value: object) -> List[str]:
-    raw = clean_text(value)
-    if not raw:
-        return []
-    return [item.strip() for item in raw.split("|") if item.strip()]
-
-
-def normalize_name(value: object) -> str:
-    text = clean_text(value).lower()
-    text = text.replace("&", " and ")
-    text = re.sub(r"[^a-z0-9]+", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
-
-
 def name_without_suffix_tokens(name: str) -> str:
     parts = normalize_name(name).split()
     if not parts:
@@ -143,8 +128,9 @@ def build_drugbank_index(
     primary: Dict[str, Dict[str, str]] = {}
     collisions: Dict[str, List[Dict[str, str]]] = {}
 
-    for row in rows:
-        key = normalize_name(row.get("name", ""))
+    rows = list(rows)
+    keys = normalize_column(normalize_name, (row.get("name", "") for row in rows))
+    for row, key in zip(rows, keys):
         if not key:
             continue
         groups = split_pipe(row.get("groups", ""))
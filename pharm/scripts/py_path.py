@@ -0,0 +1,13 @@
+"""Put <repo>/py on sys.path so scripts here can import the shared helpers
+(text_normalize, cli_util, bench_harness, build_cache).
+
+Usage (before the first shared import):
+  import py_path  # noqa: F401
+"""
+
+import sys
+from pathlib import Path
+
+PY_DIR = str(Path(__file__).resolve().parents[2] / "py")
+if PY_DIR not in sys.path:
+    sys.path.insert(0, PY_DIR)
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Generate DrugBank-shaped TSVs and curated pharm_data.json files at any scale.
+
+Distributions (type, group combinations, categories and ATC codes per row and
+their frequencies, description lengths, empty fields, name-collision rate) are
+profiled from the real `assests/drugbank.tsv`. The curated file mixes exact,
+salt-suffixed, alias-only, combination and unmatched names the way
+`pharm_data.json` does. Output is deterministic for a given seed, scale and
+source TSV.
+
+Writes into OUT_DIR:
+1) drugbank.tsv         ~ SCALE x the real row count (streamed; 1000x is several GB)
+2) pharm_data.json      ~ SCALE x the real curated record count
+3) classes_simple.json  copied as-is (the category vocabulary does not grow with row count)
+4) dataset.json         what was generated, from what, with which seed
+
+Usage:
+  python3 pharm/scripts/synthetic_pharm_data.py OUT_DIR [--scale N] [--seed N]
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import random
+import re
+import shutil
+import sys
+from collections import Counter
+from itertools import accumulate
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+# Shared normalization rules live in <repo>/py/text_normalize.py
+import py_path  # noqa: F401
+from cli_util import take_option
+from build_cache import sha256_path
+from text_normalize import normalize_name, split_pipe
+
+
+# ================================================================
+# Configurable values (change here)
+# ================================================================
+PHARM_DIR = Path(__file__).resolve().parents[1]
+SOURCE_TSV_PATH = PHARM_DIR / "assests" / "drugbank.tsv"
+SOURCE_PHARM_JSON_PATH = PHARM_DIR / "pharm_data.json"
+CLASSES_SIMPLE_PATH = PHARM_DIR / "assests" / "classes_simple.json"
+
+DEFAULT_SCALE = 1
+DEFAULT_SEED = 7
+GENERATOR_VERSION = 1  # Bump when output for a given seed changes; invalidates cached bench datasets.
+
+TSV_COLUMNS = ["drugbank_id", "name", "type", "groups", "atc_codes", "categories", "inchikey", "inchi", "description"]
+
+# How curated records relate to TSV names (pharm_data.json today: 55/57 matched).
+CURATED_MATCH_MIX: Dict[str, float] = {
+    "name": 0.70,  # Exact TSV name
+    "case": 0.04,  # Same name, different case/punctuation
+    "salt": 0.08,  # "<name> Hydrochloride"; matched after suffix stripping
+    "alias": 0.09,  # Brand-like name with the TSV name as an alias
+    "combo": 0.05,  # "<name>/<other>" combination product
+    "unmatched": 0.04,  # Not in the TSV at all
+}
+SALT_SUFFIXES = ["Hydrochloride", "Sodium", "Tartrate", "Succinate", "Acetate", "Phosphate"]
+NAME_EXTRA_WORDS = ["alfa", "beta", "sodium", "hydrochloride", "acetate", "recombinant", "phosphate", "citrate"]
+NAME_EXTRA_WORD_RATE = 0.12
+ROUTES = ["PO", "IV", "IM", "SQ", "INH", "IN", "SL", "Topical", "PR"]
+
+SYLLABLES = [c + v for c in "bdfgklmnprstvz" for v in "aeio"][:50]
+STEMS = [
+    "olol", "pril", "sartan", "statin", "cillin", "mycin", "floxacin", "azole", "tinib", "mab",
+    "vir", "pam", "lam", "dipine", "prazole", "tidine", "triptan", "setron", "parin", "caine",
+    "dronate", "gliptin", "lukast", "oxetine", "afil",
+]
+BRAND_ENDINGS = ["ex", "ra", "on", "ix", "al", "za", "ta"]
+
+
+# ----------------------------------------------------------------
+# Profile of the real TSV
+# ----------------------------------------------------------------
+def _weights(counter: Counter) -> Tuple[List, List[int]]:
+    items = sorted(counter.items(), key=lambda kv: (-kv[1], str(kv[0])))
+    return [k for k, _ in items], [v for _, v in items]
+
+
+def profile_source(tsv_path: Path = SOURCE_TSV_PATH, pharm_json_path: Path = SOURCE_PHARM_JSON_PATH) -> Dict[str, object]:
+    csv.field_size_limit(sys.maxsize)
+    types: Counter = Counter()
+    groups: Counter = Counter()
+    cat_counts: Counter = Counter()
+    cats: Counter = Counter()
+    atc_counts: Counter = Counter()
+    atcs: Counter = Counter()
+    words: Counter = Counter()
+    desc_lengths: List[int] = []
+    keys: Counter = Counter()
+    rows = empty_desc = multiline = with_inchikey = 0
+
+    with tsv_path.open("r", encoding="utf-8", errors="replace", newline="") as handle:
+        for row in csv.DictReader(handle, delimiter="\t"):
+            rows += 1
+            types[row.get("type") or ""] += 1
+            groups[row.get("groups") or ""] += 1
+            row_cats = split_pipe(row.get("categories"))
+            cat_counts[len(row_cats)] += 1
+            cats.update(row_cats)
+            row_atcs = split_pipe(row.get("atc_codes"))
+            atc_counts[len(row_atcs)] += 1
+            atcs.update(row_atcs)
+            keys[normalize_name(row.get("name"))] += 1
+            with_inchikey += 1 if row.get("inchikey") else 0
+            desc = row.get("description") or ""
+            if not desc:
+                empty_desc += 1
+                continue
+            multiline += 1 if "\n" in desc else 0
+            desc_lengths.append(len(desc))
+            words.update(w for w in re.findall(r"[a-z]{3,}", desc.lower()))
+
+    curated = json.loads(pharm_json_path.read_text(encoding="utf-8")).get("medications", [])
+    return {
+        "rows": rows,
+        "curated": len(curated),
+        "curatedClasses": sorted({str(m.get("drugClass")) for m in curated if m.get("drugClass")}),
+        "types": _weights(types),
+        "groups": _weights(groups),
+        "categoryCounts": _weights(cat_counts),
+        "categories": _weights(cats),
+        "atcCounts": _weights(atc_counts),
+        "atcCodes": _weights(atcs),
+        "collisionRate": sum(v - 1 for v in keys.values() if v > 1) / max(rows, 1),
+        "emptyDescriptionRate": empty_desc / max(rows, 1),
+        "multilineDescriptionRate": multiline / max(rows - empty_desc, 1),
+        "inchikeyRate": with_inchikey / max(rows, 1),
+        "descriptionLengths": sorted(desc_lengths),
+        "vocabulary": [w for w, _ in words.most_common(2000)],
+    }
+
+
+# ----------------------------------------------------------------
+# Names
+# ----------------------------------------------------------------
+_SPACE3 = len(SYLLABLES) ** 3 * len(STEMS)
+_NAME_SPACE = _SPACE3 + len(SYLLABLES) ** 4 * len(STEMS)
+_NAME_STRIDE = 104_729  # Prime and coprime with _NAME_SPACE: index -> distinct, scattered names.
+
+
+def base_name(index: int) -> str:
+    """Distinct pseudo-drug name for every index below ~159M ('Bakelolol', 'Tipazomab')."""
+    x = (index * _NAME_STRIDE) % _NAME_SPACE
+    n_syl = 3
+    if x >= _SPACE3:
+        x -= _SPACE3
+        n_syl = 4
+    x, stem = divmod(x, len(STEMS))
+    parts = []
+    for _ in range(n_syl):
+        x, s = divmod(x, len(SYLLABLES))
+        parts.append(SYLLABLES[s])
+    return ("".join(parts) + STEMS[stem]).capitalize()
+
+
+def collision_variant(name: str, rng: random.Random) -> str:
+    """A different spelling with the same normalize_name() key."""
+    choice = rng.randrange(3)
+    if choice == 0:
+        return name.upper()
+    if choice == 1 and " " in name:
+        return name.replace(" ", "-", 1)
+    return name.lower()
+
+
+def brand_name(rng: random.Random) -> str:
+    return ("".join(rng.choice(SYLLABLES) for _ in range(2)) + rng.choice(BRAND_ENDINGS)).capitalize()
+
+
+# ----------------------------------------------------------------
+# Rows
+# ----------------------------------------------------------------
+class RowFactory:
+    def __init__(self, profile: Dict[str, object], rng: random.Random):
+        self.p = profile
+        self.rng = rng
+        self.vocab: List[str] = profile["vocabulary"] or ["agent"]
+        # Cumulative weights once; choices() would rebuild them per call
+        self.cum = {
+            key: (values, list(accumulate(weights)))
+            for key in ("types", "groups", "categoryCounts", "categories", "atcCounts", "atcCodes")
+            for values, weights in [profile[key]]
+        }
+
+    def pick(self, key: str):
+        values, cum = self.cum[key]
+        return self.rng.choices(values, cum_weights=cum)[0]
+
+    def sample_distinct(self, key: str, count: int) -> List[str]:
+        out: List[str] = []
+        for _ in range(count * 3):
+            if len(out) >= count:
+                break
+            item = self.pick(key)
+            if item not in out:
+                out.append(item)
+        return out
+
+    def sentence(self, n_words: int) -> str:
+        words = self.rng.choices(self.vocab, k=max(n_words, 1))
+        return " ".join(words).capitalize() + "."
+
+    def description(self) -> str:
+        if self.rng.random() < self.p["emptyDescriptionRate"]:
+            return ""
+        target = self.rng.choice(self.p["descriptionLengths"])
+        sentences: List[str] = []
+        length = 0
+        while length < target:
+            s = self.sentence(self.rng.randint(6, 18))
+            sentences.append(s)
+            length += len(s) + 1
+        text = " ".join(sentences)
+        if len(sentences) > 1 and self.rng.random() < self.p["multilineDescriptionRate"]:
+            mid = len(sentences) // 2
+            text = " ".join(sentences[:mid]) + "\r\n\r\n" + " ".join(sentences[mid:])
+        return text
+
+    def inchi(self) -> Tuple[str, str]:
+        if self.rng.random() >= self.p["inchikeyRate"]:
+            return "", ""
+        letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        key = "".join(self.rng.choices(letters, k=14)) + "-" + "".join(self.rng.choices(letters, k=10)) + "-N"
+        c, h, n, o = (self.rng.randint(1, 60) for _ in range(4))
+        return key, f"InChI=1S/C{c}H{h}N{n}O{o}/c1-{c}-{h}-{n}/h{h}H"
+
+    def row(self, index: int, name: str) -> List[str]:
+        inchikey, inchi = self.inchi()
+        return [
+            f"DB{index + 1:05d}",
+            name,
+            self.pick("types"),
+            self.pick("groups"),
+            "|".join(self.sample_distinct("atcCodes", self.pick("atcCounts"))),
+            "|".join(self.sample_distinct("categories", self.pick("categoryCounts"))),
+            inchikey,
+            inchi,
+            self.description(),
+        ]
+
+    def curated(self, index: int, row: Sequence[str], mode: str, other_name: str) -> Dict[str, object]:
+        rng = self.rng
+        name = row[1].strip()
+        aliases: List[str] = []
+        if mode == "case":
+            name = name.upper() if rng.random() < 0.5 else name.lower()
+        elif mode == "salt":
+            name = f"{name} {rng.choice(SALT_SUFFIXES)}"
+        elif mode == "alias":
+            aliases.append(name)
+            name = brand_name(rng)
+        elif mode == "combo":
+            name = f"{name}/{other_name}"
+        elif mode == "unmatched":
+            name = f"{brand_name(rng)} {base_name(_NAME_SPACE - 1 - index)}"
+        categories = split_pipe(row[5])
+        drug_class = categories[0] if categories and rng.random() < 0.5 else rng.choice(self.p["curatedClasses"] or ["Unclassified"])
+
+        def items(lo: int, hi: int) -> List[str]:
+            return [self.sentence(rng.randint(3, 9)).rstrip(".") for _ in range(rng.randint(lo, hi))]
+
+        return {
+            "id": f"{normalize_name(name).replace(' ', '-')}-{index}",
+            "name": name,
+            "drugClass": drug_class,
+            "routes": sorted(set(rng.sample(ROUTES, rng.randint(1, 3))), key=ROUTES.index),
+            "moa": self.sentence(rng.randint(8, 16)),
+            "indications": items(1, 4),
+            "contraindications": items(1, 3),
+            "adverseEffects": items(1, 4),
+            "majorInteractions": items(1, 3),
+            "monitoring": items(1, 3),
+            "aliases": aliases,
+            "brandExamples": [brand_name(rng) for _ in range(rng.randint(0, 2))],
+            "pearls": items(0, 2),
+        }
+
+
+# ----------------------------------------------------------------
+# Generation
+# ----------------------------------------------------------------
+def generate(
+    out_dir: Path,
+    scale: int = DEFAULT_SCALE,
+    seed: int = DEFAULT_SEED,
+    profile: Dict[str, object] | None = None,
+) -> Dict[str, object]:
+    profile = profile or profile_source()
+    rng = random.Random(seed)
+    factory = RowFactory(profile, rng)
+    n_rows = int(profile["rows"]) * scale
+    n_curated = int(profile["curated"]) * scale
+
+    # Curated records are drawn from rows as they stream past, so no name list is held.
+    modes, mode_weights = zip(*CURATED_MATCH_MIX.items())
+    picks = sorted(rng.sample(range(n_rows), min(n_curated, n_rows)))
+    pick_modes = rng.choices(modes, mode_weights, k=len(picks))
+    next_pick = 0
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    curated: List[Dict[str, object]] = []
+    recent: List[str] = []
+    collisions = 0
+    name_index = 0
+    with (out_dir / "drugbank.tsv").open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle, delimiter="\t", lineterminator="\n")
+        writer.writerow(TSV_COLUMNS)
+        for i in range(n_rows):
+            if recent and rng.random() < profile["collisionRate"]:
+                name = collision_variant(rng.choice(recent), rng)
+                collisions += 1
+            else:
+                name = base_name(name_index)
+                name_index += 1
+                if rng.random() < NAME_EXTRA_WORD_RATE:
+                    name = f"{name} {rng.choice(NAME_EXTRA_WORDS)}"
+                recent.append(name)
+                if len(recent) > 512:
+                    recent.pop(0)
+            row = factory.row(i, name)
+            writer.writerow(row)
+            while next_pick < len(picks) and picks[next_pick] == i:
+                curated.append(factory.curated(len(curated), row, pick_modes[next_pick], rng.choice(recent)))
+                next_pick += 1
+
+    (out_dir / "pharm_data.json").write_text(json.dumps({"medications": curated}, indent=2, ensure_ascii=True) + "\n", encoding="utf-8")
+    shutil.copyfile(CLASSES_SIMPLE_PATH, out_dir / "classes_simple.json")
+
+    meta = {
+        "generatorVersion": GENERATOR_VERSION,
+        "seed": seed,
+        "scale": scale,
+        "sourceTsvSha256": sha256_path(SOURCE_TSV_PATH),
+        "tsvRows": n_rows,
+        "nameCollisions": collisions,
+        "curatedRecords": len(curated),
+        "curatedModes": dict(Counter(pick_modes)),
+    }
+    (out_dir / "dataset.json").write_text(json.dumps(meta, indent=2) + "\n", encoding="utf-8")
+    return meta
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    scale = int(take_option(args, "--scale") or DEFAULT_SCALE)
+    seed = int(take_option(args, "--seed") or DEFAULT_SEED)
+    if len(args) != 1:
+        print(__doc__)
+        return 2
+    meta = generate(Path(args[0]), scale, seed)
+    print(f"✅ {meta['tsvRows']:,} TSV rows ({meta['nameCollisions']} name collisions), {meta['curatedRecords']:,} curated records -> {args[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# bench_harness.py — shared plumbing for the scale benchmark suites
+#
+# Each suite (pharm/scripts/bench_pharm_pipeline.py,
+# differentials/bench_differentials_pipeline.py) runs every stage at every scale
+# in its own child process, so peak RSS is per stage rather than a high-water
+# mark across the whole run. The child times the stage entry point
+# (and selected phases inside it) and prints one JSON line; the parent adds the
+# child's peak RSS from wait4().
+#
+# Results file (one per suite run):
+#   {"format", "suite", "createdAt", "host": {...}, "results": [
+#       {"stage", "scale", "records", "seconds", "recordsPerSec", "peakRssBytes", "phases": {name: s}}, ...]}
+#
+# A baseline is just a saved results file. compare_results() flags a stage as a
+# regression when it is slower than TIME_REGRESSION_PCT and by more than the noise
+# floor (MIN_REGRESSION_SECONDS, or NOISE_SPREAD_FACTOR x the baseline's
+# slowest-minus-fastest repeat when that is larger, so noisy stages don't flap), or
+# its peak RSS grew by more than RSS_REGRESSION_PCT.
+#
+# A suite script only declares its Stages and how to build a dataset for a
+# scale; suite_main() does the rest (argument parsing, --child dispatch, fresh
+# scratch per repeat, results file, --save-baseline / --compare).
+
+from __future__ import annotations
+import contextlib
+import functools
+import importlib
+import inspect
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+from cli_util import take_option
+
+# =======================
+# ! Configuration (edit)
+# =======================
+# $ Repo checkout (this file lives in <repo>/py/)
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# $ Generated datasets, results and baselines (machine-specific; not committed)
+BENCH_DIR = REPO_DIR / ".bench"
+RESULTS_FORMAT = 1
+
+# $ Regression thresholds used by --compare
+TIME_REGRESSION_PCT = 20.0
+RSS_REGRESSION_PCT = 20.0
+MIN_REGRESSION_SECONDS = 0.05
+NOISE_SPREAD_FACTOR = 2.0  # x the baseline's repeat spread (spreadSeconds)
+
+# =======================
+# Child side
+# =======================
+
+def peak_rss_bytes(ru_maxrss: int) -> int:
+    """ru_maxrss is KiB on Linux, bytes on macOS."""
+    return ru_maxrss if sys.platform == "darwin" else ru_maxrss * 1024
+
+def time_phases(module: Any, names: Iterable[str | Tuple[str, str]], into: Dict[str, float]) -> None:
+    """Wrap module-level functions so calls through the module accumulate seconds in into[label].
+
+    names holds function names (label = name) or (label, name) pairs; several
+    functions may share a label. Only the outermost timed call counts: time spent in
+    a phase called from another phase (or recursively) goes to the outer one, so
+    nothing is counted twice and "(other)" stays the true remainder. Generator
+    functions are timed per item, leaving out the consumer's work between items.
+    """
+    active = [0]  # Timed calls currently on the stack
+    for entry in names:
+        label, name = (entry, entry) if isinstance(entry, str) else entry
+        fn = getattr(module, name)
+        into.setdefault(label, 0.0)
+        wrap = _timed_generator if inspect.isgeneratorfunction(fn) else _timed_call
+        setattr(module, name, wrap(fn, label, into, active))
+
+def _timed_call(fn: Callable, label: str, into: Dict[str, float], active: List[int]) -> Callable:
+    @functools.wraps(fn)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        if active[0]:
+            return fn(*args, **kwargs)
+        active[0] += 1
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            into[label] += time.perf_counter() - t0
+            active[0] -= 1
+
+    return timed
+
+def _timed_generator(fn: Callable, label: str, into: Dict[str, float], active: List[int]) -> Callable:
+    @functools.wraps(fn)
+    def timed(*args: Any, **kwargs: Any) -> Iterator[Any]:
+        gen = fn(*args, **kwargs)
+        while True:
+            outer = not active[0]
+            if outer:
+                active[0] += 1
+                t0 = time.perf_counter()
+            try:
+                item = next(gen)
+            except StopIteration:
+                return
+            finally:
+                if outer:
+                    into[label] += time.perf_counter() - t0
+                    active[0] -= 1
+            yield item
+
+    return timed
+
+def child_run(run: Callable[[Dict[str, float]], int]) -> int:
+    """Child-process entry: run(phases) returns the record count; prints one JSON line.
+
+    The stage's own prints go to stderr so stdout carries only the result.
+    """
+    phases: Dict[str, float] = {}
+    real_stdout = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        t0 = time.perf_counter()
+        records = run(phases)
+        seconds = time.perf_counter() - t0
+    phases["(other)"] = max(seconds - sum(phases.values()), 0.0)
+    real_stdout.write(json.dumps({"records": records, "seconds": seconds, "phases": phases}) + "\n")
+    real_stdout.flush()
+    return 0
+
+# =======================
+# Parent side
+# =======================
+
+def run_child(argv: Sequence[str], log_path: Path | None = None) -> Dict[str, Any]:
+    """Run argv, returning the child's JSON line plus its peak RSS; raises RuntimeError on failure."""
+    log = open(log_path, "wb") if log_path else subprocess.DEVNULL
+    try:
+        proc = subprocess.Popen(list(argv), stdout=subprocess.PIPE, stderr=log, cwd=REPO_DIR)
+        out = proc.stdout.read() if proc.stdout else b""
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+    finally:
+        if log_path:
+            log.close()
+    if proc.returncode != 0:
+        raise RuntimeError(f"exit {proc.returncode}" + (f"; log: {log_path}" if log_path else ""))
+    lines = out.decode("utf-8", "replace").strip().splitlines()
+    payload = json.loads(lines[-1])
+    payload["peakRssBytes"] = peak_rss_bytes(rusage.ru_maxrss)
+    return payload
+
+def result_row(stage: str, scale: int, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fold repeats: fastest time (with its phases) and the repeat spread, highest peak RSS."""
+    best = min(payloads, key=lambda p: p["seconds"])
+    seconds = best["seconds"]
+    spread = max(p["seconds"] for p in payloads) - seconds
+    return {
+        "stage": stage,
+        "scale": scale,
+        "records": best["records"],
+        "seconds": round(seconds, 4),
+        "spreadSeconds": round(spread, 4),
+        "recordsPerSec": round(best["records"] / seconds, 1) if seconds > 0 else None,
+        "peakRssBytes": max(p["peakRssBytes"] for p in payloads),
+        "repeats": len(payloads),
+        "phases": {k: round(v, 4) for k, v in best["phases"].items()},
+    }
+
+def host_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+def write_results(path: Path, suite: str, results: List[Dict[str, Any]], extra: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    doc = {
+        "format": RESULTS_FORMAT,
+        "suite": suite,
+        "createdAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "host": host_info(),
+        **(extra or {}),
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(doc, indent=2) + "\n", encoding="utf-8")
+    tmp.replace(path)
+    return doc
+
+def load_results(path: Path) -> Dict[str, Any]:
+    doc = json.loads(path.read_text(encoding="utf-8"))
+    if doc.get("format") != RESULTS_FORMAT:
+        raise ValueError(f"{path}: results format {doc.get('format')!r}, expected {RESULTS_FORMAT}")
+    return doc
+
+# =======================
+# Reporting / comparison
+# =======================
+
+def fmt_mb(n: int | None) -> str:
+    return "-" if n is None else f"{n / (1024 * 1024):.1f} MB"
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'stage':<28} {'scale':>6} {'records':>10} {'seconds':>9} {'rec/s':>11} {'peak RSS':>10}")
+    for r in results:
+        rate = f"{r['recordsPerSec']:,.0f}" if r["recordsPerSec"] else "-"
+        print(f"{r['stage']:<28} {r['scale']:>5}x {r['records']:>10,} {r['seconds']:>9.3f} {rate:>11} {fmt_mb(r['peakRssBytes']):>10}")
+        for name, s in sorted(r["phases"].items(), key=lambda kv: -kv[1]):
+            print(f"    {name:<36} {s:>9.3f}")
+
+def _pct(new: float, old: float) -> float:
+    return (new - old) / old * 100.0 if old else 0.0
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    time_pct: float = TIME_REGRESSION_PCT,
+    rss_pct: float = RSS_REGRESSION_PCT,
+    min_seconds: float = MIN_REGRESSION_SECONDS,
+    spread_factor: float = NOISE_SPREAD_FACTOR,
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Per (stage, scale) deltas against the baseline and a list of regression messages."""
+    base = {(r["stage"], r["scale"]): r for r in baseline["results"]}
+    rows: List[Dict[str, Any]] = []
+    regressions: List[str] = []
+    for r in current["results"]:
+        b = base.get((r["stage"], r["scale"]))
+        if b is None:
+            rows.append({"stage": r["stage"], "scale": r["scale"], "status": "new"})
+            continue
+        dt = _pct(r["seconds"], b["seconds"])
+        dm = _pct(r["peakRssBytes"], b["peakRssBytes"])
+        floor = max(min_seconds, spread_factor * b.get("spreadSeconds", 0.0))
+        slow = dt > time_pct and r["seconds"] - b["seconds"] > floor
+        fat = dm > rss_pct
+        if slow:
+            regressions.append(f"{r['stage']} @ {r['scale']}x: {b['seconds']:.3f}s -> {r['seconds']:.3f}s ({dt:+.0f}%)")
+        if fat:
+            regressions.append(
+                f"{r['stage']} @ {r['scale']}x: peak RSS {fmt_mb(b['peakRssBytes'])} -> {fmt_mb(r['peakRssBytes'])} ({dm:+.0f}%)"
+            )
+        rows.append({
+            "stage": r["stage"], "scale": r["scale"], "status": "REGRESSED" if slow or fat else "ok",
+            "seconds": (b["seconds"], r["seconds"], dt), "rss": (b["peakRssBytes"], r["peakRssBytes"], dm),
+        })
+    return rows, regressions
+
+def print_comparison(current: Dict[str, Any], baseline: Dict[str, Any], baseline_path: Path) -> int:
+    """Print the comparison table; returns 1 when anything regressed."""
+    rows, regressions = compare_results(current, baseline)
+    print(f"\nvs baseline {baseline_path} ({baseline.get('createdAt', '?')}; "
+          f"thresholds: time +{TIME_REGRESSION_PCT:.0f}% and +max({MIN_REGRESSION_SECONDS}s, {NOISE_SPREAD_FACTOR:g}x spread), "
+          f"RSS +{RSS_REGRESSION_PCT:.0f}%)")
+    if baseline.get("host") != current.get("host"):
+        print("⚠️  Baseline was recorded on a different host/Python; deltas are indicative only")
+    for row in rows:
+        if row["status"] == "new":
+            print(f"  {row['stage']:<28} {row['scale']:>5}x  (not in baseline)")
+            continue
+        (bs, cs, dt), (bm, cm, dm) = row["seconds"], row["rss"]
+        print(f"  {row['stage']:<28} {row['scale']:>5}x  {bs:8.3f}s -> {cs:8.3f}s {dt:+6.0f}%   "
+              f"{fmt_mb(bm):>9} -> {fmt_mb(cm):>9} {dm:+5.0f}%   {row['status']}")
+    if regressions:
+        print(f"⛔ {len(regressions)} regression(s):")
+        for msg in regressions:
+            print(f"  - {msg}")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+# =======================
+# Suite runner
+# =======================
+
+class Stage(NamedTuple):
+    name: str
+    module: str
+    phases: Tuple[str | Tuple[str, str], ...]  # see time_phases()
+    # (module, dataset dir, scratch dir) -> records processed; runs the stage
+    run: Callable[[Any, Path, Path], int]
+
+def stage_child(stages: Sequence[Stage], stage_name: str, data: Path, work: Path) -> int:
+    """Body of `<suite script> --child STAGE DATA WORK`."""
+    stage = next(s for s in stages if s.name == stage_name)
+    mod = importlib.import_module(stage.module)
+
+    def run(phases: Dict[str, float]) -> int:
+        time_phases(mod, stage.phases, phases)
+        return stage.run(mod, data, work)
+
+    return child_run(run)
+
+def run_suite(
+    suite: str,
+    script: str,
+    stages: Sequence[Stage],
+    ensure_dataset: Callable[[int, int, bool], Path],
+    work_dir: Path,
+    scales: List[int],
+    seed: int,
+    repeats: int,
+    regen: bool,
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    width = max(len(s.name) for s in stages)
+    for scale in scales:
+        print(f"▶ scale {scale}x")
+        data = ensure_dataset(scale, seed, regen)
+        payloads: Dict[str, List[Dict[str, Any]]] = {s.name: [] for s in stages}
+        for _ in range(repeats):
+            # Fresh scratch per repeat: later stages rewrite earlier stages' outputs, so a rerun would see a different workload
+            work = work_dir / f"{suite}-x{scale}"
+            if work.exists():
+                shutil.rmtree(work)
+            (work / "logs").mkdir(parents=True)
+            for stage in stages:
+                argv = [sys.executable, str(Path(script).resolve()), "--child", stage.name, str(data), str(work)]
+                payload = run_child(argv, work / "logs" / f"{stage.name}.log")
+                payloads[stage.name].append(payload)
+                print(f"  {stage.name:<{width}} {payload['seconds']:8.3f}s  {fmt_mb(payload['peakRssBytes']):>10}")
+        results.extend(result_row(s.name, scale, payloads[s.name]) for s in stages)
+    return results
+
+def suite_main(
+    usage: str | None,
+    suite: str,
+    script: str,
+    stages: Sequence[Stage],
+    ensure_dataset: Callable[[int, int, bool], Path],
+    *,
+    scales: Sequence[int],
+    seed: int,
+    repeats: int,
+    work_dir: Path,
+    results_path: Path,
+    baseline_path: Path,
+    generator_version: int,
+) -> int:
+    """CLI shared by the suite scripts (see their Usage); sys.argv[1:] are the options."""
+    args = sys.argv[1:]
+    if args[:1] == ["--child"]:
+        return stage_child(stages, args[1], Path(args[2]), Path(args[3]))
+
+    scale_list = [int(s) for s in (take_option(args, "--scales") or ",".join(map(str, scales))).split(",") if s]
+    seed = int(take_option(args, "--seed") or seed)
+    repeats = int(take_option(args, "--repeat") or repeats)
+    baseline_path = Path(take_option(args, "--baseline") or baseline_path)
+    out_path = Path(take_option(args, "--out") or results_path)
+    regen = "--regen" in args
+    save_baseline = "--save-baseline" in args
+    compare = "--compare" in args
+    unknown = [a for a in args if a not in ("--regen", "--save-baseline", "--compare")]
+    if unknown:
+        print(f"⛔ Unknown argument(s): {' '.join(unknown)}")
+        print(usage)
+        return 2
+
+    try:
+        results = run_suite(suite, script, stages, ensure_dataset, work_dir, scale_list, seed, repeats, regen)
+    except RuntimeError as e:
+        print(f"⛔ Stage failed: {e}")
+        return 1
+    doc = write_results(out_path, suite, results, {"seed": seed, "generatorVersion": generator_version})
+    print()
+    print_results(results)
+    print(f"\n✅ Results: {out_path}")
+
+    rc = 0
+    if compare:
+        if not baseline_path.exists():
+            print(f"⚠️  No baseline at {baseline_path} (run with --save-baseline first)")
+        else:
+            rc = print_comparison(doc, load_results(baseline_path), baseline_path)
+    if save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(out_path, baseline_path)
+        print(f"✅ Baseline saved: {baseline_path}")
+    return rc
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# build_cache.py — content-addressed artifact store shared by the generator stages
+#
+#   .build-cache/objects/<2 hex>/<sha256>   one read-only blob per distinct output file
+#   .build-cache/entries/<key>.json         {"stage", "key", "lastUsed", "files": {path: {sha256, size, mtime}}, ...}
+#
+# A key is whatever fully determines a stage's outputs; clerkship_build.py uses
+# its stage fingerprint (script content, args, config overrides, input contents).
+# On a hit the outputs are restored by copy instead of rerunning the script;
+# files matching the stage's owned globs that the entry does not list are
+# deleted first, as the script itself would have done.
+# lookup() only trusts a blob whose size and mtime still match what was recorded
+# (anything else is rehashed), and a copy is hashed as it is written, so a
+# damaged blob is dropped and counts as a miss. `verify` rehashes the whole store.
+#
+# Usage:
+#   python3 py/build_cache.py stats
+#   python3 py/build_cache.py list [STAGE]
+#   python3 py/build_cache.py prune [--max-size MB] [--max-age DAYS]
+#   python3 py/build_cache.py verify
+#   python3 py/build_cache.py clear
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from cli_util import take_option
+
+# =======================
+# ! Configuration (edit)
+# =======================
+# $ Repo checkout (this file lives in <repo>/py/); entry paths are relative to it
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# $ Store location; safe to delete at any time
+CACHE_DIR = REPO_DIR / ".build-cache"
+CACHE_FORMAT = 1  # bump to orphan every existing entry
+
+# $ Eviction limits applied after each clerkship-build run and by `prune`
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+MAX_ENTRY_AGE_DAYS = 30
+
+# $ "copy" (sha256-checked while copying) or "hardlink" (falls back to copy across devices)
+# ? Hardlinked outputs share the read-only blob's inode: an in-place rewrite of a restored
+# ? output changes the blob (lookup() then rehashes and drops it) or, for a non-root user,
+# ? fails on the read-only file. Only use it when nothing but clerkship_build.py writes them.
+RESTORE_MODE = "copy"
+
+# =======================
+# Helpers
+# =======================
+
+def sha256_path(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def fmt_bytes(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f} MB"
+
+def place(src: Path, dest: Path, link: bool) -> None:
+    """Atomically put src's content at dest, as a hardlink when allowed."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        if not link:
+            raise OSError("copy requested")
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+def copy_verified(src: Path, dest: Path, sha256: str) -> bool:
+    """Atomically copy src to dest, hashing on the way; nothing is written unless the digest matches."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.tmp")
+    h = hashlib.sha256()
+    try:
+        with src.open("rb") as fin, tmp.open("wb") as fout:
+            for chunk in iter(lambda: fin.read(1 << 20), b""):
+                h.update(chunk)
+                fout.write(chunk)
+        if h.hexdigest() != sha256:
+            return False
+        os.replace(tmp, dest)
+        return True
+    finally:
+        tmp.unlink(missing_ok=True)
+
+def unshare(paths: List[Path]) -> int:
+    """Give hardlinked files a private copy so an in-place rewrite cannot reach a cached blob."""
+    count = 0
+    for p in paths:
+        try:
+            if p.is_file() and p.stat().st_nlink > 1:
+                place(p, p, link=False)
+                count += 1
+        except OSError:
+            continue
+    return count
+
+# =======================
+# Store
+# =======================
+
+class ArtifactCache:
+    """Entries (key -> output file digests) over a shared blob store."""
+
+    def __init__(self, root: Path = CACHE_DIR):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.entries = self.root / "entries"
+
+    def entry_path(self, key: str) -> Path:
+        return self.entries / f"{key}.json"
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def read_entry(self, path: Path) -> Dict[str, Any] | None:
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and entry.get("format") == CACHE_FORMAT else None
+
+    def iter_entries(self) -> List[Tuple[Path, Dict[str, Any]]]:
+        out = []
+        for path in sorted(self.entries.glob("*.json")):
+            entry = self.read_entry(path)
+            if entry is not None:
+                out.append((path, entry))
+        return out
+
+    def write_entry(self, entry: Dict[str, Any]) -> None:
+        self.entries.mkdir(parents=True, exist_ok=True)
+        path = self.entry_path(entry["key"])
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(entry, indent=1, sort_keys=True), encoding="utf-8")
+        tmp.replace(path)
+
+    def discard_blob(self, digest: str) -> None:
+        blob = self.object_path(digest)
+        try:
+            blob.chmod(0o644)
+            blob.unlink()
+        except OSError:
+            pass
+
+    def blob_ok(self, meta: Dict[str, Any]) -> bool:
+        """Blob present with the recorded size and mtime, or rehashed to its digest; a bad blob is deleted."""
+        blob = self.object_path(meta["sha256"])
+        try:
+            st = blob.stat()
+        except OSError:
+            return False
+        if st.st_size == meta["size"] and st.st_mtime_ns == meta.get("mtime"):
+            return True
+        if st.st_size == meta["size"] and sha256_path(blob) == meta["sha256"]:
+            return True
+        self.discard_blob(meta["sha256"])
+        return False
+
+    def lookup(self, key: str) -> Dict[str, Any] | None:
+        """The entry for key if every blob it names passes blob_ok()."""
+        entry = self.read_entry(self.entry_path(key))
+        if entry is None:
+            return None
+        if not all(self.blob_ok(meta) for meta in entry["files"].values()):
+            return None
+        return entry
+
+    def store(
+        self, stage: str, key: str, files: Dict[str, Path], digest: Callable[[Path], str] = sha256_path
+    ) -> Dict[str, Any]:
+        """Record {repo-relative path: file} under key; blobs already in the store are reused."""
+        recorded: Dict[str, Dict[str, Any]] = {}
+        for rel, path in sorted(files.items()):
+            sha = digest(path)
+            size = path.stat().st_size
+            blob = self.object_path(sha)
+            if not blob.exists():
+                place(path, blob, link=False)
+                blob.chmod(0o444)
+            recorded[rel] = {"sha256": sha, "size": size, "mtime": blob.stat().st_mtime_ns}
+        now = time.time()
+        entry = {
+            "format": CACHE_FORMAT,
+            "stage": stage,
+            "key": key,
+            "createdAt": now,
+            "lastUsed": now,
+            "bytes": sum(m["size"] for m in recorded.values()),
+            "files": recorded,
+        }
+        self.write_entry(entry)
+        return entry
+
+    def restore(
+        self, entry: Dict[str, Any], dest_root: Path = REPO_DIR, mode: str = RESTORE_MODE, owned: Iterable[str] = ()
+    ) -> int:
+        """Put every recorded file back under dest_root; returns the file count.
+
+        owned holds dest_root-relative globs the stage's script rewrites wholesale
+        (it deletes what matches before writing); matching files the entry does not
+        list are deleted first, so stale outputs from another run don't survive.
+        Raises ValueError (after deleting the blob) when a blob fails its check;
+        treat that as a miss and rebuild.
+        """
+        for pattern in owned:
+            for p in dest_root.glob(pattern):
+                if p.is_file() and p.relative_to(dest_root).as_posix() not in entry["files"]:
+                    p.unlink()
+        for rel, meta in entry["files"].items():
+            blob = self.object_path(meta["sha256"])
+            if mode == "hardlink":
+                ok = self.blob_ok(meta)
+                if ok:
+                    place(blob, dest_root / rel, link=True)
+            else:
+                ok = copy_verified(blob, dest_root / rel, meta["sha256"])
+            if not ok:
+                self.discard_blob(meta["sha256"])
+                raise ValueError(f"cached blob for {rel} is damaged")
+        entry["lastUsed"] = time.time()
+        self.write_entry(entry)
+        return len(entry["files"])
+
+    # -----------------------
+    # Maintenance
+    # -----------------------
+
+    def object_sizes(self) -> Dict[str, int]:
+        return {p.name: p.stat().st_size for p in self.objects.glob("*/*") if p.is_file()}
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.iter_entries()
+        sizes = self.object_sizes()
+        per_stage: Dict[str, int] = {}
+        for _, entry in entries:
+            per_stage[entry["stage"]] = per_stage.get(entry["stage"], 0) + 1
+        return {"entries": len(entries), "objects": len(sizes), "bytes": sum(sizes.values()), "byStage": per_stage}
+
+    def gc(self) -> Tuple[int, int]:
+        """Delete blobs no entry references; returns (count, bytes)."""
+        live = {m["sha256"] for _, e in self.iter_entries() for m in e["files"].values()}
+        count = freed = 0
+        for name, size in self.object_sizes().items():
+            if name not in live:
+                blob = self.object_path(name)
+                blob.chmod(0o644)
+                blob.unlink()
+                count += 1
+                freed += size
+        return count, freed
+
+    def prune(self, max_bytes: int = MAX_CACHE_BYTES, max_age_days: float = MAX_ENTRY_AGE_DAYS) -> Dict[str, int]:
+        """Drop entries unused for max_age_days, then least recently used until blobs fit max_bytes."""
+        cutoff = time.time() - max_age_days * 86400
+        entries = sorted(self.iter_entries(), key=lambda pe: pe[1]["lastUsed"])
+        dropped = 0
+        for path, entry in entries:
+            if entry["lastUsed"] < cutoff:
+                path.unlink(missing_ok=True)
+                dropped += 1
+        entries = [(p, e) for p, e in entries if p.exists()]
+
+        objects, freed = self.gc()
+        total = sum(self.object_sizes().values())
+        while entries and total > max_bytes:
+            path, _ = entries.pop(0)
+            path.unlink(missing_ok=True)
+            dropped += 1
+            n, b = self.gc()
+            objects += n
+            freed += b
+            total -= b
+        return {"entries": dropped, "objects": objects, "bytes": freed}
+
+    def verify(self) -> Tuple[int, List[str]]:
+        """Rehash every blob; corrupt blobs and the entries naming them are removed."""
+        bad = set()
+        sizes = self.object_sizes()
+        for name in sizes:
+            blob = self.object_path(name)
+            if sha256_path(blob) != name:
+                bad.add(name)
+                blob.chmod(0o644)
+                blob.unlink()
+        dropped = []
+        for path, entry in self.iter_entries():
+            if any(m["sha256"] in bad for m in entry["files"].values()):
+                path.unlink(missing_ok=True)
+                dropped.append(entry["key"])
+        return len(sizes), dropped
+
+    def clear(self) -> None:
+        if self.root.exists():
+            for blob in self.objects.glob("*/*"):
+                blob.chmod(0o644)
+            shutil.rmtree(self.root)
+
+# =======================
+# CLI
+# =======================
+
+def main() -> int:
+    args = sys.argv[1:]
+    max_size = take_option(args, "--max-size")
+    max_age = take_option(args, "--max-age")
+    cache = ArtifactCache()
+    cmd = args[0] if args else "stats"
+
+    if cmd == "stats":
+        s = cache.stats()
+        print(f"{cache.root}: {s['entries']} entr{'y' if s['entries'] == 1 else 'ies'}, {s['objects']} blob(s), {fmt_bytes(s['bytes'])}")
+        for stage, n in sorted(s["byStage"].items()):
+            print(f"  {stage:<26} {n}")
+        print(f"  limits: {fmt_bytes(MAX_CACHE_BYTES)}, {MAX_ENTRY_AGE_DAYS} day(s) unused")
+    elif cmd == "list":
+        now = time.time()
+        for _, e in sorted(cache.iter_entries(), key=lambda pe: -pe[1]["lastUsed"]):
+            if len(args) > 1 and e["stage"] != args[1]:
+                continue
+            age_h = (now - e["lastUsed"]) / 3600
+            print(f"{e['key'][:16]}  {e['stage']:<26} {len(e['files']):>5} file(s) {fmt_bytes(e['bytes']):>10}  used {age_h:.1f}h ago")
+    elif cmd == "prune":
+        r = cache.prune(
+            int(float(max_size) * 1024 * 1024) if max_size else MAX_CACHE_BYTES,
+            float(max_age) if max_age else MAX_ENTRY_AGE_DAYS,
+        )
+        print(f"✅ Pruned {r['entries']} entr{'y' if r['entries'] == 1 else 'ies'}, {r['objects']} blob(s), {fmt_bytes(r['bytes'])}")
+    elif cmd == "verify":
+        checked, dropped = cache.verify()
+        if dropped:
+            print(f"⚠️  {len(dropped)} entr{'y' if len(dropped) == 1 else 'ies'} referenced corrupt blobs and were removed")
+            return 1
+        print(f"✅ {checked} blob(s) verified")
+    elif cmd == "clear":
+        cache.clear()
+        print(f"✅ Removed {cache.root}")
+    else:
+        print(f"⛔ Unknown command '{cmd}' (stats | list [STAGE] | prune [--max-size MB] [--max-age DAYS] | verify | clear)")
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
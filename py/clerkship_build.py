@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+# clerkship_build.py — clerkship-build: every generator script as one stage DAG
+#
+# Each stage is an existing script whose main() (or run()) is called in its own
+# single-use worker process, with its path constants pointed into this checkout. Stages
+# declare repo-relative inputs and outputs; a stage runs after every stage that
+# writes one of its inputs (or an output it also writes), so the pharm,
+# differentials and writer branches run concurrently. A stage is skipped when
+# its script, config overrides and input contents match its last successful run
+# and its outputs still exist.
+#
+# Usage:
+#   python3 py/clerkship_build.py [STAGE ...] [--force] [--no-cache] [--jobs N] [--dry-run] [--list] [--verbose]
+#   npm run clerkship-build
+# STAGE names select those stages plus the default stages upstream of them; without
+# names every default stage is built. Logs: .build-state/logs/<stage>.log
+# Outputs of cacheable stages are kept in the shared artifact store (build_cache.py)
+# and restored instead of rerunning when a fingerprint was built before (--no-cache: off).
+
+from __future__ import annotations
+import fnmatch
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Set, Tuple
+
+from build_cache import ArtifactCache, unshare
+
+# =======================
+# ! Configuration (edit)
+# =======================
+# $ Repo checkout (this file lives in <repo>/py/)
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# $ Stage fingerprints, file hash cache and per-stage logs; safe to delete (everything reruns)
+STATE_DIR = REPO_DIR / ".build-state"
+STATE_PATH = STATE_DIR / "state.json"
+LOG_DIR = STATE_DIR / "logs"
+STATE_VERSION = 1
+
+# $ Worker processes; 0 = one per core
+JOBS = 0
+
+# $ Files whose mtime is this close to when they were hashed are rehashed next time
+# ? (same rule as the make_tab_manifest.py checksum cache)
+RACY_WINDOW_NS = 2_000_000_000
+
+# $ Lines of a failed stage's log echoed to the console
+FAILED_LOG_TAIL = 20
+
+def repo(rel: str) -> Path:
+    return REPO_DIR / rel
+
+# =======================
+# Stages
+# =======================
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    script: str                        # repo-relative; part of the fingerprint
+    inputs: Tuple[str, ...]            # repo-relative files, directories or globs
+    outputs: Tuple[str, ...]
+    entry: str = "main"
+    args: Tuple[str, ...] = ()         # sys.argv[1:] seen by the script
+    config: Dict[str, Any] = field(default_factory=dict)  # module constants to override
+    external: Dict[str, str] = field(default_factory=dict)  # env var -> module constant naming an input outside the repo
+    default: bool = True               # False: only built when named on the command line
+    cacheable: bool = True             # False: outputs also depend on their own previous contents
+    owned: Tuple[str, ...] = ()        # output globs the script clears before writing; a cache restore does the same
+
+PRESENTATIONS = "differentials/data/presentations"
+TEMPLATES = "v1_writer/templates/template_*.json"
+# ? Imported by the pharm and differentials generator scripts; fingerprints only hash stage.script itself
+NORMALIZE = "py/text_normalize.py"
+
+# ? Declaration order breaks ties between stages writing the same path
+STAGES: List[Stage] = [
+    # --- pharm ---
+    Stage(
+        "pharm_import", "pharm/scripts/import_drugbank_tsv.py",
+        inputs=("pharm/assests/drugbank.tsv", "pharm/pharm_data.json", NORMALIZE),
+        outputs=("pharm/assests/pharm_data_drugbank_enriched.json", "pharm/assests/drugbank_import_report.json"),
+    ),
+    Stage(
+        "pharm_expand", "pharm/scripts/expand_drugbank_catalog.py",
+        inputs=("pharm/assests/drugbank.tsv", "pharm/assests/pharm_data_drugbank_enriched.json", NORMALIZE),
+        outputs=("pharm/assests/pharm_data_drugbank_enriched.json", "pharm/assests/drugbank_catalog_report.json"),
+    ),
+    Stage(
+        "pharm_subclasses", "pharm/scripts/build_class_subclasses.py", entry="run",
+        inputs=("pharm/assests/classes_simple.json", "pharm/assests/pharm_data_drugbank_enriched.json", NORMALIZE),
+        outputs=("pharm/assests/classes",),
+        owned=("pharm/assests/classes/*_subclasses.json",),  # CLEAN_EXISTING_SUBCLASS_FILES
+    ),
+    # --- differentials ---
+    Stage(
+        "differentials_fix_index", "differentials/fix_parenthetical_etiologies.py", args=("--apply",),
+        inputs=("differentials/clinical_presentation_index.json",),
+        outputs=("differentials/clinical_presentation_index.json",),
+        config={
+            "INPUT_PATH": repo("differentials/clinical_presentation_index.json"),
+            "OUTPUT_PATH": repo("differentials/clinical_presentation_index.json"),
+            "BLOCK_CACHE_PATH": repo("differentials/.fix_parenthetical_cache.json"),
+        },
+        default=False,  # the script is dry-run by default; rewriting the index stays opt-in
+        cacheable=False,
+    ),
+    Stage(
+        "differentials_write", "differentials/write_presentation.py",
+        inputs=(
+            "differentials/Presentation_list.json",
+            "differentials/clinical_presentation_index.json",
+            "differentials/non-clinical_presentation_index.json",
+            "assets/presentations_schema.json",
+            "differentials/etiology_index.py",
+            NORMALIZE,
+        ),
+        outputs=(PRESENTATIONS, "differentials/data/etiology_index.json", "differentials/data/manifest.json"),
+        config={
+            "BASE_DIR": str(repo(PRESENTATIONS)),
+            "PRESENTATION_LIST_PATH": str(repo("differentials/Presentation_list.json")),
+            "CLINICAL_INDEX_PATH": str(repo("differentials/clinical_presentation_index.json")),
+            "NONCLINICAL_INDEX_PATH": str(repo("differentials/non-clinical_presentation_index.json")),
+            "SCHEMA_PATH": str(repo("assets/presentations_schema.json")),
+            "SUMMARY_PATH": str(LOG_DIR / "presentation_build_summary.md"),
+            "ETIOLOGY_INDEX_PATH": str(repo("differentials/data/etiology_index.json")),
+            "MANIFEST_PATH": str(repo("differentials/data/manifest.json")),
+            # ? HPI-derived artifacts are their own stages so they also follow differentials_fill
+            "WRITE_COMPACT_BUNDLE": False,
+            "WRITE_HPI_BITMAP_INDEX": False,
+        },
+        cacheable=False,  # keeps curated/filled presentation files it finds on disk
+    ),
+    Stage(
+        "differentials_fill", "differentials/fill_clinical_todo_from_pdf.py",
+        inputs=(f"{PRESENTATIONS}/clinical", "differentials/pdf_page_store.py", "differentials/pocketbook_fts.py", NORMALIZE),
+        outputs=(f"{PRESENTATIONS}/clinical/todo",),
+        config={"TODO_DIR": repo(f"{PRESENTATIONS}/clinical/todo")},
+        external={"POCKETBOOK_PDF": "PDF_PATH"},
+        cacheable=False,
+    ),
+    Stage(
+        "differentials_bundle", "differentials/presentation_codec.py",
+        inputs=(PRESENTATIONS, "assets/presentations_schema.json"),
+        outputs=("differentials/data/presentations.compact.json",),
+    ),
+    Stage(
+        "differentials_hpi_index", "differentials/hpi_bitmap_index.py",
+        inputs=(PRESENTATIONS, "assets/presentations_schema.json"),
+        outputs=("differentials/data/hpi_bitmap_index.json",),
+    ),
+    # --- writer ---
+    Stage(
+        "writer_tab_manifest", "py/make_tab_manifest.py",
+        inputs=(TEMPLATES,),
+        outputs=("v1_writer/tabs.json", "v1_writer/templates/build"),
+        owned=("v1_writer/templates/build/*.json",),  # BUNDLE_DIR
+        config={
+            "PROJECT_DIR": repo("v1_writer/templates"),
+            "OUTPUT_PATH": repo("v1_writer/tabs.json"),
+            "CACHE_PATH": repo("v1_writer/templates/.tab_manifest_cache.json"),
+            "BUNDLE_DIR": repo("v1_writer/templates/build"),
+        },
+    ),
+    Stage(
+        "writer_prerender", "py/prerender_note_writer.py",
+        inputs=(TEMPLATES, "py/make_tab_manifest.py"),
+        outputs=("v1_writer/note_writer/MSE.html", "v1_writer/note_writer/ROS.html", "v1_writer/note_writer/physical.html"),
+    ),
+]
+STAGE_BY_NAME = {s.name: s for s in STAGES}
+
+# =======================
+# Graph
+# =======================
+
+def overlaps(a: str, b: str) -> bool:
+    """True if one repo path (or glob) is, contains or matches the other."""
+    pa, pb = PurePosixPath(a).parts, PurePosixPath(b).parts
+    return all(fnmatch.fnmatchcase(x, y) or fnmatch.fnmatchcase(y, x) for x, y in zip(pa, pb))
+
+def build_graph(stages: List[Stage]) -> Dict[str, Set[str]]:
+    """stage -> stages it waits for: writers of its inputs, and earlier writers of its outputs."""
+    deps: Dict[str, Set[str]] = {s.name: set() for s in stages}
+    for i, s in enumerate(stages):
+        for j, other in enumerate(stages):
+            if i == j:
+                continue
+            reads = any(overlaps(inp, out) for inp in s.inputs for out in other.outputs)
+            shares = j < i and any(overlaps(a, b) for a in s.outputs for b in other.outputs)
+            if reads or shares:
+                deps[s.name].add(other.name)
+    topo_order(deps)  # raises on cycles
+    return deps
+
+def topo_order(deps: Dict[str, Set[str]]) -> List[str]:
+    order: List[str] = []
+    done: Set[str] = set()
+    pending = dict(deps)
+    while pending:
+        ready = [n for n, d in pending.items() if d <= done]
+        if not ready:
+            raise RuntimeError(f"Stage cycle among: {', '.join(sorted(pending))}")
+        for n in ready:
+            order.append(n)
+            done.add(n)
+            del pending[n]
+    return order
+
+def select(targets: List[str], deps: Dict[str, Set[str]]) -> Set[str]:
+    """Targets plus every default stage upstream of them (opt-in stages only when named)."""
+    chosen: Set[str] = set()
+    stack = list(targets)
+    while stack:
+        n = stack.pop()
+        if n not in chosen:
+            chosen.add(n)
+            stack.extend(d for d in deps[n] if STAGE_BY_NAME[d].default)
+    return chosen
+
+# =======================
+# Fingerprints
+# =======================
+
+def load_state() -> Dict[str, Any]:
+    try:
+        raw = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        raw = None
+    if not isinstance(raw, dict) or raw.get("version") != STATE_VERSION:
+        return {"version": STATE_VERSION, "stages": {}, "files": {}}
+    return raw
+
+def save_state(state: Dict[str, Any]) -> None:
+    STATE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_name(STATE_PATH.name + ".tmp")
+    tmp.write_text(json.dumps(state, indent=1, sort_keys=True), encoding="utf-8")
+    tmp.replace(STATE_PATH)
+
+def file_sha256(path: Path, files: Dict[str, Any]) -> str:
+    """Content hash, reused while (size, mtime) match and the entry is not racy."""
+    st = path.stat()
+    key = str(path)
+    entry = files.get(key)
+    if (
+        entry
+        and entry["size"] == st.st_size
+        and entry["mtimeNs"] == st.st_mtime_ns
+        and entry["cachedAtNs"] - st.st_mtime_ns >= RACY_WINDOW_NS
+    ):
+        return entry["sha256"]
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    files[key] = {"size": st.st_size, "mtimeNs": st.st_mtime_ns, "sha256": h.hexdigest(), "cachedAtNs": time.time_ns()}
+    return h.hexdigest()
+
+def expand_input(pattern: str) -> List[Path]:
+    """Files behind one input: glob matches, every file under a directory, or the file itself."""
+    path = Path(pattern) if Path(pattern).is_absolute() else REPO_DIR / pattern
+    if any(ch in pattern for ch in "*?["):
+        return sorted(p for p in path.parent.glob(path.name) if p.is_file())
+    if path.is_dir():
+        return sorted(
+            p for p in path.rglob("*")
+            if p.is_file() and not any(part.startswith(".") or part == "__pycache__" for part in p.relative_to(path).parts)
+        )
+    return [path] if path.is_file() else []
+
+def fingerprint(stage: Stage, inputs: Tuple[str, ...], config: Dict[str, Any], files: Dict[str, Any]) -> Tuple[str | None, List[str]]:
+    """(sha256 over script, args, config and input contents, inputs that resolved to no files)."""
+    h = hashlib.sha256()
+    h.update(json.dumps([stage.script, stage.entry, list(stage.args), config], sort_keys=True, default=str).encode("utf-8"))
+    h.update(file_sha256(REPO_DIR / stage.script, files).encode("ascii"))
+    missing: List[str] = []
+    for pattern in inputs:
+        paths = expand_input(pattern)
+        if not paths:
+            missing.append(pattern)
+        for p in paths:
+            rel = p.relative_to(REPO_DIR).as_posix() if p.is_relative_to(REPO_DIR) else str(p)
+            h.update(f"\0{rel}\0{file_sha256(p, files)}".encode("utf-8"))
+    return (None if missing else h.hexdigest()), missing
+
+def outputs_exist(stage: Stage) -> bool:
+    return all((REPO_DIR / out).exists() for out in stage.outputs)
+
+def output_files(stage: Stage) -> Dict[str, Path]:
+    """Repo-relative path -> file for everything currently under the stage's outputs."""
+    return {p.relative_to(REPO_DIR).as_posix(): p for out in stage.outputs for p in expand_input(out)}
+
+def resolve_external(stage: Stage) -> Dict[str, Path]:
+    """Module constant -> path for inputs outside the repo: $ENV if set, else the script's own default."""
+    resolved: Dict[str, Path] = {}
+    for env, attr in stage.external.items():
+        if os.environ.get(env):
+            resolved[attr] = Path(os.environ[env]).expanduser()
+        else:
+            resolved[attr] = Path(getattr(import_stage_module(stage), attr))
+    return resolved
+
+# =======================
+# Worker
+# =======================
+
+def import_stage_module(stage: Stage):
+    """Import the script under its own name (nested process pools re-import it by name)."""
+    script = REPO_DIR / stage.script
+    if str(script.parent) not in sys.path:
+        sys.path.insert(0, str(script.parent))
+    return importlib.import_module(script.stem)
+
+def run_stage(name: str, config: Dict[str, Any], log_path: str) -> Tuple[str, int, float]:
+    """Runs in a fresh worker process: stdout/stderr go to the stage log."""
+    stage = STAGE_BY_NAME[name]
+    fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    os.chdir(REPO_DIR)
+    sys.argv = [str(REPO_DIR / stage.script), *stage.args]
+    t0 = time.perf_counter()
+    status = 0
+    try:
+        module = import_stage_module(stage)
+        for attr, value in config.items():
+            setattr(module, attr, value)
+        result = getattr(module, stage.entry)()
+        status = result if isinstance(result, int) else 0
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return name, status, time.perf_counter() - t0
+
+# =======================
+# Scheduler
+# =======================
+
+def log_tail(path: Path, n: int) -> str:
+    try:
+        lines = path.read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return ""
+    return "\n".join(f"      {line}" for line in lines[-n:])
+
+def critical_path(names: List[str], deps: Dict[str, Set[str]], durations: Dict[str, float]) -> Tuple[float, List[str]]:
+    """Longest chain of measured stage times through the selected DAG."""
+    finish: Dict[str, float] = {}
+    via: Dict[str, str | None] = {}
+    for n in names:
+        before = [d for d in deps[n] if d in finish]
+        prev = max(before, key=lambda d: finish[d], default=None)
+        finish[n] = durations.get(n, 0.0) + (finish[prev] if prev else 0.0)
+        via[n] = prev
+    if not finish:
+        return 0.0, []
+    end = max(finish, key=lambda n: finish[n])
+    chain: List[str] = []
+    node: str | None = end
+    while node:
+        chain.append(node)
+        node = via[node]
+    return finish[end], chain[::-1]
+
+def build(targets: List[str], force: bool, jobs: int, dry_run: bool, verbose: bool, use_cache: bool = True) -> int:
+    deps = build_graph(STAGES)
+    chosen = select(targets, deps)
+    order = [n for n in topo_order(deps) if n in chosen]
+    sub = {n: deps[n] & chosen for n in order}
+
+    state = load_state()
+    files: Dict[str, Any] = state["files"]
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+
+    status: Dict[str, str] = {}      # ran / restored / skipped / missing / failed / blocked / would-run
+    durations: Dict[str, float] = {}
+    plans: Dict[str, Tuple[Tuple[str, ...], Dict[str, Any], str]] = {}
+    cache = ArtifactCache() if use_cache else None
+
+    def record(name: str, secs: float) -> None:
+        """Store the post-run fingerprint (stages that rewrite an input in place stay up to date)."""
+        inputs, config, _ = plans[name]
+        fp, _ = fingerprint(STAGE_BY_NAME[name], inputs, config, files)
+        state["stages"][name] = {"fingerprint": fp, "seconds": round(secs, 3), "finishedAt": time.time()}
+    waiting = list(order)
+    running: Dict[Any, str] = {}
+    t_start = time.perf_counter()
+
+    def settle(name: str) -> bool:
+        """Decide a ready stage without running it; False means it has to run."""
+        stage = STAGE_BY_NAME[name]
+        if any(status[d] in ("failed", "blocked") for d in sub[name]):
+            status[name] = "blocked"
+            print(f"  ⛔ {name}: blocked by a failed upstream stage")
+            return True
+        try:
+            external = resolve_external(stage)
+        except Exception as e:
+            status[name] = "missing"
+            print(f"  ⚠️  {name}: cannot resolve external input ({e})")
+            return True
+        inputs = stage.inputs + tuple(str(p) for p in external.values())
+        config = {**stage.config, **external}
+        fp, missing = fingerprint(stage, inputs, config, files)
+        if missing:
+            status[name] = "missing"
+            hint = "".join(f" (set ${env})" for env in stage.external)
+            print(f"  ⚠️  {name}: skipped, missing input {', '.join(missing)}{hint}")
+            return True
+        plans[name] = (inputs, config, fp)
+        upstream_changes = any(status[d] in ("ran", "restored", "would-run") for d in sub[name])
+        if not force and fp == state["stages"].get(name, {}).get("fingerprint") and outputs_exist(stage):
+            status[name] = "skipped"
+            print(f"  … {name}: up to date")
+            return True
+        entry = cache.lookup(fp) if cache and stage.cacheable and not force else None
+        if entry and not dry_run:
+            t0 = time.perf_counter()
+            try:
+                count = cache.restore(entry, owned=stage.owned)
+            except (OSError, ValueError) as e:
+                print(f"  ⚠️  {name}: cache restore failed ({e}); rebuilding")
+                entry = None
+            else:
+                durations[name] = time.perf_counter() - t0
+                record(name, durations[name])
+                status[name] = "restored"
+                print(f"  ♻️  {name}: restored {count} file(s) from {cache.root.name}")
+                return True
+        if dry_run:
+            status[name] = "would-run"
+            what = "would restore from cache" if entry else "would run"
+            print(f"  ▶️  {name}: {what}{' (after upstream changes)' if upstream_changes else ''}")
+            return True
+        return False
+
+    workers = jobs or os.cpu_count() or 1
+    # $ One single-use pool per stage: run_stage redirects fds and patches module globals, so no worker is reused
+    pools: Dict[Future, ProcessPoolExecutor] = {}
+    try:
+        while waiting or running:
+            for name in list(waiting):
+                if len(running) >= workers:
+                    break
+                if not all(d in status for d in sub[name]):
+                    continue
+                waiting.remove(name)
+                if settle(name):
+                    continue
+                print(f"  ▶️  {name}")
+                unshare(list(output_files(STAGE_BY_NAME[name]).values()))
+                log = LOG_DIR / f"{name}.log"
+                pool = ProcessPoolExecutor(max_workers=1)
+                fut = pool.submit(run_stage, name, plans[name][1], str(log))
+                running[fut], pools[fut] = name, pool
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                pools.pop(fut).shutdown()
+                log = LOG_DIR / f"{name}.log"
+                try:
+                    _, rc, secs = fut.result()
+                except Exception as e:  # worker died
+                    rc, secs = 1, 0.0
+                    print(f"  ⛔ {name}: worker error {e!r}")
+                durations[name] = secs
+                if rc == 0:
+                    status[name] = "ran"
+                    stage = STAGE_BY_NAME[name]
+                    if cache and stage.cacheable:
+                        # $ Keyed by the pre-run fingerprint: what a later run with these inputs looks up
+                        cache.store(name, plans[name][2], output_files(stage), digest=lambda p: file_sha256(p, files))
+                    record(name, secs)
+                    print(f"  ✅ {name} ({secs:.2f}s)")
+                else:
+                    status[name] = "failed"
+                    state["stages"].pop(name, None)
+                    print(f"  ⛔ {name} failed (exit {rc}, {secs:.2f}s); log: {log}\n{log_tail(log, FAILED_LOG_TAIL)}")
+                if verbose:
+                    print(log.read_text(encoding="utf-8", errors="replace"))
+            save_state(state)
+    finally:
+        for pool in pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    state["files"] = {k: v for k, v in files.items() if Path(k).exists()}
+    save_state(state)
+    wall = time.perf_counter() - t_start
+    if cache and not dry_run:
+        pruned = cache.prune()
+        if pruned["entries"]:
+            print(f"  {cache.root.name}: evicted {pruned['entries']} entr{'y' if pruned['entries'] == 1 else 'ies'} ({pruned['bytes'] / (1024 * 1024):.1f} MB)")
+    counts = {
+        k: sum(1 for v in status.values() if v == k)
+        for k in ("ran", "restored", "skipped", "would-run", "missing", "failed", "blocked")
+    }
+    print("Summary: " + ", ".join(f"{v} {k}" for k, v in counts.items() if v))
+
+    if durations:
+        # $ Skipped stages cost 0; the critical path bounds the wall time at any job count
+        length, chain = critical_path(order, sub, durations)
+        total = sum(durations.values())
+        print(f"  wall {wall:.2f}s | stage time {total:.2f}s | critical path {length:.2f}s ({workers} worker(s))")
+        print("  critical path: " + " -> ".join(f"{n} {durations.get(n, 0.0):.2f}s" for n in chain))
+    return 1 if counts["failed"] or counts["blocked"] else 0
+
+# =======================
+# CLI
+# =======================
+
+def list_stages() -> None:
+    deps = build_graph(STAGES)
+    state = load_state()
+    for name in topo_order(deps):
+        stage = STAGE_BY_NAME[name]
+        last = state["stages"].get(name, {})
+        after = ", ".join(sorted(deps[name])) or "-"
+        timing = f"{last['seconds']:.2f}s" if "seconds" in last else "never built"
+        opt = "" if stage.default else " [opt-in]"
+        print(f"{name:<26} after: {after:<44} last: {timing}{opt}")
+        print(f"    {stage.script}: {', '.join(stage.inputs)} -> {', '.join(stage.outputs)}")
+
+def main() -> int:
+    args = sys.argv[1:]
+    jobs = JOBS
+    if "--jobs" in args:
+        i = args.index("--jobs")
+        if i + 1 >= len(args):
+            raise SystemExit("--jobs needs a value")
+        jobs = int(args[i + 1])
+        del args[i : i + 2]
+    flags = {a for a in args if a.startswith("--")}
+    names = [a for a in args if not a.startswith("--")]
+    bad = sorted(flags - {"--list", "--force", "--dry-run", "--verbose", "--no-cache"})
+    if bad:
+        print(f"⛔ Unknown argument(s): {' '.join(bad)}")
+        print("usage: clerkship_build.py [STAGE ...] [--force] [--no-cache] [--jobs N] [--dry-run] [--list] [--verbose]")
+        return 2
+
+    if "--list" in flags:
+        list_stages()
+        return 0
+    unknown = [n for n in names if n not in STAGE_BY_NAME]
+    if unknown:
+        print(f"⛔ Unknown stage(s): {', '.join(unknown)}; see --list")
+        return 2
+    targets = names or [s.name for s in STAGES if s.default]
+    return build(targets, "--force" in flags, jobs, "--dry-run" in flags, "--verbose" in flags, "--no-cache" not in flags)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
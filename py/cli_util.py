@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# cli_util.py — argv helpers shared by the hand-parsed script CLIs
+#
+# The scripts parse sys.argv by hand (flags checked with `in`, options popped
+# in place); this keeps the one piece they all repeat in a single spot:
+#
+#   py/note_renderer.py, py/build_cache.py, py/bench_harness.py,
+#   differentials/pocketbook_fts.py, the synthetic data generators
+
+from __future__ import annotations
+from typing import List
+
+def take_option(args: List[str], name: str) -> str | None:
+    """Pop `name VALUE` from args; None when absent."""
+    if name not in args:
+        return None
+    idx = args.index(name)
+    if idx + 1 >= len(args):
+        raise SystemExit(f"{name} needs a value")
+    value = args[idx + 1]
+    del args[idx : idx + 2]
+    return value
@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 # make_tab_manifest.py — richer tabs.json generator
+# Usage: python3 make_tab_manifest.py [--verify]   (--verify ignores the checksum cache)
 
 from __future__ import annotations
+import base64
 import json
 import hashlib
+import os
+import sys
+import time
 from json.decoder import JSONDecodeError
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, List, Tuple
 
 # =======================
 # ! Configuration (edit)
@@ -34,6 +39,23 @@ HTML_PATH_MAP = {
 # $ Manifest version so your runtime can evolve safely
 MANIFEST_VERSION = 1
 
+# $ Per-template checksum/structure cache keyed by (path, size, mtime); safe to delete
+# ? Run with --verify to ignore it, rehash everything and report stale entries
+CACHE_PATH = PROJECT_DIR / ".tab_manifest_cache.json"
+CACHE_VERSION = 2
+
+# $ Entries whose mtime is this close to the time they were cached are rehashed anyway
+# ? (a save in the same mtime tick as the cache write would otherwise go unnoticed)
+RACY_WINDOW_NS = 2_000_000_000
+
+# $ One content-hashed, minified template bundle for the writer to fetch and cache forever
+# ? With PROJECT_DIR = v1_writer/templates this is templates/build/, which js/app.js reads
+# ! BUNDLE_DIR is owned by this script: stale *.json files in it are deleted on each run
+EMIT_BUNDLE = True
+BUNDLE_DIR = PROJECT_DIR / "build"
+BUNDLE_MANIFEST_NAME = "manifest.json"  # fixed name; the only file the writer revalidates
+HASH_LEN = 8
+
 # =======================
 # Internal helpers
 # =======================
@@ -50,55 +72,73 @@ def safe_get(obj: Any, key: str, default=None):
         return obj.get(key, default)
     return default
 
-def iter_dicts(obj: Any) -> Iterable[Dict[str, Any]]:
-    """Yield every dict in the structure (preorder)."""
-    if isinstance(obj, dict):
-        yield obj
-        for v in obj.values():
-            yield from iter_dicts(v)
-    elif isinstance(obj, list):
-        for it in obj:
-            yield from iter_dicts(it)
-
-def count_structure(data: Dict[str, Any]) -> Tuple[int, int, int, List[str]]:
+# $ List keys whose dict items are writer controls/fields -> (kind in the id index, count bucket)
+ITEM_KINDS = {
+    "headerItems":   ("headerItem", "headerItems"),
+    "headerToggles": ("headerToggle", "checkboxes"),
+    "checkboxes":    ("checkbox", "checkboxes"),
+    "chips":         ("chip", "chips"),
+    "fields":        ("field", "fields"),
+    "children":      ("field", "fields"),
+}
+
+def scan_template(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Returns (sectionCount, panelCount, chipCount, chipIds)
-    Heuristics:
-      - "sections": list of sections
-      - "panels": list of panels within section(s)
-      - "chips": list within a panel
+    One iterative preorder walk over a template. Returns counts, chip ids,
+    whether any "defaults" key exists, and every item id with its location:
+      ids: [[id, kind, section, panel], ...] in document order
+    Shapes:
+      - "sectionDefs": {"MODE:Section": {...}}; keys without ':' (e.g. "globals")
+        are not sections, their lists of {id} items are indexed as kind "global"
+      - "panels" (panel = title or id), ITEM_KINDS lists, legacy top-level "sections"
     """
-    section_count = 0
-    panel_count = 0
-    chip_count = 0
+    counts = {"sections": 0, "panels": 0, "chips": 0, "checkboxes": 0, "headerItems": 0, "fields": 0}
     chip_ids: List[str] = []
-
-    # Count sections
-    sections = safe_get(data, "sections", [])
-    if isinstance(sections, list):
-        section_count += len(sections)
-
-    # Count panels and chips by walking the tree
-    for d in iter_dicts(data):
-        # panels
-        panels = d.get("panels")
-        if isinstance(panels, list):
-            panel_count += len(panels)
-        # chips
-        chips = d.get("chips")
-        if isinstance(chips, list):
-            chip_count += len(chips)
-            for c in chips:
-                if isinstance(c, dict):
-                    cid = c.get("id")
-                    if isinstance(cid, str):
-                        chip_ids.append(cid)
-
-    return section_count, panel_count, chip_count, chip_ids
-
-def detect_defaults(data: Dict[str, Any]) -> bool:
-    # Consider any "defaults" key anywhere as a default presence
-    return any("defaults" in d for d in iter_dicts(data))
+    ids: List[List[Any]] = []
+    has_defaults = False
+
+    legacy_sections = safe_get(data, "sections", [])
+    if isinstance(legacy_sections, list):
+        counts["sections"] += len(legacy_sections)
+
+    # (node, section, panel, kind of the list the node sits in)
+    stack: List[Tuple[Any, str | None, str | None, str | None]] = [(data, None, None, None)]
+    while stack:
+        node, section, panel, kind = stack.pop()
+        if isinstance(node, list):
+            stack.extend((it, section, panel, kind) for it in reversed(node))
+            continue
+        if not isinstance(node, dict):
+            continue
+        if "defaults" in node:
+            has_defaults = True
+        nid = node.get("id")
+        if kind and isinstance(nid, str):
+            ids.append([nid, kind, section, panel])
+            if kind == "chip":
+                chip_ids.append(nid)
+
+        children: List[Tuple[Any, str | None, str | None, str | None]] = []
+        for key, value in node.items():
+            if node is data and key == "sectionDefs" and isinstance(value, dict):
+                counts["sections"] += sum(1 for k in value if ":" in k)
+                children.extend((v, k, None, None) for k, v in value.items())
+            elif key == "panels" and isinstance(value, list):
+                counts["panels"] += len(value)
+                for pd in value:
+                    title = safe_get(pd, "title") or safe_get(pd, "id")
+                    children.append((pd, section, title if isinstance(title, str) else None, None))
+            elif key in ITEM_KINDS and isinstance(value, list):
+                item_kind, bucket = ITEM_KINDS[key]
+                counts[bucket] += len(value)
+                children.append((value, section, panel, item_kind))
+            elif section is not None and ":" not in section and panel is None and isinstance(value, list):
+                children.append((value, section, key, "global"))
+            elif isinstance(value, (dict, list)):
+                children.append((value, section, panel, None))
+        stack.extend(reversed(children))
+
+    return {"counts": counts, "chipIds": chip_ids, "ids": ids, "hasDefaults": has_defaults}
 
 def derive_html_path(mode_key: str) -> str:
     key = mode_key.strip().upper()
@@ -137,11 +177,176 @@ def infer_mode_from_filename(path: Path) -> str:
         return name[len("template_"):].strip().upper()
     return name.strip().upper()
 
+def summarize_template(path: Path, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Everything main() needs from one template file; this is what gets cached."""
+    scan = scan_template(data)
+    counts = scan["counts"]
+    return {
+        "checksum": sha256_file(path),
+        "modesRaw": safe_get(data, "modes", []),
+        "title": safe_get(data, "title", None),
+        "sectionCount": counts["sections"],
+        "panelCount": counts["panels"],
+        "chipCount": counts["chips"],
+        "checkboxCount": counts["checkboxes"],
+        "headerItemCount": counts["headerItems"],
+        "fieldCount": counts["fields"],
+        "chipIds": scan["chipIds"],
+        "ids": scan["ids"],
+        "hasDefaults": scan["hasDefaults"],
+    }
+
+# =======================
+# Cross-template id index
+# =======================
+
+def build_id_index(
+    sources: List[Tuple[str, str, List[List[Any]]]]
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, Any]]]]:
+    """
+    sources: [(mode key, file name, summary["ids"]), ...] in tab order.
+    Returns (byId, duplicates): byId maps each id to its first location
+    {mode, file, section, panel, kind}; duplicates maps every id seen more
+    than once to all of its locations.
+    """
+    by_id: Dict[str, Dict[str, Any]] = {}
+    duplicates: Dict[str, List[Dict[str, Any]]] = {}
+    for mode, fname, ids in sources:
+        for item_id, kind, section, panel in ids:
+            loc = {"mode": mode, "file": fname, "section": section, "panel": panel, "kind": kind}
+            first = by_id.setdefault(item_id, loc)
+            if first is not loc:
+                duplicates.setdefault(item_id, [first]).append(loc)
+    return by_id, duplicates
+
+def report_duplicates(duplicates: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Warn about ids shared across templates; same-template repeats (e.g. shared header items) are only counted."""
+    cross = {k: v for k, v in duplicates.items() if len({loc["file"] for loc in v}) > 1}
+    for item_id, locs in sorted(cross.items()):
+        where = ", ".join(f"{loc['mode']}/{loc['section']}/{loc['panel'] or '-'}" for loc in locs)
+        print(f"  ⚠️  id '{item_id}' is defined in more than one template: {where}")
+    local = len(duplicates) - len(cross)
+    if local:
+        print(f"  id index: {local} id(s) repeated within a template (first location wins)")
+
+# =======================
+# Stat-keyed cache
+# =======================
+
+def load_cache(path: Path) -> Dict[str, Any]:
+    """{"entries": {path: entry}, "bundle": last bundle record or None}."""
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        raw = None
+    if not isinstance(raw, dict) or raw.get("version") != CACHE_VERSION:
+        return {"entries": {}, "bundle": None}
+    entries = raw.get("entries")
+    return {"entries": entries if isinstance(entries, dict) else {}, "bundle": raw.get("bundle")}
+
+def save_cache(path: Path, entries: Dict[str, Dict[str, Any]], bundle: Dict[str, Any] | None = None) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": entries, "bundle": bundle}, f, ensure_ascii=False)
+        tmp.replace(path)
+    except OSError as e:
+        print(f"  ⚠️  Could not write cache {path}: {e}")
+
+def stat_key(st: os.stat_result) -> Dict[str, int]:
+    return {"size": st.st_size, "mtimeNs": st.st_mtime_ns}
+
+def cached_summary(entry: Dict[str, Any] | None, st: os.stat_result) -> Dict[str, Any] | None:
+    """The cached summary if size and mtime still match and the entry is not racy."""
+    if not entry or entry.get("stat") != stat_key(st):
+        return None
+    if entry.get("cachedAtNs", 0) - st.st_mtime_ns < RACY_WINDOW_NS:
+        return None
+    return entry.get("summary")
+
+# =======================
+# Hashed copies + bundle
+# =======================
+
+def sri_integrity(hexdigest: str) -> str:
+    """Subresource Integrity value (usable as fetch(url, {integrity})) for a sha256 hex digest."""
+    return "sha256-" + base64.b64encode(bytes.fromhex(hexdigest)).decode("ascii")
+
+def write_if_absent(dest: Path, payload: bytes) -> bool:
+    """Content-addressed write: an existing file with this name already has these bytes."""
+    if dest.exists():
+        return False
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.write_bytes(payload)
+    tmp.replace(dest)
+    return True
+
+def write_if_changed(dest: Path, payload: bytes) -> bool:
+    try:
+        if dest.read_bytes() == payload:
+            return False
+    except OSError:
+        pass
+    tmp = dest.with_name(dest.name + ".tmp")
+    tmp.write_bytes(payload)
+    tmp.replace(dest)
+    return True
+
+def build_bundle(paths: List[Path], checksums: Dict[str, str], out_dir: Path) -> Dict[str, Any]:
+    """Minified {"version", "templates": {file name: template}} under a content-hashed name."""
+    templates: Dict[str, Any] = {}
+    for p in paths:
+        raw = p.read_bytes()
+        if hashlib.sha256(raw).hexdigest() != checksums[p.name]:
+            raise RuntimeError(f"{p.name} changed during the run; rerun (or use --verify)")
+        templates[p.name] = json.loads(raw.decode("utf-8"))
+    payload = json.dumps(
+        {"version": MANIFEST_VERSION, "templates": templates}, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+    digest = hashlib.sha256(payload).hexdigest()
+    name = f"templates.{digest[:HASH_LEN]}.json"
+    write_if_absent(out_dir / name, payload)
+    return {"file": name, "sha256": digest, "integrity": sri_integrity(digest), "bytes": len(payload)}
+
+def emit_bundle(paths: List[Path], checksums: Dict[str, str], previous: Dict[str, Any] | None) -> Dict[str, Any]:
+    """Write the bundle and the writer manifest into BUNDLE_DIR; returns the bundle record.
+
+    The bundle is only rebuilt (which means parsing every template) when some
+    input checksum changed since `previous`. Files from older builds are pruned.
+    """
+    BUNDLE_DIR.mkdir(parents=True, exist_ok=True)
+    if previous and previous.get("inputs") == checksums and (BUNDLE_DIR / previous.get("file", "")).is_file():
+        bundle = previous
+        print(f"  bundle unchanged: {bundle['file']}")
+    else:
+        bundle = {**build_bundle(paths, checksums, BUNDLE_DIR), "inputs": dict(checksums)}
+        print(f"  bundle written: {bundle['file']} ({bundle['bytes']} bytes)")
+
+    public = {k: v for k, v in bundle.items() if k != "inputs"}
+    writer_manifest = {"version": MANIFEST_VERSION, "bundle": public}
+    write_if_changed(
+        BUNDLE_DIR / BUNDLE_MANIFEST_NAME,
+        (json.dumps(writer_manifest, indent=2, ensure_ascii=False) + "\n").encode("utf-8"),
+    )
+
+    keep = {BUNDLE_MANIFEST_NAME, bundle["file"]}
+    for old in BUNDLE_DIR.glob("*.json"):
+        if old.name not in keep:
+            old.unlink()
+    return bundle
+
+def bundle_relpath(name: str) -> str:
+    """Path of a BUNDLE_DIR file relative to PROJECT_DIR, as referenced from tabs.json."""
+    return Path(os.path.relpath(BUNDLE_DIR / name, PROJECT_DIR)).as_posix()
+
 # =======================
 # Main
 # =======================
 
 def main():
+    verify = "--verify" in sys.argv
+
     # ? Collect templates
     templates: List[Path] = sorted(
         p for p in PROJECT_DIR.iterdir()
@@ -156,16 +361,35 @@ def main():
     all_modes: List[str] = []
     all_chip_ids: List[str] = []
     per_mode_counts: Dict[str, Dict[str, int]] = {}
+    id_sources: List[Tuple[str, str, List[List[Any]]]] = []
+
+    cache_raw = load_cache(CACHE_PATH)
+    cache = cache_raw["entries"]
+    new_cache: Dict[str, Dict[str, Any]] = {}
+    cache_hits = 0
+    stale: List[str] = []
+    checksums: Dict[str, str] = {}
 
     for tpath in templates:
         print(f"…processing {tpath.name}")
-        try:
-            data = read_template(tpath)
-        except Exception as e:
-            print(f"  ⛔ JSON load failed for {tpath.name}: {e}")
-            continue
-
-        modes_raw = safe_get(data, "modes", [])
+        st = tpath.stat()
+        entry = cache.get(str(tpath))
+        summary = None if verify else cached_summary(entry, st)
+        if summary is not None:
+            cache_hits += 1
+        else:
+            try:
+                data = read_template(tpath)
+            except Exception as e:
+                print(f"  ⛔ JSON load failed for {tpath.name}: {e}")
+                continue
+            summary = summarize_template(tpath, data)
+            # $ --verify: a stat-matching entry with different content means the cache lied
+            if verify and entry and entry.get("stat") == stat_key(st) and entry.get("summary") != summary:
+                stale.append(tpath.name)
+        new_cache[str(tpath)] = {"stat": stat_key(st), "cachedAtNs": time.time_ns(), "summary": summary}
+
+        modes_raw = summary["modesRaw"]
         modes = normalize_modes(modes_raw)
         print(f"  modes raw: {modes_raw} (type={type(modes_raw).__name__}) -> normalized: {modes}")
 
@@ -178,20 +402,33 @@ def main():
         key = str(modes[0]).strip().upper()
         label = key  # Keep 1:1 for now (runtime can friendly-case later)
 
-        checksum = sha256_file(tpath)
-        title = safe_get(data, "title", None)
+        checksum = summary["checksum"]
+        title = summary["title"]
 
-        section_count, panel_count, chip_count, chip_ids = count_structure(data)
-        has_defaults = detect_defaults(data)
+        section_count = summary["sectionCount"]
+        panel_count = summary["panelCount"]
+        chip_count = summary["chipCount"]
+        checkbox_count = summary["checkboxCount"]
+        header_item_count = summary["headerItemCount"]
+        field_count = summary["fieldCount"]
+        chip_ids = summary["chipIds"]
+        has_defaults = summary["hasDefaults"]
 
         # Track global indices
         all_modes.append(key)
         all_chip_ids.extend(chip_ids)
-        per_mode_counts.setdefault(key, {"sections": 0, "panels": 0, "chips": 0})
-        per_mode_counts[key]["sections"] += section_count
-        per_mode_counts[key]["panels"] += panel_count
-        per_mode_counts[key]["chips"] += chip_count
-
+        id_sources.append((key, tpath.name, summary["ids"]))
+        mode_counts = per_mode_counts.setdefault(
+            key, {"sections": 0, "panels": 0, "chips": 0, "checkboxes": 0, "headerItems": 0, "fields": 0}
+        )
+        mode_counts["sections"] += section_count
+        mode_counts["panels"] += panel_count
+        mode_counts["chips"] += chip_count
+        mode_counts["checkboxes"] += checkbox_count
+        mode_counts["headerItems"] += header_item_count
+        mode_counts["fields"] += field_count
+
+        checksums[tpath.name] = checksum
         tabs.append({
             "key": key,
             "label": label,
@@ -203,9 +440,25 @@ def main():
             "sectionCount": section_count,
             "panelCount": panel_count,
             "chipCount": chip_count,
+            "checkboxCount": checkbox_count,
+            "headerItemCount": header_item_count,
+            "fieldCount": field_count,
             "hasDefaults": bool(has_defaults),
         })
 
+    bundle = None
+    if EMIT_BUNDLE and tabs:
+        bundled = [p for p in templates if p.name in checksums]
+        bundle = emit_bundle(bundled, checksums, None if verify else cache_raw["bundle"])
+
+    save_cache(CACHE_PATH, new_cache, bundle)
+    if verify:
+        if stale:
+            print(f"  ⚠️  --verify: {len(stale)} stale cache entr{'y' if len(stale) == 1 else 'ies'}: {', '.join(stale)}")
+        else:
+            print(f"  --verify: rehashed {len(new_cache)} template(s); cache was consistent")
+    print(f"  cache: {cache_hits}/{len(templates)} hit(s) ({CACHE_PATH.name})")
+
     if not tabs:
         print("⚠️  No valid templates after parsing.")
         return
@@ -220,6 +473,12 @@ def main():
     # Mark the first as default
     tabs[0]["default"] = True
 
+    # $ id -> first (mode, section, panel) across templates, in tab order
+    tab_order = {t["file"]: i for i, t in enumerate(tabs)}
+    id_sources.sort(key=lambda src: tab_order[src[1]])
+    by_id, duplicate_ids = build_id_index(id_sources)
+    report_duplicates(duplicate_ids)
+
     # Build manifest
     generated_at = datetime.now(timezone.utc).isoformat()
     manifest: Dict[str, Any] = {
@@ -235,11 +494,19 @@ def main():
             "modes": [t["key"] for t in tabs],
             "byMode": per_mode_counts,
             "allChipIds": sorted(set(all_chip_ids)),
+            "byId": by_id,
+            "duplicateIds": duplicate_ids,
         },
         "settings": {
             "columns": DEFAULT_COLUMNS
         }
     }
+    if bundle:
+        manifest["bundle"] = {
+            "file": bundle_relpath(bundle["file"]),
+            "integrity": bundle["integrity"],
+            "bytes": bundle["bytes"],
+        }
 
     OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
     with OUTPUT_PATH.open("w", encoding="utf-8") as f:
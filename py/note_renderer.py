@@ -0,0 +1,753 @@
+#!/usr/bin/env python3
+# note_renderer.py — headless batch renderer for NoteWriter complete notes
+#
+# Loads v1_writer/templates/template_*.json once, compiles every section into
+# lookup tables (header items, per-panel checkbox/chip lists, id -> def with
+# output text precomputed), and renders the same text the writer puts in the
+# Complete Note box (renderCompleteNote / buildSectionLines in v1_writer/js/app.js)
+# from a saved patient state: the JSON the writer autosaves per patient,
+#   {"mode", "activeSection", "sections": {"PE:General": {...}}, "globals": {...}}
+#
+# Usage:
+#   python3 note_renderer.py state.json                       # note to stdout
+#   python3 note_renderer.py states/ --out notes/ [--workers N] [--chunksize N]
+#     (notes/ mirrors the subdirectories under states/; two inputs that map to the same note are an error)
+#   python3 note_renderer.py --bench 5000 [--workers N]       # synthetic states, throughput only
+# Parity with the browser: tests/smoke/notewriter_batch_render.spec.js
+
+from __future__ import annotations
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from cli_util import take_option
+from make_tab_manifest import read_template
+
+# =======================
+# ! Configuration (edit)
+# =======================
+# $ Repo checkout (this file lives in <repo>/py/)
+REPO_DIR = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = REPO_DIR / "v1_writer" / "templates"
+
+# $ Writer mode ids in Complete Note order (Object.keys(MODE_FILES) in js/app.js) -> template file
+MODE_FILES = {
+    "subjective": "template_subjective.json",
+    "ROS": "template_ROS.json",
+    "PE": "template_pe.json",
+    "MSE": "template_MSE.json",
+}
+SECTION_HEADS = {"subjective": "Subjective", "ROS": "ROS", "PE": "Physical Exam", "MSE": "MSE"}
+
+# $ Batch defaults
+DEFAULT_WORKERS = 0      # 0 = one per core
+DEFAULT_CHUNKSIZE = 64   # state files per task sent to a worker
+IN_FLIGHT_PER_WORKER = 2  # bounded submission window so huge directories stream
+
+# ? Mirrors of js/app.js constants used in note text
+GRADE_LABELS = {"pulses": ["0", "1+", "2+", "3+"], "s3s4": ["1", "2", "3", "4", "5", "6"], "edema": ["1+", "2+", "3+", "4+"]}
+SIDE_LABELS = {"R": "R", "L": "L", "B": "bilateral"}
+MULTILINE_FIELDS = {"pastMedical", "surgicalHx", "meds", "allergies", "social", "lmp", "familyHx"}
+MULTILINE_LABEL_PREFIXES = ("past medical", "surgical hx", "meds", "allergies", "social", "lmp", "family hx", "family history")
+
+# =======================
+# JS value semantics
+# =======================
+# The note text is built with JS template strings, `||` and truthiness; these keep
+# the Python output identical for odd saved states (missing labels, non-string values).
+
+UNDEFINED = type("Undefined", (), {"__repr__": lambda self: "undefined"})()
+_JS_WS = " \t\n\v\f\r\u00a0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"  # String.prototype.trim
+_WORD_END = r"(?![A-Za-z0-9_])"  # JS \b after a word character (ASCII word set)
+
+def js_get(obj: Any, key: str) -> Any:
+    return obj.get(key, UNDEFINED) if isinstance(obj, dict) else UNDEFINED
+
+def js_truthy(v: Any) -> bool:
+    if v is None or v is UNDEFINED or v is False:
+        return False
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return v == v and v != 0
+    if isinstance(v, str):
+        return v != ""
+    return True
+
+def js_or(*values: Any) -> Any:
+    for v in values:
+        if js_truthy(v):
+            return v
+    return values[-1]
+
+def js_str(v: Any) -> str:
+    if v is UNDEFINED:
+        return "undefined"
+    if v is None:
+        return "null"
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    if isinstance(v, list):
+        return ",".join("" if x is None or x is UNDEFINED else js_str(x) for x in v)
+    if isinstance(v, dict):
+        return "[object Object]"
+    return str(v)
+
+def js_trim(s: str) -> str:
+    return s.strip(_JS_WS)
+
+def js_entries(obj: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """Object.entries order: array-index keys ascending, then insertion order."""
+    def is_index(k: str) -> bool:
+        return k.isdigit() and k.isascii() and (k == "0" or not k.startswith("0")) and int(k) < 2**32 - 1
+    idx = sorted((k for k in obj if is_index(k)), key=int)
+    return [(k, obj[k]) for k in idx] + [(k, v) for k, v in obj.items() if not is_index(k)]
+
+def as_list(v: Any) -> List[Any]:
+    return v if isinstance(v, list) else []
+
+def bucket(sec: Any, name: str) -> Dict[str, Any]:
+    b = sec.get(name) if isinstance(sec, dict) else None
+    return b if isinstance(b, dict) else {}
+
+def is_pos(v: Any) -> bool:
+    return isinstance(v, dict) and v.get("state") == "pos"
+
+def is_neg(v: Any) -> bool:
+    return v == "neg" and isinstance(v, str)
+
+def js_strict_eq(a: Any, b: Any) -> bool:
+    num = (int, float)
+    if isinstance(a, num) and isinstance(b, num) and not isinstance(a, bool) and not isinstance(b, bool):
+        return a == b
+    if isinstance(a, (dict, list)) or isinstance(b, (dict, list)):
+        return a is b
+    return type(a) is type(b) and a == b
+
+# =======================
+# js/app.js text helpers
+# =======================
+
+def cap_first(s: str) -> str:
+    return s[:1].upper() + s[1:] if s else s
+
+def lc_first(s: str) -> str:
+    return s[:1].lower() + s[1:] if s else s
+
+def join_with_oxford(items: List[str], conj: str = "or") -> str:
+    if not items:
+        return ""
+    if len(items) == 1:
+        return items[0]
+    if len(items) == 2:
+        return f"{items[0]} {conj} {items[1]}"
+    return f"{', '.join(items[:-1])}, {conj} {items[-1]}"
+
+_NL_RE = re.compile(r"(^|\s)nl(\s|$)", re.I)
+
+def format_check_label(raw: Any) -> str:
+    """formatPECheckLabel: 'nl appearance' -> 'Normal appearance'."""
+    if not js_truthy(raw):
+        return ""
+    s = re.sub(r"^\+\s*", "", js_trim(js_str(raw)), count=1)
+    s = _NL_RE.sub(lambda m: f"{m.group(1)}Normal{m.group(2)}", s, count=1)
+    return cap_first(s)
+
+def is_multiline_field(field_id: Any, label: Any) -> bool:
+    if field_id in MULTILINE_FIELDS:
+        return True
+    name = ("" if not js_truthy(label) else js_str(label)).lower()
+    return name.startswith(MULTILINE_LABEL_PREFIXES)
+
+_BP_RE = re.compile(r"BP\s*(\(!\))?\s*([0-9]{2,3})\s*/\s*([0-9]{2,3})", re.I)
+_PULSE_RE = re.compile(r"Pulse\s*([0-9]{1,3})", re.I)
+_TEMP_RE = re.compile(r"Temp\s*([0-9.]+)\s*°?\s*F(?:\s*\(([^)]+)\))?", re.I)
+_RESP_RE = re.compile(r"Resp\s*([0-9]{1,3})", re.I)
+_SPO2_RE = re.compile(r"(?:SpO2|O2\s*Sat|Oxygen\s*Sat)\s*([0-9]{1,3})\s*%", re.I)
+_O2_RE = re.compile(r"(?<![A-Za-z0-9_])O2" + _WORD_END + r"\s*([0-9]{1,3})\s*%", re.I)
+_BMI_UNIT_RE = re.compile(r"BMI\s*([0-9.]+)\s*kg/m(?:2|²)", re.I)
+_BMI_RE = re.compile(r"BMI\s*([0-9.]+)", re.I)
+# JS: /\bOxygen sat \(O2\)\b/ -- the trailing \b after ")" requires a word character next
+_LEGACY_O2_RE = re.compile(r"(?<![A-Za-z0-9_])Oxygen sat \(O2\)(?=[A-Za-z0-9_])", re.I)
+_LEGACY_O2_DROP_RE = re.compile(r"\s*,?\s*(?<![A-Za-z0-9_])Oxygen sat \(O2\)(?=[A-Za-z0-9_])", re.I)
+
+def scrub_vital_signs(raw: str) -> Tuple[str, str] | None:
+    """scrubVitalSigns: pasted EHR vitals -> (line1, line2)."""
+    if not raw:
+        return None
+    s = raw
+    m = _BP_RE.search(s)
+    bp_bang, bp_sys, bp_dia = ("(!) " if m.group(1) else "", m.group(2), m.group(3)) if m else ("", "", "")
+    m = _PULSE_RE.search(s)
+    pulse = m.group(1) if m else ""
+    m = _TEMP_RE.search(s)
+    temp, site = (m.group(1), m.group(2) or "") if m else ("", "")
+    m = _RESP_RE.search(s)
+    resp = m.group(1) if m else ""
+    m = _SPO2_RE.search(s) or _O2_RE.search(s)
+    spo2 = m.group(1) if m else ""
+    m = _BMI_UNIT_RE.search(s) or _BMI_RE.search(s)
+    bmi = m.group(1) if m else ""
+
+    parts = []
+    if temp:
+        parts.append(f"Temp {temp} °F" + (f" ({site})" if site else ""))
+    if bp_sys and bp_dia:
+        parts.append(f"BP {bp_bang}{bp_sys}/{bp_dia}")
+    if pulse:
+        parts.append(f"HR {pulse}")
+    if resp:
+        parts.append(f"RR {resp}")
+    if spo2:
+        parts.append(f"SpO2 {spo2}%")
+    line1 = ", ".join(parts).replace(", HR", ",  HR", 1)
+    if _LEGACY_O2_RE.search(line1):
+        if spo2:
+            line1 = _LEGACY_O2_RE.sub(f"SpO2 {spo2}%", line1)
+        else:
+            line1 = _LEGACY_O2_DROP_RE.sub("", line1)
+            line1 = re.sub(r",\s*,", ", ", line1)
+            line1 = re.sub(r",\s*$", "", line1)
+    line2 = f"BMI: {bmi}" if bmi else ""
+    if not line1 and not line2:
+        return None
+    return line1, line2
+
+# =======================
+# Compiled templates
+# =======================
+
+class CompiledPanel:
+    """One panel's output inputs, resolved against its section's id -> def table."""
+
+    def __init__(self, pd: Dict[str, Any], section: "CompiledSection"):
+        self.title = js_get(pd, "title")
+        self.subjective_fields = section.mode == "subjective" and bool(as_list(pd.get("fields")))
+        subs = as_list(pd.get("subsections"))
+        cbs = as_list(pd.get("checkboxes")) + [c for ss in subs for c in as_list(js_get(ss, "checkboxes"))]
+        chips = as_list(pd.get("chips")) + [c for ss in subs for c in as_list(js_get(ss, "chips"))]
+        # (id, output label) in template order; labels come from the section-wide first match (findDef)
+        self.checkboxes = [(c.get("id"), format_check_label(section.label_for(c.get("id")))) for c in cbs]
+        self.chips = [(c.get("id"), section.neg_text(c.get("id"))) for c in chips]
+
+        if self.subjective_fields:
+            fields = as_list(pd.get("fields"))
+            self.fields_flat: List[Dict[str, Any]] = []
+            for f in fields:
+                top = as_list(js_get(f, "fields")) if js_get(f, "type") == "group" else [f]
+                for it in top:
+                    if not js_truthy(it):
+                        continue
+                    self.fields_flat.append(it)
+                    self.fields_flat.extend(as_list(js_get(it, "children")))
+            self.top_fields = fields
+            self.own_checks = [(c.get("id"), format_check_label(js_or(js_get(c, "label"), js_get(c, "id")))) for c in as_list(pd.get("checkboxes"))]
+            self.field_checks = [
+                (js_get(f, "label"), [(c.get("id"), format_check_label(js_or(js_get(c, "label"), js_get(c, "id")))) for c in js_get(f, "checkboxes")])
+                for f in fields
+                if isinstance(js_get(f, "checkboxes"), list) and js_get(f, "checkboxes")
+            ]
+
+class CompiledSection:
+    def __init__(self, mode: str, key: str, sdef: Dict[str, Any], tpl: Dict[str, Any]):
+        self.mode = mode
+        self.key = key
+        parts = key.split(":")
+        self.name = parts[1] if len(parts) > 1 else ""
+        self.state_key = f"{mode}:{self.name}"  # getFieldFor()'s key
+        self.is_subj_general = mode == "subjective" and re.search(r"(^|:)General$", key) is not None
+
+        # findDef(): first def with the id across headerItems, headerToggles, panels, subsections
+        self.defs: Dict[Any, Dict[str, Any]] = {}
+        pool = as_list(sdef.get("headerItems")) + as_list(sdef.get("headerToggles"))
+        for p in as_list(sdef.get("panels")):
+            pool += as_list(js_get(p, "checkboxes")) + as_list(js_get(p, "chips"))
+            for ss in as_list(js_get(p, "subsections")):
+                pool += as_list(js_get(ss, "checkboxes")) + as_list(js_get(ss, "chips"))
+        for d in pool:
+            if isinstance(d, dict):
+                self.defs.setdefault(d.get("id", UNDEFINED), d)
+
+        self.header_items = self._header_items(sdef, tpl)
+        self.panels = [CompiledPanel(pd, self) for pd in as_list(sdef.get("panels")) if isinstance(pd, dict)]
+        self.raw_panels = [pd for pd in as_list(sdef.get("panels")) if isinstance(pd, dict)]
+
+    def _header_items(self, sdef: Dict[str, Any], tpl: Dict[str, Any]) -> List[Dict[str, Any]]:
+        items = list(sdef["headerItems"]) if isinstance(sdef.get("headerItems"), list) else []
+        if not items and self.mode == "subjective":
+            general = tpl["sectionDefs"].get(f"{self.mode}:General")
+            if isinstance(general, dict) and as_list(general.get("headerItems")):
+                items = list(general["headerItems"])
+        if not items:
+            seen = set()
+            for sec_name in as_list(tpl["sectionsByMode"].get(self.mode)):
+                d = tpl["sectionDefs"].get(f"{self.mode}:{js_str(sec_name)}")
+                for h in as_list(js_get(d, "headerItems")):
+                    hid = js_get(h, "id")
+                    if js_truthy(h) and js_truthy(hid) and hid not in seen:
+                        seen.add(hid)
+                        items.append(h)
+        return items
+
+    def find_def(self, cid: Any) -> Dict[str, Any]:
+        return self.defs.get(cid) or {"label": cid}
+
+    def label_for(self, cid: Any) -> Any:
+        return js_or(js_get(self.find_def(cid), "label"), cid)
+
+    def neg_text(self, cid: Any) -> str:
+        """formatChipNegForOutput (static per id)."""
+        d = self.find_def(cid)
+        if js_truthy(js_get(d, "negText")):
+            return js_str(d["negText"])
+        label = js_trim(re.sub(r"^\+\s*", "", js_str(js_or(js_get(d, "label"), cid)), count=1))
+        label = lc_first(label)
+        return f"Denies {label}" if self.key.startswith("ROS:") else f"No {label}"
+
+    def pos_text(self, cid: Any, value: Any) -> str:
+        """formatChipForOutput: abnormal text plus side / grade / tags."""
+        d = self.find_def(cid)
+        obj = value if isinstance(value, dict) else {}
+        out = [re.sub(r"^\+\s*", "", js_str(js_or(js_get(d, "abnText"), js_get(d, "label"), cid)), count=1)]
+        side = obj.get("side")
+        if js_truthy(side):
+            out.insert(0, SIDE_LABELS.get(side, js_str(side)) if isinstance(side, str) else js_str(side))
+        grade = obj.get("grade")
+        grades = js_get(js_get(d, "mods"), "grades")
+        if isinstance(grade, (int, float)) and not isinstance(grade, bool) and js_truthy(grades):
+            labels = GRADE_LABELS.get(js_str(grades), [])  # JS property lookup stringifies the key
+            if float(grade).is_integer() and 0 <= grade < len(labels) and labels[int(grade)]:
+                out.append(labels[int(grade)])
+        tags = obj.get("tags")
+        if js_truthy(tags) and isinstance(tags, dict):
+            out.extend(tag for tag, on in js_entries(tags) if js_truthy(on))
+        return " ".join(out)
+
+class NoteEngine:
+    """All writer templates compiled once; render() is pure and cheap per state."""
+
+    def __init__(self, templates_dir: Path = TEMPLATES_DIR):
+        self.templates: Dict[str, Dict[str, Any] | None] = {}
+        self.sections: Dict[str, List[CompiledSection]] = {}
+        self.by_key: Dict[str, CompiledSection] = {}
+        for mode, name in MODE_FILES.items():
+            path = Path(templates_dir) / name
+            try:
+                tpl = read_template(path)
+            except (OSError, RuntimeError) as e:
+                print(f"  ⚠️  {name}: {e}; {mode} renders empty", file=sys.stderr)
+                tpl = None
+            if not (isinstance(tpl, dict) and tpl.get("sectionsByMode") and tpl.get("sectionDefs")):
+                tpl = None
+            self.templates[mode] = tpl
+            compiled = []
+            for sec_name in as_list(tpl["sectionsByMode"].get(mode)) if tpl else []:
+                key = f"{mode}:{js_str(sec_name)}"
+                sdef = tpl["sectionDefs"].get(key)
+                if isinstance(sdef, dict):
+                    compiled.append(CompiledSection(mode, key, sdef, tpl))
+                    self.by_key[key] = compiled[-1]
+                else:
+                    compiled.append(None)  # buildSectionLines() returns [] for a missing def
+            self.sections[mode] = compiled
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "modes": sum(1 for t in self.templates.values() if t),
+            "sections": len(self.by_key),
+            "ids": sum(len(s.defs) for s in self.by_key.values()),
+        }
+
+    # ---- buildSectionLines ----
+
+    def section_lines(self, cs: CompiledSection, state: Dict[str, Any], emitted_subj_header: bool) -> List[str]:
+        sections = state.get("sections") if isinstance(state.get("sections"), dict) else {}
+        sec = sections.get(cs.key)
+        if not js_truthy(sec):
+            sec = {"checkboxes": {}, "chips": {}, "fields": {}}
+        fields, checks, chips = bucket(sec, "fields"), bucket(sec, "checkboxes"), bucket(sec, "chips")
+        state_fields = bucket(sections.get(cs.state_key) or {}, "fields")
+        lines: List[str] = []
+
+        def visible(f: Any) -> bool:
+            show = js_get(f, "showIf")
+            if not js_truthy(show):
+                return True
+            dep = state_fields.get(js_get(show, "field"), UNDEFINED) if isinstance(js_get(show, "field"), str) else UNDEFINED
+            return js_strict_eq(dep, js_get(show, "equals"))
+
+        # Header items (text + checks)
+        if not (cs.is_subj_general and emitted_subj_header) and cs.header_items:
+            text_parts, check_parts, emitted_vitals = [], [], False
+            for h in cs.header_items:
+                hid = js_get(h, "id")
+                if not js_truthy(h) or not js_truthy(hid):
+                    continue
+                if js_get(h, "type") == "text":
+                    raw = fields.get(hid) if isinstance(hid, str) else None
+                    v = js_trim(raw) if isinstance(raw, str) else ""
+                    if hid == "vital_signs_text" and v:
+                        fmt = scrub_vital_signs(v)
+                        if fmt:
+                            if fmt[0]:
+                                lines.append(fmt[0])
+                                emitted_vitals = True
+                            if fmt[1]:
+                                lines.append(fmt[1])
+                        continue
+                    if v:
+                        text_parts.append(f"{js_str(js_or(js_get(h, 'label'), hid))}: {v}.")
+                elif isinstance(hid, str) and js_truthy(checks.get(hid)):
+                    check_parts.append(format_check_label(js_or(js_get(h, "label"), hid)))
+            lines.extend(text_parts)
+            if not emitted_vitals and check_parts:
+                lines.append(f"{cs.name}: {'. '.join(check_parts)}.")
+
+        acute = js_get(state.get("globals"), "subjAcute") is not False
+        for cp, pd in zip(cs.panels, cs.raw_panels):
+            if cp.subjective_fields:
+                if not acute and cp.title == "History of Present Illness":
+                    continue
+                panel_lines: List[str] = []
+                for f in cp.fields_flat:
+                    if not visible(f) or js_get(f, "type") == "boolean":
+                        continue
+                    fid = js_get(f, "id")
+                    raw = fields.get(fid) if isinstance(fid, str) else None
+                    v = js_trim(raw) if isinstance(raw, str) else ""
+                    if not v:
+                        continue
+                    label = js_str(js_get(f, "label"))
+                    if is_multiline_field(fid, js_get(f, "label")) and re.search(r"[\r\n]", v):
+                        parts = [p for p in (js_trim(x) for x in re.split(r"\r?\n", v)) if p]
+                        if parts:
+                            panel_lines.append(f"{label}: {parts[0]}.")
+                            panel_lines.extend(p + "." for p in parts[1:])
+                    else:
+                        panel_lines.append(f"{label}: {v}.")
+                if panel_lines:
+                    if cp.title == "History of Present Illness":
+                        lines.append("HPI:")
+                    lines.extend(panel_lines)
+                picked = [lab for cid, lab in cp.own_checks if isinstance(cid, str) and js_truthy(checks.get(cid))]
+                if picked:
+                    lines.append(f"{js_str(cp.title)}: {'. '.join(picked)}.")
+                for flabel, boxes in cp.field_checks:
+                    picked = [lab for cid, lab in boxes if isinstance(cid, str) and js_truthy(checks.get(cid))]
+                    if picked:
+                        lines.append(f"{js_str(flabel)}: {'. '.join(picked)}.")
+                continue
+
+            cb_parts = [lab for cid, lab in cp.checkboxes if isinstance(cid, str) and js_truthy(checks.get(cid))]
+            neg_parts = [neg for cid, neg in cp.chips if isinstance(cid, str) and is_neg(chips.get(cid))]
+            pos_parts = []
+            for cid, _ in cp.chips:
+                if isinstance(cid, str) and is_pos(chips.get(cid)):
+                    txt = cs.pos_text(cid, chips[cid])
+                    pos_parts.append(f'<span class="abn_out">{txt}</span>' if cs.mode == "ROS" else txt)
+
+            if pos_parts or neg_parts or cb_parts:
+                line = f"{js_str(cp.title)}: "
+                if pos_parts:
+                    line += "; ".join([cap_first(pos_parts[0])] + pos_parts[1:]) + "."
+                    line += " " if (neg_parts or cb_parts) else ""
+                if neg_parts or cb_parts:
+                    denies, nos = [], []
+                    for raw in neg_parts:
+                        t = js_trim(raw)
+                        if re.match(r"denies" + _WORD_END, t, re.I):
+                            denies.append(lc_first(re.sub(r"^denies\s+", "", t, count=1, flags=re.I)))
+                        elif re.match(r"no" + _WORD_END, t, re.I):
+                            nos.append(lc_first(re.sub(r"^no\s+", "", t, count=1, flags=re.I)))
+                        else:
+                            nos.append(lc_first(re.sub(r"^(denies|no)\s+", "", t, count=1, flags=re.I)))
+                    sentences = []
+                    if denies:
+                        sentences.append(f"Denies {join_with_oxford(denies, 'and')}.")
+                    if nos:
+                        sentences.append(f"No {join_with_oxford(nos, 'or')}.")
+                    if cb_parts:
+                        sentences.append(f"{'; '.join(cb_parts)}.")
+                    line += " ".join(sentences)
+                lines.append(line)
+
+        # Fallback: if subjective produced no lines, sweep all visible text fields
+        if cs.mode == "subjective" and not lines:
+            for pd in cs.raw_panels:
+                for f in as_list(pd.get("fields")):
+                    if not visible(f) or js_get(f, "type") == "boolean":
+                        continue
+                    fid = js_get(f, "id")
+                    raw = fields.get(fid) if isinstance(fid, str) else None
+                    v = js_trim(raw) if isinstance(raw, str) else ""
+                    if v:
+                        lines.append(f"{js_str(js_get(f, 'label'))}: {v}.")
+        return lines
+
+    # ---- renderCompleteNote ----
+
+    def subjective_header_lines(self, state: Dict[str, Any]) -> List[str]:
+        tpl = self.templates.get("subjective")
+        gen = tpl["sectionDefs"].get("subjective:General") if tpl else None
+        items = js_get(gen, "headerItems")
+        if not isinstance(items, list) or not items:
+            return []
+        sections = state.get("sections") if isinstance(state.get("sections"), dict) else {}
+        sec = sections.get("subjective:General") or {}
+        fields, checks = bucket(sec, "fields"), bucket(sec, "checkboxes")
+        out = []
+        for h in items:
+            hid = js_get(h, "id")
+            if not js_truthy(h) or not js_truthy(hid):
+                continue
+            if js_get(h, "type") == "text":
+                raw = fields.get(hid) if isinstance(hid, str) else None
+                v = js_trim(raw) if isinstance(raw, str) else ""
+                if v:
+                    out.append(f"{js_str(js_or(js_get(h, 'label'), hid))}: {v}.")
+            elif isinstance(hid, str) and js_truthy(checks.get(hid)):
+                out.append(format_check_label(js_or(js_get(h, "label"), hid)))
+        return out
+
+    def with_open_defaults(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """applyRosDefaultsIfAny(): opening a state saved in ROS mode marks unset default chips 'neg'."""
+        tpl = self.templates.get("ROS")
+        neg = as_list(js_get(js_get(tpl["sectionDefs"].get("ROS:General") if tpl else None, "defaults"), "negChips"))
+        if state.get("mode") != "ROS" or not neg:
+            return state
+        sections = dict(state["sections"]) if isinstance(state.get("sections"), dict) else {}
+        sec = sections.get("ROS:General")
+        sec = dict(sec) if isinstance(sec, dict) else {"checkboxes": {}, "chips": {}, "fields": {}}
+        chips = dict(bucket(sec, "chips"))
+        for cid in neg:
+            chips.setdefault(js_str(cid), "neg")
+        sec["chips"] = chips
+        sections["ROS:General"] = sec
+        return {**state, "sections": sections}
+
+    def render(self, state: Dict[str, Any]) -> str:
+        """Complete Note text for one saved patient state (the writer's #completeOut value)."""
+        if not isinstance(state, dict):
+            raise ValueError("patient state must be a JSON object")
+        state = self.with_open_defaults(state)
+        parts: List[str] = []
+        emitted = js_truthy(js_get(state.get("globals"), "_emittedSubjHeaderOnce"))
+        header = self.subjective_header_lines(state)
+        if header:
+            parts.append("\n".join(header))
+            parts.append("<br>")
+            emitted = True
+        for mode in MODE_FILES:
+            lines: List[str] = []
+            for cs in self.sections.get(mode, []):
+                if cs is not None:
+                    lines.extend(self.section_lines(cs, state, emitted))
+            txt = js_trim("\n".join(lines))
+            if txt:
+                if mode == "PE":
+                    parts.append("Objective:\n")
+                sep = "\n\n" if mode == "subjective" else "\n"
+                parts.append(f"{SECTION_HEADS.get(mode, mode)}:\n{txt}{sep}")
+        return js_trim("\n".join(parts))
+
+# =======================
+# Synthetic states (--bench)
+# =======================
+
+def random_state(engine: NoteEngine, rng: random.Random, density: float = 0.15) -> Dict[str, Any]:
+    """A plausible saved state touching a random subset of every section's controls."""
+    vitals = ["BP (!) 148/92 Pulse 76 Temp 98.6 °F (Oral) Resp 16 SpO2 98% BMI 27.1 kg/m²", "Pulse 110 O2 91%", "stable"]
+    texts = ["2 days", "worse at night", "sharp\nradiates to back", "  "]
+    sections: Dict[str, Any] = {}
+    for key, cs in engine.by_key.items():
+        sec: Dict[str, Any] = {"checkboxes": {}, "chips": {}, "fields": {}}
+        for h in cs.header_items:
+            hid = js_get(h, "id")
+            if isinstance(hid, str) and rng.random() < density * 2:
+                if js_get(h, "type") == "text":
+                    sec["fields"][hid] = rng.choice(vitals if hid == "vital_signs_text" else texts)
+                else:
+                    sec["checkboxes"][hid] = True
+        for cp in cs.panels:
+            for cid, _ in cp.checkboxes:
+                if isinstance(cid, str) and rng.random() < density:
+                    sec["checkboxes"][cid] = rng.random() < 0.9
+            for cid, _ in cp.chips:
+                if not isinstance(cid, str) or rng.random() > density:
+                    continue
+                if rng.random() < 0.5:
+                    sec["chips"][cid] = "neg"
+                    continue
+                val: Dict[str, Any] = {"state": "pos"}
+                mods = js_get(cs.find_def(cid), "mods")
+                if rng.random() < 0.3:
+                    val["side"] = rng.choice("RLB")
+                if isinstance(mods, dict) and mods.get("grades") and rng.random() < 0.5:
+                    val["grade"] = rng.randrange(4)
+                if isinstance(mods, dict) and mods.get("tags"):
+                    val["tags"] = {t: rng.random() < 0.5 for t in mods["tags"]}
+                sec["chips"][cid] = val
+            if cp.subjective_fields:
+                for f in cp.fields_flat:
+                    fid = js_get(f, "id")
+                    if isinstance(fid, str) and rng.random() < density * 3:
+                        sec["fields"][fid] = rng.random() < 0.5 if js_get(f, "type") == "boolean" else rng.choice(texts)
+                for cid, _ in cp.own_checks + [c for _, boxes in cp.field_checks for c in boxes]:
+                    if isinstance(cid, str) and rng.random() < density:
+                        sec["checkboxes"][cid] = True
+        sections[key] = sec
+    mode = rng.choice(list(MODE_FILES))
+    return {"mode": mode, "activeSection": "General", "sections": sections, "globals": {"subjAcute": rng.random() < 0.8}}
+
+# =======================
+# Batch pipeline
+# =======================
+
+_ENGINE: NoteEngine | None = None
+
+def _init_worker(templates_dir: str) -> None:
+    global _ENGINE
+    _ENGINE = NoteEngine(Path(templates_dir))
+
+def _render_batch(batch: List[Tuple[str, str]], out_dir: str | None) -> List[Tuple[str, str | None, str | None, float, int]]:
+    """(path, note or None when written to out_dir, error, seconds, input bytes) per (state file, output name)."""
+    results = []
+    for p, out_name in batch:
+        t0 = time.perf_counter()
+        try:
+            raw = Path(p).read_bytes()
+            note = _ENGINE.render(json.loads(raw))
+            if out_dir:
+                dest = Path(out_dir) / out_name
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                dest.write_text(note + "\n", encoding="utf-8")
+                note = None
+            results.append((p, note, None, time.perf_counter() - t0, len(raw)))
+        except Exception as e:  # one malformed state is that file's error, not the batch's
+            results.append((p, None, f"{type(e).__name__}: {e}", time.perf_counter() - t0, 0))
+    return results
+
+def iter_state_paths(inputs: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """(state file, output name under --out): files found in a directory keep their path below it."""
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            for dirpath, dirnames, names in os.walk(p):
+                dirnames.sort()
+                for n in sorted(names):
+                    if n.endswith(".json") and not n.startswith("."):
+                        path = os.path.join(dirpath, n)
+                        yield path, str(Path(os.path.relpath(path, p)).with_suffix(".txt"))
+        else:
+            yield str(p), p.stem + ".txt"
+
+def unique_outputs(jobs: Iterable[Tuple[str, str]], clashes: List[str]) -> Iterator[Tuple[str, str]]:
+    """Drop (and record in clashes) inputs whose output name another input already claimed,
+    e.g. a/p1.json and b/p1.json given as separate file arguments."""
+    claimed: Dict[str, str] = {}
+    for path, out_name in jobs:
+        first = claimed.setdefault(os.path.normcase(out_name), path)
+        if first == path:
+            yield path, out_name
+        else:
+            clashes.append(f"{path}: output {out_name} already written for {first}")
+
+def _chunks(it: Iterator[Tuple[str, str]], size: int) -> Iterator[List[Tuple[str, str]]]:
+    batch: List[Tuple[str, str]] = []
+    for x in it:
+        batch.append(x)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def render_stream(
+    paths: Iterable[Tuple[str, str]], out_dir: Path | None, workers: int = DEFAULT_WORKERS, chunksize: int = DEFAULT_CHUNKSIZE
+) -> Iterator[Tuple[str, str | None, str | None, float, int]]:
+    """Render (state file, output name) pairs through a process pool with a bounded window; yields per-file results as they finish."""
+    workers = workers or os.cpu_count() or 1
+    out = str(out_dir) if out_dir else None
+    batches = _chunks(iter(paths), max(1, chunksize))
+    if workers == 1:
+        _init_worker(str(TEMPLATES_DIR))
+        for batch in batches:
+            yield from _render_batch(batch, out)
+        return
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(str(TEMPLATES_DIR),)) as pool:
+        pending = set()
+        for batch in batches:
+            pending.add(pool.submit(_render_batch, batch, out))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield from fut.result()
+        for fut in pending:
+            yield from fut.result()
+
+def report(count: int, errors: List[str], wall: float, per_file: List[float], in_bytes: int, workers: int) -> None:
+    print(f"Rendered {count - len(errors)}/{count} state file(s) with {workers} worker(s) in {wall:.2f}s", file=sys.stderr)
+    if count and wall > 0:
+        print(f"  throughput: {count / wall:,.0f} notes/s, {in_bytes / wall / 1e6:.1f} MB/s of state JSON", file=sys.stderr)
+    if per_file:
+        q = statistics.quantiles(per_file, n=20, method="inclusive") if len(per_file) > 1 else per_file * 19
+        print(f"  per file: p50 {q[9] * 1000:.2f} ms, p95 {q[18] * 1000:.2f} ms, max {max(per_file) * 1000:.2f} ms", file=sys.stderr)
+    for e in errors[:20]:
+        print(f"  ⛔ {e}", file=sys.stderr)
+    if len(errors) > 20:
+        print(f"  ... and {len(errors) - 20} more", file=sys.stderr)
+
+def main() -> int:
+    args = sys.argv[1:]
+    out_dir = take_option(args, "--out")
+    workers = int(take_option(args, "--workers") or DEFAULT_WORKERS) or os.cpu_count() or 1
+    chunksize = int(take_option(args, "--chunksize") or DEFAULT_CHUNKSIZE)
+    bench = take_option(args, "--bench")
+
+    if bench is not None:
+        engine = NoteEngine()
+        rng = random.Random(0)
+        tmp = tempfile.TemporaryDirectory(prefix="note_bench_")
+        for i in range(int(bench)):
+            (Path(tmp.name) / f"state_{i:06d}.json").write_text(json.dumps(random_state(engine, rng)), encoding="utf-8")
+        print(f"Synthetic states: {bench} in {tmp.name} ({engine.stats()})", file=sys.stderr)
+        if not out_dir:
+            out_tmp = tempfile.TemporaryDirectory(prefix="note_bench_out_")
+            out_dir = out_tmp.name
+        args = [tmp.name]
+
+    if not args:
+        print(__doc__ or "usage: note_renderer.py STATE.json|DIR ... [--out DIR] [--workers N] [--chunksize N] | --bench N")
+        return 2
+    if out_dir:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    count, in_bytes, per_file, errors = 0, 0, [], []
+    clashes: List[str] = []
+    jobs = iter_state_paths(args)
+    if out_dir:
+        jobs = unique_outputs(jobs, clashes)
+    for path, note, err, secs, size in render_stream(jobs, Path(out_dir) if out_dir else None, workers, chunksize):
+        count += 1
+        in_bytes += size
+        per_file.append(secs)
+        if err:
+            errors.append(f"{path}: {err}")
+        elif note is not None:
+            print(f"==> {path} <==\n{note}\n" if len(args) > 1 or Path(args[0]).is_dir() else note)
+    count += len(clashes)
+    errors.extend(clashes)
+    report(count, errors, time.perf_counter() - t0, per_file, in_bytes, workers)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# prerender_note_writer.py — static NoteWriter grid markup from the templates
+#
+# Mirrors renderGrid() in v1_writer/js/app.js for a section with no saved state
+# (every checkbox off, every chip neutral) and writes one <template> per section
+# into the mode's partial (HTML_PATH_MAP / derive_html_path, under WRITER_DIR).
+# The writer clones the fragment and only hydrates state; a section whose def
+# no longer matches data-def-hash is rendered by JS as before.
+#
+# Usage: python3 prerender_note_writer.py [--check]   (--check: exit 1 if a partial is stale)
+# Parity with the JS renderer: tests/smoke/notewriter_prerender.spec.js
+
+from __future__ import annotations
+import html
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from make_tab_manifest import derive_html_path, infer_mode_from_filename, normalize_modes, read_template, sha256_file
+
+# =======================
+# ! Configuration (edit)
+# =======================
+# $ Repo checkout (this file lives in <repo>/py/)
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# $ Templates to prerender and the writer root the partial paths are relative to
+TEMPLATES_DIR = REPO_DIR / "v1_writer" / "templates"
+WRITER_DIR = REPO_DIR / "v1_writer"
+
+# $ Modes whose grid depends on saved state (acute toggle, HPI split, showIf fields)
+# ? These stay runtime-rendered; no partial is written for them
+RUNTIME_ONLY_MODES = {"SUBJECTIVE"}
+
+# =======================
+# Markup helpers
+# =======================
+
+class Unsupported(Exception):
+    """Section uses a construct that is only rendered at runtime."""
+
+def esc_text(s: Any) -> str:
+    return html.escape("" if s is None else str(s), quote=False)
+
+def esc_attr(s: Any) -> str:
+    return html.escape("" if s is None else str(s), quote=True).replace("&#x27;", "'")
+
+def el(tag: str, attrs: Dict[str, Any] | None = None, *children: str) -> str:
+    attr = "".join(f' {k}="{esc_attr(v)}"' for k, v in (attrs or {}).items())
+    return f"<{tag}{attr}>{''.join(children)}</{tag}>"
+
+def def_hash(section_def: Any) -> str:
+    """FNV-1a over the UTF-16 code units of JSON.stringify(def); js/app.js computes the same."""
+    text = json.dumps(section_def, ensure_ascii=False, separators=(",", ":"))
+    data = text.encode("utf-16-le")
+    h = 0x811C9DC5
+    for i in range(0, len(data), 2):
+        h ^= data[i] | (data[i + 1] << 8)
+        h = (h * 0x01000193) & 0xFFFFFFFF
+    return f"{h:08x}"
+
+# =======================
+# renderGrid() mirror
+# =======================
+
+class GridRenderer:
+    """One mode's renderGrid() output with empty section state."""
+
+    def __init__(self, mode: str):
+        self.mode = mode  # JS mode key, e.g. "PE" (the part before ':' in sectionDefs)
+
+    def row(self, extra: str = "") -> Dict[str, str]:
+        return {"class": f"row {self.mode}" + (f" {extra}" if extra else "")}
+
+    def panel(self, title: Any, *children: str) -> str:
+        return el("section", {"class": "panel"}, el("div", {"class": "panel-header"}, esc_text(title)), *children)
+
+    def subhead(self, title: Any, extra: str = "") -> str:
+        return el("div", {"class": "subhead" + (f" {extra}" if extra else "")}, esc_text(title))
+
+    def cb(self, c: Dict[str, Any]) -> str:
+        cls = "cb subjective" if self.mode == "subjective" else "cb"
+        return el("label", {"class": cls}, f'<input type="checkbox" data-cb-id="{esc_attr(c.get("id"))}">', esc_text(c.get("label")))
+
+    def chip(self, c: Dict[str, Any]) -> str:
+        return el(
+            "div",
+            {"data-chip-id": c.get("id"), "class": "chip", "data-state": "neutral", "title": "state: neutral"},
+            el("button", {"type": "button", "class": "aff plus"}, "+"),
+            el("span", {"class": "label"}, esc_text(c.get("label"))),
+            el("button", {"type": "button", "class": "aff minus"}, "–"),
+        )
+
+    def checkboxes_and_chips(self, def_like: Dict[str, Any]) -> str:
+        out = []
+        if def_like.get("checkboxes"):
+            out.append(el("div", self.row(), *(self.cb(c) for c in def_like["checkboxes"])))
+        if def_like.get("chips"):
+            cols = (def_like.get("layout") or {}).get("chipCols")
+            out.append(el("div", self.row(f"cols-{cols}" if cols else ""), *(self.chip(c) for c in def_like["chips"])))
+        return "".join(out)
+
+    def subpanel(self, ss: Dict[str, Any]) -> str:
+        return el("div", {"class": "subpanel"}, self.subhead(ss.get("title")), self.checkboxes_and_chips(ss))
+
+    def stacked(self, ss: Dict[str, Any]) -> str:
+        return self.subhead(ss.get("title")) + self.checkboxes_and_chips(ss)
+
+    def render_panel(self, pd: Dict[str, Any]) -> str:
+        if pd.get("type") == "matrix" or pd.get("fields"):
+            raise Unsupported("matrix/fields panels")
+        head = self.subhead(pd["groupLabel"]) if pd.get("groupLabel") else ""
+        subs: List[Dict[str, Any]] = pd.get("subsections") or []
+        layout = pd.get("layout") or {}
+        if not subs:
+            return self.panel(pd.get("title"), head, self.checkboxes_and_chips(pd))
+
+        body: List[str] = [head]
+        if layout.get("groups"):
+            rendered = set()
+            for g in layout["groups"]:
+                if g.get("label"):
+                    body.append(self.subhead(g["label"], "group-head"))
+                boxes = []
+                start, stop = g.get("from"), g.get("to")
+                if isinstance(start, int) and isinstance(stop, int):
+                    for i in range(start, min(stop + 1, len(subs))):
+                        rendered.add(i)
+                        boxes.append(self.subpanel(subs[i]))
+                body.append(el("div", {"class": f"subgrid cols-{g.get('cols') or 2}"}, *boxes))
+            body.extend(self.stacked(ss) for idx, ss in enumerate(subs) if idx not in rendered)
+        elif layout.get("gridCols") and isinstance(layout.get("gridUntilIndex"), int) and layout["gridUntilIndex"] >= 0:
+            cut = layout["gridUntilIndex"]
+            body.append(el("div", {"class": f"subgrid cols-{layout['gridCols']}"}, *(self.subpanel(ss) for ss in subs[: cut + 1])))
+            body.extend(self.stacked(ss) for ss in subs[cut + 1 :])
+        else:
+            body.extend(self.stacked(ss) for ss in subs)
+        return self.panel(pd.get("title"), *body)
+
+    def render_section(self, section_def: Dict[str, Any]) -> str:
+        out = []
+        if section_def.get("headerToggles"):
+            toggles = el("div", self.row(), *(self.cb(t) for t in section_def["headerToggles"]))
+            out.append(el("section", {"class": "panel options"}, el("div", {"class": "panel-header"}, "Options"), toggles))
+        for pd in section_def.get("panels") or []:
+            if pd.get("id") == "subj_header":
+                continue
+            out.append(self.render_panel(pd))
+        return "".join(out)
+
+# =======================
+# Partials
+# =======================
+
+def template_mode_key(path: Path, data: Dict[str, Any]) -> str:
+    """Same tab key make_tab_manifest.py derives (first 'modes' entry or the filename)."""
+    modes = normalize_modes(data.get("modes", []))
+    return modes[0] if modes else infer_mode_from_filename(path)
+
+def render_partial(path: Path) -> tuple[str, Path, List[str]] | None:
+    """(markup, destination, skipped section keys) for one template, or None for runtime-only modes."""
+    data = read_template(path)
+    key = template_mode_key(path, data)
+    if key in RUNTIME_ONLY_MODES:
+        return None
+
+    parts = [
+        f"<!-- Generated by py/prerender_note_writer.py from {path.name} "
+        f"(sha256 {sha256_file(path)[:12]}). Do not edit; rerun the script. -->"
+    ]
+    skipped: List[str] = []
+    for sec_key, section_def in (data.get("sectionDefs") or {}).items():
+        if ":" not in sec_key or not isinstance(section_def, dict):
+            continue  # e.g. "globals"
+        try:
+            markup = GridRenderer(sec_key.split(":", 1)[0]).render_section(section_def)
+        except Unsupported as e:
+            skipped.append(f"{sec_key} ({e})")
+            continue
+        parts.append(
+            f'<template data-section="{esc_attr(sec_key)}" data-def-hash="{def_hash(section_def)}">{markup}</template>'
+        )
+    return "\n".join(parts) + "\n", WRITER_DIR / derive_html_path(key), skipped
+
+def main() -> int:
+    check = "--check" in sys.argv
+    templates = sorted(TEMPLATES_DIR.glob("template_*.json"))
+    if not templates:
+        print(f"⚠️  No template_*.json files in {TEMPLATES_DIR}")
+        return 1
+
+    stale: List[str] = []
+    for tpath in templates:
+        result = render_partial(tpath)
+        if result is None:
+            print(f"…{tpath.name}: runtime-rendered mode, no partial")
+            continue
+        markup, dest, skipped = result
+        rel = dest.relative_to(WRITER_DIR)
+        for s in skipped:
+            print(f"  ⚠️  {tpath.name}: {s} left to the runtime renderer")
+        current = dest.read_text(encoding="utf-8") if dest.exists() else None
+        if current == markup:
+            print(f"…{tpath.name} -> {rel} (up to date)")
+        elif check:
+            stale.append(str(rel))
+            print(f"  ⛔ {rel} is stale for {tpath.name}")
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            dest.write_text(markup, encoding="utf-8")
+            print(f"✅ {tpath.name} -> {rel} ({len(markup)} bytes)")
+
+    if stale:
+        print(f"Stale partial(s): {', '.join(stale)}; rerun py/prerender_note_writer.py")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
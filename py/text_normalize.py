@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# text_normalize.py — shared text normalization for the generator scripts
+#
+# One function per rule set the scripts used to carry their own copy of; each
+# returns exactly what the copy it replaced returned. Patterns are compiled once
+# and the string-level work sits behind a bounded LRU memo (the same names,
+# classes and labels are normalized over and over). Arguments are coerced the
+# way the old copies did before they reach the memo.
+#
+#   pharm/scripts/*.py              clean_text, split_pipe, normalize_name (was normalize_text
+#                                   in build_class_subclasses.py), class_slug (its slugify)
+#   differentials/write_presentation.py   presentation_slug (its slugify), normalize_label,
+#                                   normalize_system_label, normalize_search, compact_key
+#   differentials/fill_clinical_todo_from_pdf.py   ascii_key (was norm_text), ascii_slug
+#                                   (its slugify), clean_heading_line
+#   differentials/etiology_index.py etiology_key (was normalize_etiology)
+#
+# normalize_column(rule, values) normalizes a whole column, computing each
+# distinct value once; memo_stats() reports hits/misses per rule.
+
+from __future__ import annotations
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# =======================
+# ! Configuration (edit)
+# =======================
+# $ Entries kept per rule; the pharm catalog has ~10k distinct names
+MEMO_SIZE = 1 << 16
+
+# =======================
+# Patterns
+# =======================
+_NON_ALNUM_RUN = re.compile(r"[^a-z0-9]+")
+_SPACE_RUN = re.compile(r"\s+")
+_DASH_RUN = re.compile(r"-+")
+_DASH_RUN_2 = re.compile(r"-{2,}")
+_SLUG_DROP = re.compile(r"[^a-z0-9\s-]")
+_LEADING_NUMBER = re.compile(r"^\d+\s+")
+_TRAILING_NUMBER = re.compile(r"\s+\d+$")
+
+# write_presentation.py label cleanup
+_BULLET = re.compile(r"^[•‣◦⁃∙\-•\s]+")
+_FIG_REF = re.compile(r"\((?:fig|figure|see)[:\s][^\)]*\)", re.IGNORECASE)
+_EG_TAIL = re.compile(r"\be\.g\.[^;,.]*", re.IGNORECASE)
+_TRAILING_PUNCT = re.compile(r"[\s,:;\-]+$")
+
+# Mirrors normalizeSystemLabel/normalizeSearch in differentials/differentials_app.js
+_SYSTEM_SEP = re.compile(r"[/_-]+")
+_WORD_START = re.compile(r"\b[a-z]", re.ASCII)
+_APOSTROPHE = re.compile(r"[’']")
+
+_MEMOS: Dict[str, Any] = {}
+
+def memoize(fn: Callable[[str], Any]) -> Callable[[str], Any]:
+    """Bounded LRU memo for a str -> value rule; registered for memo_stats()."""
+    cached = lru_cache(maxsize=MEMO_SIZE)(fn)
+    _MEMOS[fn.__name__.lstrip("_")] = cached
+    return cached
+
+def memo_stats() -> Dict[str, Tuple[int, int, int]]:
+    """rule -> (hits, misses, current size)."""
+    return {name: (c.cache_info().hits, c.cache_info().misses, c.cache_info().currsize) for name, c in _MEMOS.items()}
+
+def normalize_column(rule: Callable[[Any], str], values: Iterable[Any]) -> List[str]:
+    """[rule(v) for v in values], computing each distinct (hashable) value once. For str-valued rules."""
+    seen: Dict[Any, str] = {}
+    out: List[str] = []
+    for value in values:
+        try:
+            result = seen[value]
+        except KeyError:
+            result = seen[value] = rule(value)
+        except TypeError:  # unhashable
+            result = rule(value)
+        out.append(result)
+    return out
+
+# =======================
+# Pharm rules
+# =======================
+
+def clean_text(value: object) -> str:
+    return str(value or "").strip()
+
+@memoize
+def _split_pipe(raw: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in raw.split("|") if item.strip())
+
+def split_pipe(value: object) -> List[str]:
+    raw = clean_text(value)
+    if not raw:
+        return []
+    return list(_split_pipe(raw))
+
+@memoize
+def _normalize_name(text: str) -> str:
+    text = text.strip().lower().replace("&", " and ")
+    text = _NON_ALNUM_RUN.sub(" ", text)
+    return _SPACE_RUN.sub(" ", text).strip()
+
+def normalize_name(value: object) -> str:
+    """Lowercase words: '&' -> 'and', runs of anything else -> one space."""
+    return _normalize_name(str(value or ""))
+
+@memoize
+def _class_slug(text: str) -> str:
+    slug = _DASH_RUN.sub("-", _normalize_name(text).replace(" ", "-")).strip("-")
+    return slug or "class"
+
+def class_slug(value: object) -> str:
+    return _class_slug(str(value or ""))
+
+# =======================
+# Differentials rules
+# =======================
+
+@memoize
+def presentation_slug(name: str) -> str:
+    s = _SLUG_DROP.sub("", name.lower())
+    s = s.strip().replace(" ", "-")
+    return _DASH_RUN.sub("-", s)
+
+@memoize
+def normalize_label(s: str) -> str:
+    s = _BULLET.sub("", s.strip())
+    s = _FIG_REF.sub("", s)
+    s = _EG_TAIL.sub("", s)
+    s = _TRAILING_PUNCT.sub("", s)
+    return s.strip()
+
+@memoize
+def _normalize_system_label(text: str) -> str:
+    clean = _SPACE_RUN.sub(" ", _SYSTEM_SEP.sub(" ", text)).strip()
+    if not clean:
+        return ""
+    return _WORD_START.sub(lambda m: m.group(0).upper(), clean.lower())
+
+def normalize_system_label(system: Any) -> str:
+    return _normalize_system_label(str(system or ""))
+
+@memoize
+def _normalize_search(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not ("\u0300" <= ch <= "\u036f"))
+    return _APOSTROPHE.sub("", text).lower()
+
+def normalize_search(text: Any) -> str:
+    return _normalize_search(str(text or ""))
+
+@memoize
+def compact_key(text: str) -> str:
+    """Lowercase alphanumerics only, no accent folding ('Chest pain' -> 'chestpain')."""
+    return _NON_ALNUM_RUN.sub("", text.lower())
+
+def _ascii_fold(value: str) -> str:
+    return unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode("ascii")
+
+@memoize
+def ascii_key(value: str) -> str:
+    """compact_key after folding accents to ASCII ('Café' -> 'cafe', not 'caf')."""
+    return _NON_ALNUM_RUN.sub("", _ascii_fold(value).lower())
+
+@memoize
+def ascii_slug(value: str) -> str:
+    value = _NON_ALNUM_RUN.sub("-", _ascii_fold(value).lower().strip()).strip("-")
+    return _DASH_RUN_2.sub("-", value)
+
+@memoize
+def _etiology_key(text: str) -> str:
+    return _NON_ALNUM_RUN.sub(" ", _ascii_fold(text).lower()).strip()
+
+def etiology_key(name: Any) -> str:
+    """Words of ascii_key kept apart: "Pancreatitis (acute)" -> "pancreatitis acute".
+    Mirrored by normalizeEtiology in differentials/differentials_app.js."""
+    return _etiology_key(str(name or ""))
+
+@memoize
+def clean_heading_line(line: str) -> str:
+    line = _LEADING_NUMBER.sub("", line.strip())
+    line = _TRAILING_NUMBER.sub("", line)
+    return line.strip(" -\t")
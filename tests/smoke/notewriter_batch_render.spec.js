@@ -0,0 +1,55 @@
+const { test, expect } = require("@playwright/test");
+const { execFileSync } = require("child_process");
+const fs = require("fs");
+const path = require("path");
+
+// ================================================================
+// Configurable values (change here)
+// ================================================================
+const WRITER_PATH = "/v1_writer/writer.html";
+const REPO_DIR = path.resolve(__dirname, "../..");
+const APP_JS = path.join(REPO_DIR, "v1_writer/js/app.js");
+const RENDERER = path.join(REPO_DIR, "py/note_renderer.py");
+// Each saved state exercises different note paths: the mixed PE state, vitals scrubbing with
+// chip side/grade/tags, showIf-gated HPI fields, a non-acute visit, and ROS default negatives
+const STATE_FIXTURES = [
+  "notewriter_state_fixture.json",
+  "notewriter_state_pe_vitals_mods_fixture.json",
+  "notewriter_state_subjective_showif_fixture.json",
+  "notewriter_state_subjective_nonacute_fixture.json",
+  "notewriter_state_ros_defaults_fixture.json",
+].map((name) => path.join(REPO_DIR, "tests/fixtures", name));
+const PATIENT_ID = "batch-render-parity";
+const COMPLETE_NOTE = "#completeOut";
+
+function appVersion() {
+  const m = fs.readFileSync(APP_JS, "utf8").match(/const APP_VERSION = "([^"]+)"/);
+  if (!m) throw new Error("APP_VERSION not found in js/app.js");
+  return m[1];
+}
+
+test.describe("NoteWriter batch renderer", () => {
+  for (const fixture of STATE_FIXTURES) {
+    test(`py/note_renderer.py matches the Complete Note box for ${path.basename(fixture)}`, async ({ page }) => {
+      const version = appVersion();
+      const saved = fs.readFileSync(fixture, "utf8");
+      await page.addInitScript(
+        ({ version, id, saved }) => {
+          localStorage.setItem(`ct.patients.${version}`, JSON.stringify([{ id, createdAt: 0 }]));
+          localStorage.setItem(`ct.patient.current.${version}`, id);
+          localStorage.setItem(`ct.state.${version}:${id}`, saved);
+        },
+        { version, id: PATIENT_ID, saved },
+      );
+
+      const expected = execFileSync("python3", [RENDERER, fixture], { cwd: REPO_DIR, encoding: "utf8" });
+      expect(expected.trim().length).toBeGreaterThan(0);
+
+      await page.goto(WRITER_PATH);
+      const box = page.locator(COMPLETE_NOTE);
+      await expect.poll(async () => (await box.inputValue()).length).toBeGreaterThan(0);
+      // The renderer prints the note followed by a newline
+      await expect.poll(async () => (await box.inputValue()) + "\n").toBe(expected);
+    });
+  }
+});
@@ -0,0 +1,81 @@
+const { test, expect } = require("@playwright/test");
+
+// ================================================================
+// Configurable values (change here)
+// ================================================================
+const WRITER_PATH = "/v1_writer/writer.html";
+const RUNTIME_ONLY_QUERY = "?prerender=0";
+const GRID = "#grid";
+const TIER1_TABS = "#tier1 .tab";
+const TIER2_TABS = "#tier2 .tab";
+// Tier 1 labels of the modes with a note_writer/*.html partial (MODE_PARTIALS in js/app.js)
+const PRERENDERED_MODE_LABELS = ["ROS", "Physical Exam", "MSE"];
+
+async function openMode(page, label) {
+  await page.locator(TIER1_TABS, { hasText: label }).first().click();
+  await expect(page.locator(TIER1_TABS, { hasText: label }).first()).toHaveClass(/active/);
+  await expect.poll(async () => page.locator(`${GRID} .panel`).count()).toBeGreaterThan(0);
+}
+
+// { "Mode/Section": { html, prerendered } } for every section of the prerendered modes
+async function collectGrids(browser, query) {
+  const context = await browser.newContext();
+  const page = await context.newPage();
+  await page.goto(WRITER_PATH + query);
+  const grids = {};
+  const snapshot = async (key) => {
+    grids[key] = await page.locator(GRID).evaluate((el) => ({
+      html: el.innerHTML,
+      prerendered: el.dataset.prerendered === "1",
+    }));
+  };
+  for (const label of PRERENDERED_MODE_LABELS) {
+    await openMode(page, label);
+    const tabs = page.locator(TIER2_TABS);
+    const count = await tabs.count();
+    if (!count) {
+      await snapshot(label);
+      continue;
+    }
+    for (let i = 0; i < count; i++) {
+      await tabs.nth(i).click();
+      await expect(tabs.nth(i)).toHaveClass(/active/);
+      await snapshot(`${label}/${await tabs.nth(i).textContent()}`);
+    }
+  }
+  await context.close();
+  return grids;
+}
+
+test.describe("NoteWriter prerendered grids", () => {
+  test("prerendered partials produce the same markup as the runtime renderer", async ({ browser }) => {
+    const runtime = await collectGrids(browser, RUNTIME_ONLY_QUERY);
+    const prerendered = await collectGrids(browser, "");
+
+    expect(Object.keys(prerendered)).toEqual(Object.keys(runtime));
+    for (const [key, grid] of Object.entries(prerendered)) {
+      expect(runtime[key].prerendered, `${key} runtime`).toBe(false);
+      expect(grid.prerendered, `${key} used its partial (stale? rerun py/prerender_note_writer.py)`).toBe(true);
+      expect(grid.html, key).toBe(runtime[key].html);
+    }
+  });
+
+  test("hydrated grid keeps checkbox and chip state across re-renders", async ({ page }) => {
+    await page.goto(WRITER_PATH);
+    await openMode(page, "Physical Exam");
+    await expect(page.locator(GRID)).toHaveAttribute("data-prerendered", "1");
+
+    const box = page.locator(`${GRID} input[data-cb-id]`).first();
+    const boxId = await box.getAttribute("data-cb-id");
+    await box.check();
+    await expect(box.locator("xpath=..")).toHaveClass(/selected/);
+
+    const chipEl = page.locator(`${GRID} [data-chip-id]`).first();
+    const chipId = await chipEl.getAttribute("data-chip-id");
+    await chipEl.locator(".aff.plus").click();  // re-renders the grid from the partial
+
+    await expect(page.locator(GRID)).toHaveAttribute("data-prerendered", "1");
+    await expect(page.locator(`${GRID} [data-chip-id="${chipId}"]`).first()).toHaveAttribute("data-state", "critical");
+    await expect(page.locator(`${GRID} input[data-cb-id="${boxId}"]`).first()).toBeChecked();
+  });
+});
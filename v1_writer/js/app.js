@@ -46,6 +46,15 @@ const MODE_FILES = {
   MSE: "./templates/template_MSE.json",
 };
 
+// Prerendered grid partials (py/prerender_note_writer.py; paths follow HTML_PATH_MAP).
+// Modes without an entry are always rendered at runtime. Disable with ?prerender=0.
+const MODE_PARTIALS = {
+  ROS: "./note_writer/ROS.html",
+  PE:  "./note_writer/physical.html",
+  MSE: "./note_writer/MSE.html",
+};
+const PRERENDER_ENABLED = new URLSearchParams(location.search).get("prerender") !== "0";
+
 // Explicit order using IDs
 const MODE_LIST = ["subjective", "ROS", "PE", "MSE"];
 
@@ -133,10 +142,130 @@ function cacheClearAllForVersion() {
 }
 
 
+// ===== Content-hashed template bundle (py/make_tab_manifest.py -> templates/build/) =====
+// Only the small manifest is revalidated; the bundle name changes with its content,
+// so it is fetched once, integrity-checked, and cached without TTL or version bumps.
+const BUNDLE_MANIFEST_URL = "./templates/build/manifest.json";
+const BUNDLE_CACHE_PREFIX = "ct.bundle.";
+let _bundlePromise = null;
+
+async function fetchTemplateBundle(){
+  const r = await fetch(BUNDLE_MANIFEST_URL, { cache: "no-cache" });
+  if (!r.ok) throw new Error(`HTTP ${r.status} fetching ${BUNDLE_MANIFEST_URL}`);
+  const { bundle } = await r.json();
+  const key = BUNDLE_CACHE_PREFIX + bundle.sha256;
+  const cached = cacheGet(key);
+  if (cached) return cached;
+
+  const url = new URL(bundle.file, new URL(BUNDLE_MANIFEST_URL, location.href));
+  const b = await fetch(url, { integrity: bundle.integrity });
+  if (!b.ok) throw new Error(`HTTP ${b.status} fetching ${url}`);
+  const { templates } = await b.json();
+  try {
+    Object.keys(localStorage).forEach(k => {
+      if (k.startsWith(BUNDLE_CACHE_PREFIX) && k !== key) localStorage.removeItem(k);
+    });
+  } catch {}
+  cacheSet(key, templates, 0);
+  return templates;
+}
+// Resolves to {fileName: template} or null (no build yet / offline) -> per-file fallback.
+function templateBundle(){
+  return (_bundlePromise ??= fetchTemplateBundle().catch(e => {
+    console.debug("[NoteWriter] Template bundle unavailable:", e.message);
+    return null;
+  }));
+}
+
+// ===== Prerendered grids =====
+// mode -> Map("MODE:Section" -> <template>) once loaded; null when unavailable
+const Prerendered = {};
+const _defHashes = new WeakMap();
+
+async function loadPrerendered(mode){
+  if (!PRERENDER_ENABLED || !MODE_PARTIALS[mode] || mode in Prerendered) return;
+  Prerendered[mode] = null;
+  try {
+    const r = await fetch(MODE_PARTIALS[mode]);
+    if (!r.ok) throw new Error(`HTTP ${r.status}`);
+    const doc = new DOMParser().parseFromString(await r.text(), "text/html");
+    Prerendered[mode] = new Map(
+      [...doc.querySelectorAll("template[data-section]")].map(t => [t.dataset.section, t])
+    );
+  } catch (e) {
+    console.debug(`[NoteWriter] No prerendered grid for ${mode}:`, e.message);
+  }
+}
+
+// FNV-1a over JSON.stringify(def); must match def_hash() in py/prerender_note_writer.py
+function sectionDefHash(def){
+  let h = _defHashes.get(def);
+  if (h) return h;
+  const str = JSON.stringify(def);
+  let x = 0x811c9dc5;
+  for (let i = 0; i < str.length; i++) {
+    x ^= str.charCodeAt(i);
+    x = Math.imul(x, 0x01000193) >>> 0;
+  }
+  h = x.toString(16).padStart(8, "0");
+  _defHashes.set(def, h);
+  return h;
+}
+
+// Control defs by id for hydration; counts catch ids that appear more than once
+function collectControlDefs(def){
+  const chips = new Map(), boxes = new Map();
+  let chipCount = 0, boxCount = 0;
+  const take = (d) => {
+    (d?.checkboxes || []).forEach(c => { boxes.set(c.id, c); boxCount++; });
+    (d?.chips || []).forEach(c => { chips.set(c.id, c); chipCount++; });
+  };
+  (def.headerToggles || []).forEach(t => { boxes.set(t.id, t); boxCount++; });
+  (def.panels || []).forEach(pd => {
+    if (pd.id === 'subj_header') return;
+    if (pd.subsections?.length) pd.subsections.forEach(take);
+    else take(pd);
+  });
+  return { chips, boxes, chipCount, boxCount };
+}
+
+// Fill the grid from the prerendered fragment and attach state; false -> caller renders
+function hydratePrerenderedGrid(grid, def){
+  const key = `${state.mode}:${state.activeSection}`;
+  const tpl = Prerendered[state.mode]?.get(key);
+  if (!tpl || tpl.dataset.defHash !== sectionDefHash(def)) return false;
+
+  const frag = document.importNode(tpl.content, true);
+  const chipEls = frag.querySelectorAll("[data-chip-id]");
+  const boxEls = frag.querySelectorAll("input[data-cb-id]");
+  const defs = collectControlDefs(def);
+  if (chipEls.length !== defs.chipCount || boxEls.length !== defs.boxCount) return false;
+
+  const sec = getSec();
+  for (const i of boxEls) {
+    const id = i.dataset.cbId;
+    if (!defs.boxes.has(id)) return false;
+    wireCb(i.parentNode, i, !!sec.checkboxes?.[id], v => { setCB(id, v); renderOutput(); });
+  }
+  for (const el of chipEls) {
+    const cdef = defs.chips.get(el.dataset.chipId);
+    if (!cdef) return false;
+    wireChip(el, cdef, sec.chips?.[cdef.id] || 0, (evt) => handleChipMouse(evt, cdef.id));
+  }
+  grid.appendChild(frag);
+  grid.dataset.prerendered = "1";
+  return true;
+}
+
 async function loadTemplatesForMode(mode){
   const file = MODE_FILES[mode];
   if (!file) throw new Error(`No template file for mode ${mode}`);
 
+  // 0) Prefer the content-hashed bundle
+  const bundle = await templateBundle();
+  const fromBundle = bundle?.[file.split("/").pop()];
+  if (templatesLookValid(fromBundle)) return fromBundle;
+
   // 1) Try cached bucket
   let bucket = cacheGet(CK.TEMPLATES) || {};
   if (bucket && bucket[mode] && templatesLookValid(bucket[mode])) {
@@ -189,6 +318,7 @@ async function switchMode(mode){
   state.activeSection = first;
   ensureSectionState();
   applyRosDefaultsIfAny();   // pre-set default normal ROS chips from template
+  await loadPrerendered(mode);
   renderAll();
 }
 
@@ -765,6 +895,7 @@ if (state.mode === "subjective") {
 function renderGrid(){
   const grid = document.getElementById("grid");
   grid.innerHTML = "";
+  delete grid.dataset.prerendered;
   // Update grid class to include current mode
   grid.className = "section-grid " + state.mode;
   const def = Templates.sectionDefs[`${state.mode}:${state.activeSection}`];
@@ -798,6 +929,7 @@ function renderGrid(){
     grid.style.gridTemplateColumns = "";
     grid.style.gap = "";
     grid.dataset.subjSplit = "";
+    if (hydratePrerenderedGrid(grid, def)) return;
   }
 
   // --- Special subjective splitter row (HPI | splitter | General) ---
@@ -1241,6 +1373,15 @@ function cb(id,label,checked,on){
   w.className = "cb" + (state && state.mode === "subjective" ? " subjective" : "");
   const i=document.createElement("input"); 
   i.type="checkbox"; 
+  i.dataset.cbId = id;   // hydration key for prerendered grids
+
+  w.appendChild(i); 
+  w.appendChild(document.createTextNode(label)); 
+  wireCb(w, i, checked, on);
+  return w;
+}
+// State + handler for a checkbox built by cb() or cloned from a prerendered grid
+function wireCb(w, i, checked, on){
   i.checked=checked;
 
   // initial selected state class
@@ -1250,10 +1391,6 @@ function cb(id,label,checked,on){
     on(e.target.checked);
     applyCbSelectedClass(w, i);
   };
-
-  w.appendChild(i); 
-  w.appendChild(document.createTextNode(label)); 
-  return w;
 }
 
 function setField(id, val){
@@ -1909,6 +2046,29 @@ function applyChipVisualState(el, pos, neg){
 function chip(def, value, onMouse){
   // value: 0 | 'neg' | {state:'pos', side?, grade?, tags?}
   const d = document.createElement("div");
+  d.dataset.chipId = def.id;   // hydration key for prerendered grids
+
+  const affPlus = document.createElement("button");
+  affPlus.type = "button";
+  affPlus.className = "aff plus";
+  affPlus.textContent = "+";
+
+  const label = document.createElement("span");
+  label.className = "label";
+  label.textContent = def.label;
+
+  const affMinus = document.createElement("button");
+  affMinus.type = "button";
+  affMinus.className = "aff minus";
+  affMinus.textContent = "–";
+
+  d.append(affPlus, label, affMinus);
+  wireChip(d, def, value, onMouse);
+  return d;
+}
+// State classes, handlers and (when positive) modifier buttons for a chip built by
+// chip() or cloned from a prerendered grid
+function wireChip(d, def, value, onMouse){
   const pos = isPos(value), neg = isNeg(value);
   applyChipVisualState(d, pos, neg);
   d.title = `state: ${pos ? "critical" : (neg ? "normal" : "neutral")}`;
@@ -1919,24 +2079,14 @@ function chip(def, value, onMouse){
     d.onmousedown = onMouse;
   }
 
-  const affPlus = document.createElement("button");
-  affPlus.type = "button";
-  affPlus.className = "aff plus";
-  affPlus.textContent = "+";
+  const affPlus = d.querySelector(":scope > .aff.plus");
   affPlus.onclick = (e) => {
     e.stopPropagation();
     setChipPos(def.id);
     renderGrid(); renderOutput();
   };
 
-  const label = document.createElement("span");
-  label.className = "label";
-  label.textContent = def.label;
-
-  const affMinus = document.createElement("button");
-  affMinus.type = "button";
-  affMinus.className = "aff minus";
-  affMinus.textContent = "–";
+  const affMinus = d.querySelector(":scope > .aff.minus");
   affMinus.onclick = (e) => {
     e.stopPropagation();
     setChipPos(def.id); // minus now sets ABNORMAL (critical), same as right-click
@@ -1944,8 +2094,6 @@ function chip(def, value, onMouse){
     renderOutput();
   };
 
-  d.append(affPlus, label, affMinus);
-
   if (pos && def.mods){
     const mods = document.createElement("div");
     mods.className = "chip-mods";
@@ -1973,7 +2121,6 @@ function chip(def, value, onMouse){
     }
     d.appendChild(mods);
   }
-  return d;
 }
 
 function miniBtn(label, active, on){
@@ -2040,20 +2187,27 @@ function getSec(){
 }
 function toggleChip(id){ const s=getSec(); s.chips[id]=!s.chips[id]; }
 
+// Section def -> Map(id -> item def), first occurrence wins (same order as the old linear search)
+const _defIndex = new WeakMap();
+function sectionIdIndex(def){
+  let idx = _defIndex.get(def);
+  if (idx) return idx;
+  idx = new Map();
+  const add = (items) => (items||[]).forEach(x => { if (!idx.has(x.id)) idx.set(x.id, x); });
+  add(def.headerItems);
+  add(def.headerToggles);
+  (def.panels||[]).forEach(p => {
+    add(p.checkboxes);
+    add(p.chips);
+    (p.subsections||[]).forEach(ss => { add(ss.checkboxes); add(ss.chips); });
+  });
+  _defIndex.set(def, idx);
+  return idx;
+}
+
 function findDef(secKey, id){
   const def = Templates.sectionDefs[secKey];
-  return [
-    ...(def?.headerItems||[]), 
-    ...(def?.headerToggles||[]),
-    ...((def?.panels||[]).flatMap(p=>[
-      ...(p.checkboxes||[]),
-      ...(p.chips||[]),
-      ...((p.subsections||[]).flatMap(ss=>[
-        ...(ss.checkboxes||[]),
-        ...(ss.chips||[])
-      ]))
-    ]))
-  ].find(x=>x.id===id) || {label:id};
+  return (def && sectionIdIndex(def).get(id)) || {label:id};
 }
 
 function formatChipForOutput(secKey, id, v){